@@ -0,0 +1,9 @@
+# benchmarks/__init__.py
+"""
+Suíte de benchmarks do queries layer, analytics e API.
+
+    python -m benchmarks --sizes 1k,100k --output bench.json
+    python -m benchmarks --baseline benchmarks/baseline.json --threshold 0.2
+
+Ver benchmarks/run.py para as opções.
+"""
@@ -0,0 +1,98 @@
+# benchmarks/compare.py
+"""
+Compara um resultado de benchmark com um baseline salvo.
+
+    python -m benchmarks.compare bench.json benchmarks/baseline.json --threshold 0.2
+
+Cada métrica numérica é comparada pelo nome:
+- *_ms, *_seconds, *_kb: menor é melhor
+- *_per_s: maior é melhor
+Regressão = piora relativa maior que o threshold. Sai com código 1 se houver.
+"""
+import argparse
+import json
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+LOWER_IS_BETTER = ("_ms", "_seconds", "_kb", "_ns", "_bytes")
+HIGHER_IS_BETTER = ("_per_s",)
+
+# Diferenças abaixo disso (em ms/kb/...) são ruído e não contam como regressão
+MIN_ABSOLUTE_DELTA = 0.05
+
+
+@dataclass
+class Regression:
+    metric: str
+    baseline: float
+    current: float
+    change: float   # piora relativa (0.25 = 25% pior)
+
+    def __str__(self) -> str:
+        return (
+            f"{self.metric}: {self.baseline:g} -> {self.current:g} "
+            f"({self.change:+.1%} worse)"
+        )
+
+
+def flatten(results: Dict[str, Any], prefix: str = "") -> Iterator[Tuple[str, float]]:
+    """{"1k": {"crud": {"insert": {"p50_ms": 1}}}} -> ("1k.crud.insert.p50_ms", 1)"""
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            yield from flatten(value, name)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield name, float(value)
+
+
+def _direction(metric: str) -> Optional[int]:
+    """+1 se maior é melhor, -1 se menor é melhor, None se não comparável."""
+    if metric.endswith(HIGHER_IS_BETTER):
+        return 1
+    if metric.endswith(LOWER_IS_BETTER):
+        return -1
+    return None
+
+
+def compare(
+    current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.2
+) -> List[Regression]:
+    """Métricas presentes nos dois resultados que pioraram mais que `threshold`."""
+    baseline_metrics = dict(flatten(baseline.get("results", {})))
+    regressions = []
+    for metric, value in flatten(current.get("results", {})):
+        direction = _direction(metric)
+        old = baseline_metrics.get(metric)
+        if direction is None or old is None or old <= 0:
+            continue
+        if abs(value - old) < MIN_ABSOLUTE_DELTA:
+            continue
+        change = (old - value) / old if direction > 0 else (value - old) / old
+        if change > threshold:
+            regressions.append(Regression(metric, old, value, change))
+    return regressions
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare benchmark results with a baseline.")
+    parser.add_argument("current")
+    parser.add_argument("baseline")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    regressions = compare(load(args.current), load(args.baseline), args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if not regressions:
+        print(f"No regressions above {args.threshold:.0%}.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+# benchmarks/datasets.py
+"""
+Datasets sintéticos e reprodutíveis para os benchmarks.
+Mesma semente -> mesmos estudantes, em qualquer máquina.
+"""
+import random
+from typing import Dict, Iterator, List
+
+from database.models import MAX_MARKS, MIN_MARKS, Student
+
+# Tamanhos nomeados aceitos em --sizes
+DATASET_SIZES: Dict[str, int] = {
+    "1k": 1_000,
+    "100k": 100_000,
+    "1M": 1_000_000,
+}
+
+DEFAULT_SEED = 42
+DEFAULT_SUBJECTS = 40
+
+GENDERS = ("Male", "Female")
+
+
+def parse_size(label: str) -> int:
+    """ "100k" -> 100000; aceita também números ("5000")."""
+    if label in DATASET_SIZES:
+        return DATASET_SIZES[label]
+    try:
+        return int(label)
+    except ValueError:
+        raise ValueError(
+            f"Unknown dataset size: {label} (use {', '.join(DATASET_SIZES)} or a number)"
+        ) from None
+
+
+def subject_names(count: int = DEFAULT_SUBJECTS) -> List[str]:
+    return [f"Subject {i:02d}" for i in range(count)]
+
+
+def generate_students(
+    size: int,
+    seed: int = DEFAULT_SEED,
+    subjects: int = DEFAULT_SUBJECTS,
+    first_id: int = 1,
+) -> Iterator[Student]:
+    """
+    Gera `size` estudantes (gerador, memória constante).
+    Notas com distribuição aproximadamente normal por disciplina, para os
+    percentis e o top N não serem triviais.
+    """
+    rng = random.Random(seed)
+    names = subject_names(subjects)
+    # média de cada disciplina entre 55 e 80
+    means = [rng.uniform(55, 80) for _ in names]
+    for student_id in range(first_id, first_id + size):
+        index = rng.randrange(len(names))
+        marks = round(rng.gauss(means[index], 12))
+        yield Student(
+            student_id=student_id,
+            name=f"Student {student_id}",
+            age=rng.randint(15, 25),
+            gender=rng.choice(GENDERS),
+            subject=names[index],
+            marks=min(MAX_MARKS, max(MIN_MARKS, marks)),
+        )
@@ -0,0 +1,413 @@
+# benchmarks/run.py
+"""
+Executa a suíte de benchmarks e grava os resultados em JSON.
+
+Para cada tamanho de dataset (--sizes), a tabela é recriada vazia e:
+- ingest: carga em lote do dataset inteiro (linhas/s)
+- crud: latência p50/p95/p99 de insert, get, update, upsert, page e delete
+- analytics: tempo (melhor de --repeat) e pico de memória (tracemalloc)
+- api: requisições/s via cliente ASGI em processo (httpx), sem rede
+- models: custo por linha (ns e bytes) de montar Students a partir de tuplas
+  e de serializá-los em JSON, antes (dataclass comum + pydantic por linha)
+  e depois (dataclass com slots + dict direto, ou tuplas direto em bytes)
+
+Por padrão roda no SQLite em memória. Com --backend postgres é preciso
+informar --db-name: a tabela students desse banco é APAGADA a cada tamanho.
+O cache de consultas fica desligado (mede o banco); use --cache para ligar.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from benchmarks.compare import compare, load
+from benchmarks.datasets import DEFAULT_SEED, generate_students, parse_size, subject_names
+
+# Logger
+logger = logging.getLogger("benchmarks")
+
+DEFAULT_SIZES = "1k,100k"
+DEFAULT_OPS = 200
+DEFAULT_REPEAT = 3
+DEFAULT_API_REQUESTS = 500
+DEFAULT_API_CONCURRENCY = 16
+
+
+def _percentiles_ms(samples_ns: Sequence[int]) -> Dict[str, float]:
+    samples_ms = [ns / 1e6 for ns in samples_ns]
+    if len(samples_ms) < 2:
+        value = round(samples_ms[0], 4) if samples_ms else 0.0
+        return {"p50_ms": value, "p95_ms": value, "p99_ms": value}
+    cuts = statistics.quantiles(samples_ms, n=100, method="inclusive")
+    return {
+        "p50_ms": round(cuts[49], 4),
+        "p95_ms": round(cuts[94], 4),
+        "p99_ms": round(cuts[98], 4),
+    }
+
+
+def _timed(func: Callable[[], Any]) -> int:
+    start = time.perf_counter_ns()
+    func()
+    return time.perf_counter_ns() - start
+
+
+def configure_backend(backend: str, db_name: Optional[str], cache: bool) -> None:
+    """Aponta o processo para o banco de benchmark (antes de qualquer conexão)."""
+    os.environ["DB_BACKEND"] = backend
+    if backend == "sqlite":
+        os.environ["SQLITE_PATH"] = ":memory:"
+    else:
+        if not db_name:
+            raise SystemExit("--db-name is required with --backend postgres")
+        os.environ["DB_NAME"] = db_name
+    os.environ["CACHE_ENABLED"] = "true" if cache else "false"
+
+
+def reset_database() -> None:
+    """Tabela students vazia, com o schema atualizado."""
+    from database.cache import reset_cache
+    from database.queries import create_students_table
+    from database.repository import close_repository, get_repository
+
+    reset_cache()
+    if get_repository().name == "sqlite":
+        # ":memory:" some junto com a conexão
+        close_repository()
+        create_students_table()
+        return
+
+    from database.database import get_connection
+    create_students_table()
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("TRUNCATE students;")
+
+
+@dataclass
+class _DictStudent:
+    """Student como era antes dos slots (um __dict__ por instância)."""
+    student_id: int
+    name: str
+    age: int
+    gender: str
+    subject: str
+    marks: int
+
+
+def _dict_students_from_rows(rows: Sequence[tuple]) -> List[_DictStudent]:
+    # caminho antigo: row_to_student campo a campo, linha a linha
+    return [
+        _DictStudent(
+            student_id=row[0], name=row[1], age=row[2],
+            gender=row[3], subject=row[4], marks=row[5],
+        )
+        for row in rows
+    ]
+
+
+def _per_row(func: Callable[[], Any], rows: int, repeat: int) -> Dict[str, float]:
+    """Melhor tempo de `repeat` execuções e memória alocada, por linha."""
+    best = min(_timed(func) for _ in range(repeat))
+    tracemalloc.start()
+    try:
+        # o resultado fica vivo até a medição: `current` é o que ele retém
+        result = func()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return {
+        "per_row_ns": round(best / rows, 1),
+        "retained_per_row_bytes": round(current / rows, 1),
+        "peak_per_row_bytes": round(peak / rows, 1),
+    }
+
+
+def bench_models(size: int, seed: int, repeat: int) -> Dict[str, Dict[str, float]]:
+    from pydantic import TypeAdapter
+
+    from database.sql import STUDENT_COLUMNS, rows_to_students, student_values
+    from src.api.main import StudentResponse, domain_to_response
+    from src.api.responses import RowEncoder
+
+    rows = [student_values(s) for s in generate_students(size, seed=seed)]
+    students = rows_to_students(rows)
+    # emula a resposta anterior das rotas de lista: um StudentResponse por
+    # linha, serializado pelo pydantic e depois pelo json.dumps do JSONResponse
+    adapter = TypeAdapter(List[StudentResponse])
+
+    cases = {
+        "construct_dataclass": lambda: _dict_students_from_rows(rows),
+        "construct_slots": lambda: rows_to_students(rows),
+        "serialize_pydantic": lambda: json.dumps(
+            adapter.dump_python([domain_to_response(s) for s in students], mode="json")
+        ),
+        "serialize_direct": lambda: json.dumps([s.to_dict() for s in students]),
+        # rotas de lista: tuplas do banco direto para bytes (RowsJSONResponse)
+        "serialize_rows": lambda: RowEncoder(STUDENT_COLUMNS).encode_rows(rows),
+    }
+    return {name: _per_row(case, size, repeat) for name, case in cases.items()}
+
+
+def bench_ingest(size: int, seed: int) -> Dict[str, Any]:
+    from database.queries import bulk_insert_students
+
+    start = time.perf_counter()
+    result = bulk_insert_students(generate_students(size, seed=seed))
+    seconds = time.perf_counter() - start
+    if result.inserted != size:
+        raise RuntimeError(f"Ingest inserted {result.inserted} of {size} students")
+    return {
+        "rows": size,
+        "total_seconds": round(seconds, 4),
+        "rows_per_s": round(size / seconds, 1),
+    }
+
+
+def bench_crud(size: int, ops: int, seed: int) -> Dict[str, Dict[str, float]]:
+    from database import queries
+
+    rng = random.Random(seed)
+    existing = [rng.randint(1, size) for _ in range(ops)]
+    # IDs novos, depois do dataset
+    new_students = list(generate_students(ops, seed=seed + 1, first_id=size + 1))
+
+    samples: Dict[str, List[int]] = {name: [] for name in (
+        "insert", "get_by_id", "update_fields", "upsert", "page", "delete",
+    )}
+    for student in new_students:
+        samples["insert"].append(_timed(lambda: queries.insert_student(student)))
+    for student_id in existing:
+        samples["get_by_id"].append(_timed(lambda: queries.get_student_by_id(student_id)))
+    for student_id in existing:
+        marks = rng.randint(0, 100)
+        samples["update_fields"].append(
+            _timed(lambda: queries.update_student_fields(student_id, {"marks": marks}))
+        )
+    for student in new_students:
+        samples["upsert"].append(_timed(lambda: queries.upsert_student(student)))
+    for student_id in existing:
+        samples["page"].append(
+            _timed(lambda: queries.get_students_page(limit=100, after=student_id))
+        )
+    for student in new_students:
+        samples["delete"].append(
+            _timed(lambda: queries.delete_student_by_id(student.student_id))
+        )
+    return {name: _percentiles_ms(values) for name, values in samples.items()}
+
+
+def _analytics_cases() -> Dict[str, Callable[[], Any]]:
+    from database import queries
+    from src.analytics.marks_analysis import calculate_subject_mark_stats
+    from src.analytics.snapshot import compute_analytics_snapshot
+    from src.analytics.student_table import StudentTable
+
+    subject = subject_names()[0]
+    return {
+        "mark_summary_sql": lambda: queries.get_mark_summary(top_n=10),
+        "mark_summary_sql_filtered": lambda: queries.get_mark_summary(top_n=10, subject=subject),
+        "subject_stats_sql": lambda: queries.get_subject_mark_stats(),
+        "overall_stats_sql": lambda: queries.get_mark_stats(),
+        "top_students_sql": lambda: queries.get_top_students_by_marks(10),
+        "get_all_students": lambda: queries.get_all_students(),
+        "snapshot_streaming": lambda: compute_analytics_snapshot(
+            top_n=10, students=queries.iter_students()
+        ),
+        "subject_stats_in_memory": lambda: calculate_subject_mark_stats(
+            students=queries.get_all_students()
+        ),
+        "student_table_load": lambda: StudentTable.from_database(),
+        "subject_stats_student_table": lambda: calculate_subject_mark_stats(
+            students=StudentTable.from_database()
+        ),
+    }
+
+
+def bench_analytics(repeat: int) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for name, case in _analytics_cases().items():
+        # tempo: melhor de `repeat` execuções, sem tracemalloc (que distorce o tempo)
+        best = min(_timed(case) for _ in range(repeat))
+        tracemalloc.start()
+        try:
+            case()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        results[name] = {
+            "best_seconds": round(best / 1e9, 5),
+            "peak_kb": round(peak / 1024, 1),
+        }
+    return results
+
+
+async def _bench_api(
+    size: int, requests: int, concurrency: int, seed: int
+) -> Dict[str, Dict[str, float]]:
+    import httpx
+
+    from database.async_repository import close_async_repository, open_async_repository
+    from src.api.main import app
+
+    rng = random.Random(seed)
+    subject = subject_names()[0]
+    endpoints = {
+        "GET /students/{id}": lambda: f"/students/{rng.randint(1, size)}",
+        "GET /students?limit=100": lambda: f"/students?limit=100&after={rng.randint(0, size)}",
+        "GET /analytics/summary": lambda: "/analytics/summary?top_n=10",
+        "GET /analytics/subjects": lambda: "/analytics/subjects",
+        "GET /analytics/top?subject": lambda: f"/analytics/top?n=10&subject={subject}",
+    }
+
+    results = {}
+    # ASGITransport não roda o lifespan: o repositório assíncrono é aberto aqui
+    await open_async_repository()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name, make_path in endpoints.items():
+                paths = [make_path() for _ in range(requests)]
+                latencies: List[int] = []
+
+                async def worker(offset: int) -> None:
+                    for path in paths[offset::concurrency]:
+                        start = time.perf_counter_ns()
+                        response = await client.get(path)
+                        latencies.append(time.perf_counter_ns() - start)
+                        if response.status_code >= 500:
+                            raise RuntimeError(f"{path} -> {response.status_code}")
+
+                # aquecimento (pool de conexões, caminhos de import)
+                await client.get(paths[0])
+                start = time.perf_counter()
+                await asyncio.gather(*(worker(i) for i in range(concurrency)))
+                elapsed = time.perf_counter() - start
+                results[name] = {
+                    "requests_per_s": round(requests / elapsed, 1),
+                    **_percentiles_ms(latencies),
+                }
+    finally:
+        await close_async_repository()
+    return results
+
+
+def bench_api(size: int, requests: int, concurrency: int, seed: int) -> Dict[str, Dict[str, float]]:
+    return asyncio.run(_bench_api(size, requests, concurrency, seed))
+
+
+def run_suite(
+    sizes: Sequence[str],
+    ops: int = DEFAULT_OPS,
+    repeat: int = DEFAULT_REPEAT,
+    api_requests: int = DEFAULT_API_REQUESTS,
+    api_concurrency: int = DEFAULT_API_CONCURRENCY,
+    seed: int = DEFAULT_SEED,
+    skip_api: bool = False,
+) -> Dict[str, Any]:
+    """Roda a suíte para cada tamanho e retorna {"meta": ..., "results": ...}."""
+    from database.repository import close_repository, get_repository
+
+    results: Dict[str, Any] = {}
+    for label in sizes:
+        size = parse_size(label)
+        logger.info(f"[BENCH] Dataset {label} ({size} students)")
+        reset_database()
+        section: Dict[str, Any] = {"ingest": bench_ingest(size, seed)}
+        section["crud"] = bench_crud(size, ops, seed)
+        section["analytics"] = bench_analytics(repeat)
+        section["models"] = bench_models(size, seed, repeat)
+        if not skip_api:
+            section["api"] = bench_api(size, api_requests, api_concurrency, seed)
+        results[label] = section
+
+    backend = get_repository().name
+    close_repository()
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "backend": backend,
+            "cache": os.getenv("CACHE_ENABLED", "true"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": seed,
+            "ops": ops,
+            "repeat": repeat,
+            "api_requests": api_requests,
+            "api_concurrency": api_concurrency,
+        },
+        "results": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Benchmarks for the queries layer, analytics and API.",
+    )
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help="comma-separated dataset sizes: 1k, 100k, 1M or a number")
+    parser.add_argument("--backend", choices=("sqlite", "postgres"), default="sqlite")
+    parser.add_argument("--db-name", help="PostgreSQL database to use (its students table is wiped)")
+    parser.add_argument("--cache", action="store_true", help="enable the query cache")
+    parser.add_argument("--ops", type=int, default=DEFAULT_OPS, help="operations per CRUD metric")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="runs per analytics case")
+    parser.add_argument("--api-requests", type=int, default=DEFAULT_API_REQUESTS)
+    parser.add_argument("--api-concurrency", type=int, default=DEFAULT_API_CONCURRENCY)
+    parser.add_argument("--skip-api", action="store_true")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--output", help="write the JSON results to this file")
+    parser.add_argument("--baseline", help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="relative slowdown that counts as a regression (0.2 = 20%%)")
+    parser.add_argument("--save-baseline", metavar="PATH", help="also write the results here")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(message)s")
+    # os logs por operação do queries layer poluiriam a saída
+    for name in ("queries", "repository", "sqlite_repository", "database", "api", "httpx"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    configure_backend(args.backend, args.db_name, args.cache)
+    report = run_suite(
+        sizes=[s.strip() for s in args.sizes.split(",") if s.strip()],
+        ops=args.ops,
+        repeat=args.repeat,
+        api_requests=args.api_requests,
+        api_concurrency=args.api_concurrency,
+        seed=args.seed,
+        skip_api=args.skip_api,
+    )
+
+    text = json.dumps(report, indent=2)
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+            logger.info(f"[BENCH] Results written to {path}")
+    if not args.output:
+        print(text)
+
+    if args.baseline:
+        regressions = compare(report, load(args.baseline), args.threshold)
+        for regression in regressions:
+            logger.warning(f"[BENCH] REGRESSION {regression}")
+        if regressions:
+            return 1
+        logger.info(f"[BENCH] No regressions above {args.threshold:.0%} vs {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
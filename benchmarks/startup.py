@@ -0,0 +1,134 @@
+# benchmarks/startup.py
+"""
+Tempo de import (cold start) dos pontos de entrada, medido com
+`python -X importtime` em um processo novo.
+
+    python -m benchmarks.startup
+
+Cada ponto de entrada tem um orçamento (STARTUP_BUDGETS_MS, melhor de
+--repeat execuções) e uma lista de módulos pesados que não podem ser
+importados no startup (HEAVY_MODULES): eles devem ficar para o primeiro
+uso. tests/test_startup.py roda a mesma checagem. Sai com código 1 se
+algum ponto de entrada estourar o orçamento.
+"""
+import argparse
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Orçamento em ms do import completo (inclui dependências; FastAPI sozinho
+# leva a maior parte do da API)
+STARTUP_BUDGETS_MS: Dict[str, float] = {
+    "src.cli.main": 150,
+    "src.api.main": 1000,
+}
+
+# Módulos que só devem ser importados no primeiro uso
+HEAVY_MODULES: Dict[str, Tuple[str, ...]] = {
+    "src.cli.main": ("numpy", "pandas", "psycopg2", "asyncpg", "asyncio", "dotenv", "cProfile"),
+    "src.api.main": ("numpy", "pandas", "psycopg2", "asyncpg", "dotenv", "cProfile"),
+}
+
+DEFAULT_REPEAT = 3
+
+
+@dataclass
+class ImportTiming:
+    module: str
+    total_ms: float
+    # (módulo, ms cumulativos) dos imports diretos mais caros
+    heaviest: List[Tuple[str, float]]
+    loaded: Tuple[str, ...]
+
+
+def parse_importtime(stderr: str) -> Tuple[float, List[Tuple[str, float]]]:
+    """
+    Saída de -X importtime -> (total em ms, imports diretos do maior ao menor).
+    Só conta o que vem depois do `site` (o startup do interpretador não entra).
+    """
+    total_us = 0
+    direct: List[Tuple[str, float]] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue  # cabeçalho
+        name = parts[2][1:]
+        # cada nível de aninhamento acrescenta dois espaços antes do nome
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        cumulative = int(parts[1])
+        if depth == 0 and name == "site":
+            total_us, direct = 0, []
+        elif depth == 0:
+            total_us += cumulative
+        elif depth == 1:
+            direct.append((name.strip(), cumulative / 1000))
+    return total_us / 1000, sorted(direct, key=lambda item: item[1], reverse=True)
+
+
+def measure_import(module: str, python: str = sys.executable) -> ImportTiming:
+    """Importa `module` em um interpretador novo (cwd = raiz do projeto)."""
+    watched = sorted({name for names in HEAVY_MODULES.values() for name in names})
+    code = (
+        f"import sys; import {module}; "
+        f"print(','.join(m for m in {watched!r} if m in sys.modules))"
+    )
+    env = dict(os.environ, PYTHONPATH=PROJECT_DIR)
+    proc = subprocess.run(
+        [python, "-X", "importtime", "-c", code],
+        cwd=PROJECT_DIR, env=env, capture_output=True, text=True, check=False,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    total, heaviest = parse_importtime(proc.stderr)
+    loaded = tuple(name for name in proc.stdout.strip().split(",") if name)
+    return ImportTiming(module, round(total, 2), heaviest[:5], loaded)
+
+
+def best_of(module: str, repeat: int = DEFAULT_REPEAT) -> ImportTiming:
+    """Melhor de `repeat` execuções (a primeira pode pagar o .pyc e o cache do disco)."""
+    return min((measure_import(module) for _ in range(repeat)), key=lambda t: t.total_ms)
+
+
+def check(modules: Sequence[str], repeat: int = DEFAULT_REPEAT) -> List[str]:
+    """Problemas encontrados (vazio = tudo dentro do orçamento)."""
+    problems = []
+    for module in modules:
+        timing = best_of(module, repeat)
+        budget = STARTUP_BUDGETS_MS[module]
+        heavy = [name for name in timing.loaded if name in HEAVY_MODULES[module]]
+        heaviest = ", ".join(f"{name} {ms:.1f} ms" for name, ms in timing.heaviest)
+        print(f"{module}: {timing.total_ms:.1f} ms (budget {budget:g} ms) [{heaviest}]")
+        if timing.total_ms > budget:
+            problems.append(f"{module} imports in {timing.total_ms:.1f} ms (budget {budget:g} ms)")
+        if heavy:
+            problems.append(f"{module} imports {', '.join(heavy)} at startup")
+    return problems
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.startup",
+        description="Import time of the CLI and API entrypoints against a budget.",
+    )
+    parser.add_argument("modules", nargs="*", metavar="module",
+                        help=f"default: all ({', '.join(STARTUP_BUDGETS_MS)})")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    args = parser.parse_args(argv)
+    unknown = set(args.modules) - set(STARTUP_BUDGETS_MS)
+    if unknown:
+        parser.error(f"unknown module(s): {', '.join(sorted(unknown))}")
+
+    problems = check(args.modules or list(STARTUP_BUDGETS_MS), args.repeat)
+    for problem in problems:
+        print(f"OVER BUDGET: {problem}", file=sys.stderr)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
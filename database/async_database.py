@@ -0,0 +1,124 @@
+# database/async_database.py
+"""
+Pool assíncrono (asyncpg) usado pela API.
+O CLI e o notebook continuam no pool síncrono de database/database.py;
+os dois leem as mesmas variáveis DB_* / DB_POOL_* do .env.
+"""
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+import asyncpg
+import logging
+
+from .config import load_config
+from .metrics import REGISTRY, observe_acquire
+
+# Logger
+logger = logging.getLogger("async_database")
+
+_pool: Optional[asyncpg.Pool] = None
+
+
+async def _init_connection(conn: asyncpg.Connection) -> None:
+    # json/jsonb decodificados como no psycopg2 (usado pelo resumo de analytics)
+    for type_name in ("json", "jsonb"):
+        await conn.set_type_codec(
+            type_name, encoder=json.dumps, decoder=json.loads, schema="pg_catalog"
+        )
+
+
+def connection_kwargs() -> Dict[str, Any]:
+    """Parâmetros de conexão do .env (pool e conexões avulsas, ex.: LISTEN)."""
+    load_config()
+    return {
+        "host": os.getenv("DB_HOST", "localhost"),
+        "port": int(os.getenv("DB_PORT", "5432")),
+        "database": os.getenv("DB_NAME", "project_01"),
+        "user": os.getenv("DB_USER"),
+        "password": os.getenv("DB_PASSWORD"),
+    }
+
+
+async def open_async_pool() -> asyncpg.Pool:
+    """
+    Cria o pool assíncrono (chamado no startup da API).
+    Se já existir, retorna o atual.
+    """
+    global _pool
+    if _pool is not None:
+        return _pool
+
+    pool = await asyncpg.create_pool(
+        **connection_kwargs(),
+        min_size=int(os.getenv("DB_POOL_MIN_SIZE", "1")),
+        max_size=int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+        max_inactive_connection_lifetime=float(os.getenv("DB_POOL_MAX_IDLE", "600")),
+        init=_init_connection,
+    )
+    # outra corrotina pode ter criado o pool enquanto este era aberto
+    if _pool is not None:
+        await pool.close()
+        return _pool
+
+    _pool = pool
+    logger.info(
+        f"[DB] Async connection pool created "
+        f"(min={pool.get_min_size()}, max={pool.get_max_size()})"
+    )
+    return _pool
+
+
+@asynccontextmanager
+async def get_async_connection() -> AsyncIterator[asyncpg.Connection]:
+    """Empresta uma conexão do pool assíncrono durante o bloco `async with`."""
+    pool = _pool or await open_async_pool()
+    timeout = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    start = time.perf_counter()
+    conn = await pool.acquire(timeout=timeout)
+    observe_acquire("asyncpg", time.perf_counter() - start)
+    try:
+        yield conn
+    finally:
+        await pool.release(conn)
+
+
+async def close_async_pool() -> None:
+    """Fecha o pool assíncrono (shutdown da API)."""
+    global _pool
+    pool, _pool = _pool, None
+    if pool is not None:
+        await pool.close()
+        logger.info("[DB] Async connection pool closed")
+
+
+def get_async_pool_stats() -> Dict[str, Any]:
+    """Estatísticas do pool assíncrono; vazio se ainda não foi criado."""
+    pool = _pool
+    if pool is None:
+        return {}
+    return {
+        "min_size": pool.get_min_size(),
+        "max_size": pool.get_max_size(),
+        "size": pool.get_size(),
+        "idle": pool.get_idle_size(),
+        "in_use": pool.get_size() - pool.get_idle_size(),
+    }
+
+
+def _async_pool_metrics():
+    """Collector do /metrics: ocupação do pool asyncpg."""
+    stats = get_async_pool_stats()
+    if not stats:
+        return []
+    return [
+        ("db_pool_connections", "gauge", "Connections in the pool by state.", [
+            ({"pool": "asyncpg", "state": "idle"}, stats["idle"]),
+            ({"pool": "asyncpg", "state": "in_use"}, stats["in_use"]),
+        ]),
+    ]
+
+
+REGISTRY.add_collector(_async_pool_metrics)
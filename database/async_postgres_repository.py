@@ -0,0 +1,178 @@
+# database/async_postgres_repository.py
+"""
+Repositório PostgreSQL assíncrono (asyncpg), usado pelas rotas da API.
+Mesmo SQL (database/sql.py) e mesmos resultados do PostgresRepository;
+só o driver muda.
+"""
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+import logging
+
+from .async_database import (
+    close_async_pool,
+    get_async_connection,
+    get_async_pool_stats,
+    open_async_pool,
+)
+from .models import BatchOperation, Student
+from .repository import STREAM_CHUNK_SIZE, MarkSummary, batch_outcome
+from . import sql
+from .sql import row_to_student, rows_to_students, student_values, to_asyncpg
+from .table_version import TableVersion, table_version_from_row
+
+# Logger
+logger = logging.getLogger("async_postgres_repository")
+
+
+def _affected_rows(status: str) -> int:
+    """Status do asyncpg ("INSERT 0 1", "DELETE 3", ...) -> linhas afetadas."""
+    try:
+        return int(status.split()[-1])
+    except (IndexError, ValueError):
+        return 0
+
+
+class AsyncPostgresRepository:
+    name = "postgres"
+
+    async def open(self) -> None:
+        await open_async_pool()
+
+    async def close(self) -> None:
+        await close_async_pool()
+
+    def stats(self) -> Dict[str, Any]:
+        return get_async_pool_stats()
+
+    async def get_table_version(self) -> Optional[TableVersion]:
+        async with get_async_connection() as conn:
+            row = await conn.fetchrow(sql.SELECT_TABLE_VERSION)
+        return table_version_from_row(row)
+
+    # ======== CRUD ========
+
+    async def insert_student(self, student: Student) -> bool:
+        async with get_async_connection() as conn:
+            status = await conn.execute(to_asyncpg(sql.INSERT_STUDENT), *student_values(student))
+        return _affected_rows(status) > 0
+
+    async def upsert_student(self, student: Student) -> bool:
+        async with get_async_connection() as conn:
+            return await conn.fetchval(to_asyncpg(sql.UPSERT_STUDENT), *student_values(student))
+
+    async def get_student_by_id(self, student_id: int) -> Optional[Student]:
+        async with get_async_connection() as conn:
+            row = await conn.fetchrow(to_asyncpg(sql.SELECT_STUDENT_BY_ID), student_id)
+        return row_to_student(row) if row is not None else None
+
+    async def update_student_fields(self, student_id: int, fields: Dict[str, Any]) -> Optional[Student]:
+        if not fields:
+            return await self.get_student_by_id(student_id)
+
+        query, values = sql.build_update_fields_query(student_id, fields)
+        async with get_async_connection() as conn:
+            row = await conn.fetchrow(to_asyncpg(query), *values)
+        return row_to_student(row) if row is not None else None
+
+    async def delete_student_by_id(self, student_id: int) -> bool:
+        async with get_async_connection() as conn:
+            status = await conn.execute(to_asyncpg(sql.DELETE_STUDENT_BY_ID), student_id)
+        return _affected_rows(status) > 0
+
+    async def apply_batch(self, operations: Sequence[BatchOperation]) -> List[Optional[Student]]:
+        results: List[Optional[Student]] = []
+        async with get_async_connection() as conn:
+            async with conn.transaction():
+                for index, operation in enumerate(operations):
+                    query, values = sql.build_batch_statement(operation)
+                    row = await conn.fetchrow(to_asyncpg(query), *values)
+                    results.append(batch_outcome(index, operation, row))
+        return results
+
+    # ======== Leituras em lista ========
+
+    async def get_students_page_rows(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[int] = None,
+        subject: Optional[str] = None,
+        gender: Optional[str] = None,
+        min_marks: Optional[int] = None,
+        max_marks: Optional[int] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Tuple[List[str], List[Any]]:
+        """(colunas, linhas); as linhas são asyncpg.Record (sequências, como tuplas)."""
+        query, params, columns = sql.build_students_page_query(
+            limit, after, subject, gender, min_marks, max_marks, fields
+        )
+        async with get_async_connection() as conn:
+            rows = await conn.fetch(to_asyncpg(query), *params)
+        return columns, rows
+
+    async def get_students_page(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[int] = None,
+        subject: Optional[str] = None,
+        gender: Optional[str] = None,
+        min_marks: Optional[int] = None,
+        max_marks: Optional[int] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        columns, rows = await self.get_students_page_rows(
+            limit, after, subject, gender, min_marks, max_marks, fields
+        )
+        return [dict(zip(columns, row)) for row in rows]
+
+    async def iter_student_rows(
+        self,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+        subject: Optional[str] = None,
+        gender: Optional[str] = None,
+    ) -> AsyncIterator[List[tuple]]:
+        """Cursor server-side; a conexão fica emprestada até o gerador terminar."""
+        query, params = sql.build_stream_query(subject, gender)
+        async with get_async_connection() as conn:
+            # cursores só existem dentro de uma transação
+            async with conn.transaction():
+                cursor = await conn.cursor(to_asyncpg(query), *params)
+                while True:
+                    rows = await cursor.fetch(chunk_size)
+                    if not rows:
+                        break
+                    yield [tuple(row) for row in rows]
+
+    # ======== Analytics ========
+
+    async def get_subject_mark_stats(
+        self, subject: Optional[str] = None, gender: Optional[str] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        query, params = sql.build_subject_stats_query(subject, gender)
+        async with get_async_connection() as conn:
+            rows = await conn.fetch(to_asyncpg(query), *params)
+        return sql.subject_stats_from_rows(rows)
+
+    async def get_facets(self) -> Dict[str, List[str]]:
+        async with get_async_connection() as conn:
+            rows = await conn.fetch(sql.SELECT_FACETS)
+        return sql.facets_from_rows(rows)
+
+    async def get_top_students_by_marks(
+        self, limit: int = 5, subject: Optional[str] = None, gender: Optional[str] = None
+    ) -> List[Student]:
+        query, params = sql.build_top_students_query(limit, subject, gender)
+        async with get_async_connection() as conn:
+            rows = await conn.fetch(to_asyncpg(query), *params)
+        return rows_to_students(rows)
+
+    async def get_mark_summary(
+        self,
+        top_n: int = 5,
+        percentiles: Sequence[float] = (0.25, 0.5, 0.75, 0.9),
+        subject: Optional[str] = None,
+        gender: Optional[str] = None,
+    ) -> MarkSummary:
+        query, params = sql.build_mark_summary_query(top_n, percentiles, subject, gender)
+        async with get_async_connection() as conn:
+            rows = await conn.fetch(to_asyncpg(query), *params)
+        return sql.mark_summary_from_rows(rows, percentiles)
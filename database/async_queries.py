@@ -0,0 +1,198 @@
+# database/async_queries.py
+"""
+Versão assíncrona do queries layer, usada pelas rotas da API.
+
+Mesmos resultados e o mesmo cache/invalidação de database/queries.py;
+o acesso aos dados vem de database/async_repository.py (asyncpg no
+PostgreSQL, threads no SQLite). O CLI e o notebook continuam usando
+database/queries.py.
+"""
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+import logging
+
+from .async_repository import get_async_repository
+from .cache import (
+    STUDENT_NAMESPACE,
+    TABLE_NAMESPACE,
+    cached_async,
+    invalidate_student,
+    sync_table_version,
+)
+from .changes import student_changed, student_deleted
+from .metrics import timed_async_chunks, timed_query
+from .models import BatchOperation, Student
+from .repository import STREAM_CHUNK_SIZE, MarkSummary, validate_batch
+from .table_version import TableVersion
+
+# Logger
+logger = logging.getLogger("async_queries")
+
+
+@timed_query
+async def insert_student(student: Student) -> bool:
+    """
+    Insere um estudante.
+    Retorna True se inseriu, False se o ID já existe.
+    """
+    inserted = await get_async_repository().insert_student(student)
+    if inserted:
+        invalidate_student(student.student_id)
+        student_changed(student)
+    return inserted
+
+
+@timed_query(rows=lambda created: 1)
+async def upsert_student(student: Student) -> bool:
+    """
+    Insere ou substitui o estudante.
+    Retorna True se foi criado, False se um registro existente foi substituído.
+    """
+    created = await get_async_repository().upsert_student(student)
+    invalidate_student(student.student_id)
+    student_changed(student)
+    return created
+
+
+@cached_async(STUDENT_NAMESPACE, key=lambda student_id: student_id)
+@timed_query
+async def get_student_by_id(student_id: int) -> Optional[Student]:
+    return await get_async_repository().get_student_by_id(student_id)
+
+
+@timed_query
+async def update_student_fields(student_id: int, fields: Dict[str, Any]) -> Optional[Student]:
+    """
+    Update parcial em um único statement.
+    Retorna o estudante atualizado, ou None se o ID não existe.
+    """
+    if not fields:
+        return await get_student_by_id(student_id)
+
+    updated = await get_async_repository().update_student_fields(student_id, fields)
+    if updated is not None:
+        invalidate_student(student_id)
+        student_changed(updated)
+    return updated
+
+
+@timed_query
+async def delete_student_by_id(student_id: int) -> bool:
+    """Retorna True se algum registro foi deletado."""
+    deleted = await get_async_repository().delete_student_by_id(student_id)
+    if deleted:
+        invalidate_student(student_id)
+        student_deleted(student_id)
+    return deleted
+
+
+@timed_query
+async def apply_batch(operations: Sequence[BatchOperation]) -> List[Optional[Student]]:
+    """Operações mistas em uma transação (ver queries.apply_batch)."""
+    validate_batch(operations)
+    results = await get_async_repository().apply_batch(operations)
+    for operation, student in zip(operations, results):
+        invalidate_student(operation.student_id)
+        if student is None:
+            student_deleted(operation.student_id)
+        else:
+            student_changed(student)
+    logger.info(f"[DB] Batch applied ({len(operations)} operations)")
+    return results
+
+
+@timed_query
+async def get_students_page(
+    limit: Optional[int] = None,
+    after: Optional[int] = None,
+    subject: Optional[str] = None,
+    gender: Optional[str] = None,
+    min_marks: Optional[int] = None,
+    max_marks: Optional[int] = None,
+    fields: Optional[Sequence[str]] = None,
+) -> List[Dict[str, Any]]:
+    """Paginação por keyset + filtros + projeção (ver queries.get_students_page)."""
+    return await get_async_repository().get_students_page(
+        limit, after, subject, gender, min_marks, max_marks, fields
+    )
+
+
+@timed_query(rows=lambda result: len(result[1]))
+async def get_students_page_rows(
+    limit: Optional[int] = None,
+    after: Optional[int] = None,
+    subject: Optional[str] = None,
+    gender: Optional[str] = None,
+    min_marks: Optional[int] = None,
+    max_marks: Optional[int] = None,
+    fields: Optional[Sequence[str]] = None,
+) -> Tuple[List[str], List[Any]]:
+    """(colunas, linhas) da página, sem dict por linha (ver queries.get_students_page_rows)."""
+    return await get_async_repository().get_students_page_rows(
+        limit, after, subject, gender, min_marks, max_marks, fields
+    )
+
+
+def iter_student_rows(
+    chunk_size: int = STREAM_CHUNK_SIZE,
+    subject: Optional[str] = None,
+    gender: Optional[str] = None,
+) -> AsyncIterator[List[tuple]]:
+    """
+    Lê a tabela em blocos (memória constante), para `async for`.
+    A conexão fica emprestada até o gerador terminar ou ser fechado.
+    """
+    return timed_async_chunks(
+        "iter_student_rows",
+        get_async_repository().iter_student_rows(chunk_size, subject=subject, gender=gender),
+    )
+
+
+@cached_async(TABLE_NAMESPACE)
+@timed_query
+async def get_facets() -> Dict[str, List[str]]:
+    """Valores distintos de subject e gender (ver queries.get_facets)."""
+    return await get_async_repository().get_facets()
+
+
+@cached_async(TABLE_NAMESPACE)
+@timed_query(rows=len)
+async def get_subject_mark_stats(
+    subject: Optional[str] = None, gender: Optional[str] = None
+) -> Dict[str, Dict[str, Any]]:
+    """Estatísticas de notas por disciplina (ver queries.get_subject_mark_stats)."""
+    return await get_async_repository().get_subject_mark_stats(subject=subject, gender=gender)
+
+
+@cached_async(TABLE_NAMESPACE)
+@timed_query
+async def get_top_students_by_marks(
+    limit: int = 5, subject: Optional[str] = None, gender: Optional[str] = None
+) -> List[Student]:
+    """Top N por nota; empates pelo menor student_id."""
+    return await get_async_repository().get_top_students_by_marks(
+        limit, subject=subject, gender=gender
+    )
+
+
+@cached_async(TABLE_NAMESPACE)
+@timed_query
+async def get_mark_summary(
+    top_n: int = 5,
+    percentiles: Sequence[float] = (0.25, 0.5, 0.75, 0.9),
+    subject: Optional[str] = None,
+    gender: Optional[str] = None,
+) -> MarkSummary:
+    """Resumo completo das notas (ver queries.get_mark_summary)."""
+    return await get_async_repository().get_mark_summary(
+        top_n=top_n, percentiles=percentiles, subject=subject, gender=gender
+    )
+
+
+@timed_query
+async def get_table_version() -> Optional[TableVersion]:
+    """Versão da tabela no banco (ver queries.get_table_version)."""
+    version = await get_async_repository().get_table_version()
+    if version is not None:
+        sync_table_version(version.version)
+    return version
@@ -0,0 +1,81 @@
+# database/async_repository.py
+"""
+Acesso assíncrono ao repositório, usado por database/async_queries.py.
+
+- PostgreSQL: AsyncPostgresRepository (asyncpg, sem bloquear o event loop)
+- outros backends (SQLite): ThreadedRepository, que roda o repositório
+  síncrono em threads com asyncio.to_thread
+"""
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from .repository import STREAM_CHUNK_SIZE, get_repository
+
+_postgres = None
+
+
+class ThreadedRepository:
+    """Expõe o StudentRepository síncrono do processo como corrotinas."""
+
+    @property
+    def name(self) -> str:
+        return get_repository().name
+
+    async def open(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+    def __getattr__(self, attr: str):
+        method = getattr(get_repository(), attr)
+
+        async def call(*args, **kwargs):
+            return await asyncio.to_thread(method, *args, **kwargs)
+
+        return call
+
+    async def iter_student_rows(
+        self,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+        subject: Optional[str] = None,
+        gender: Optional[str] = None,
+    ) -> AsyncIterator[List[tuple]]:
+        chunks = get_repository().iter_student_rows(chunk_size, subject=subject, gender=gender)
+        try:
+            while True:
+                # cada bloco é lido em uma thread; o event loop segue livre
+                rows = await asyncio.to_thread(next, chunks, None)
+                if rows is None:
+                    break
+                yield rows
+        finally:
+            chunks.close()
+
+
+_threaded = ThreadedRepository()
+
+
+def get_async_repository():
+    """Repositório assíncrono correspondente ao DB_BACKEND atual."""
+    global _postgres
+    if get_repository().name != "postgres":
+        return _threaded
+    if _postgres is None:
+        # import tardio: asyncpg só é necessário com o backend PostgreSQL
+        from .async_postgres_repository import AsyncPostgresRepository
+        _postgres = AsyncPostgresRepository()
+    return _postgres
+
+
+async def open_async_repository() -> None:
+    """Startup da API: abre o pool assíncrono, se o backend usar um."""
+    await get_async_repository().open()
+
+
+async def close_async_repository() -> None:
+    """Shutdown da API."""
+    await get_async_repository().close()
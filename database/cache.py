@@ -0,0 +1,290 @@
+# database/cache.py
+"""
+Cache em memória (por processo) para leituras do queries layer.
+
+- LRU com limite de entradas + TTL por entrada
+- invalidação precisa: uma escrita no estudante X remove a entrada de X
+  e todas as leituras que dependem da tabela inteira (listas e analytics)
+- contadores de hit/miss/eviction para acompanhar a efetividade
+
+Cada processo (ex.: worker do uvicorn) tem o próprio cache. Escritas feitas
+por outro processo não passam por invalidate_student: na API, a versão da
+tabela lida do banco a cada requisição condicional (sync_table_version)
+descarta o cache quando muda; fora dela, aparecem depois do TTL.
+Os valores em cache são compartilhados: quem chama não deve mutá-los.
+"""
+import functools
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import logging
+
+from .config import load_config
+from .metrics import REGISTRY
+
+# Logger
+logger = logging.getLogger("cache")
+
+# Namespaces: leituras de um estudante e leituras da tabela inteira
+STUDENT_NAMESPACE = "student"
+TABLE_NAMESPACE = "table"
+
+
+class QueryCache:
+    """Cache LRU + TTL thread-safe."""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 30.0):
+        if max_entries < 1:
+            raise ValueError(f"Invalid cache size: {max_entries}")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # chave -> (expira_em, valor); a mais recente fica no fim
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        # incrementado a cada invalidação; evita gravar valor lido antes dela
+        self._generation = 0
+        # última versão da tabela vista no banco (sync_table_version)
+        self._table_version: Optional[int] = None
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0,
+        }
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """Retorna (achou, valor)."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters["misses"] += 1
+                return False, None
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self._counters["expirations"] += 1
+                self._counters["misses"] += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return True, value
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None) -> None:
+        """
+        Grava o valor. Se `generation` for informado e houve invalidação
+        desde então, o valor (possivelmente velho) é descartado.
+        """
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Remove as entradas cuja chave satisfaz `predicate`."""
+        with self._lock:
+            self._generation += 1
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                del self._entries[key]
+            self._counters["invalidations"] += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clear()
+
+    def _clear(self) -> None:
+        self._generation += 1
+        self._counters["invalidations"] += len(self._entries)
+        self._entries.clear()
+
+    def sync_table_version(self, version: int) -> bool:
+        """Descarta tudo se a versão da tabela mudou desde a última vista. True se limpou."""
+        with self._lock:
+            changed = self._table_version is not None and version != self._table_version
+            if changed:
+                self._clear()
+            self._table_version = version
+            return changed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                **self._counters,
+                "hit_ratio": round(self._counters["hits"] / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Cache do processo (criado no primeiro uso, configurado pelo .env)
+_cache: Optional[QueryCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> Optional[QueryCache]:
+    """Retorna o cache do processo, ou None se CACHE_ENABLED=false."""
+    global _cache
+    if _cache is not None:
+        return _cache
+    load_config()
+    if os.getenv("CACHE_ENABLED", "true").lower() in ("0", "false", "no"):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = QueryCache(
+                max_entries=int(os.getenv("CACHE_MAX_ENTRIES", "1024")),
+                ttl=float(os.getenv("CACHE_TTL", "30")),
+            )
+            logger.info(
+                f"[CACHE] Query cache created "
+                f"(max_entries={_cache.max_entries}, ttl={_cache.ttl}s)"
+            )
+    return _cache
+
+
+def reset_cache() -> None:
+    """Descarta o cache do processo (ex.: testes ou troca de configuração)."""
+    global _cache
+    with _cache_lock:
+        _cache = None
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    cache = _cache
+    return cache.stats() if cache is not None else {}
+
+
+def _cache_metrics():
+    stats = get_cache_stats()
+    if not stats:
+        return []
+    return [
+        ("query_cache_requests_total", "counter", "Query cache lookups by result.",
+         [({"result": "hit"}, stats["hits"]), ({"result": "miss"}, stats["misses"])]),
+        ("query_cache_hit_ratio", "gauge", "Query cache hits / lookups since start.",
+         [({}, stats["hit_ratio"])]),
+        ("query_cache_evictions_total", "counter", "Entries evicted by the LRU limit.",
+         [({}, stats["evictions"])]),
+        ("query_cache_entries", "gauge", "Entries currently in the query cache.",
+         [({}, stats["size"])]),
+    ]
+
+
+REGISTRY.add_collector(_cache_metrics)
+
+
+def _cache_key(namespace, key, func, args, kwargs) -> Optional[Hashable]:
+    if key is not None:
+        cache_key = (namespace, key(*args, **kwargs))
+    else:
+        cache_key = (namespace, func.__name__, args, tuple(sorted(kwargs.items())))
+    try:
+        hash(cache_key)
+    except TypeError:
+        # argumento não-hashable (ex.: lista): não cacheia
+        return None
+    return cache_key
+
+
+def cached(namespace: str, key: Optional[Callable[..., Hashable]] = None):
+    """
+    Decorator de read-through cache.
+
+    Sem `key`, a chave é (namespace, nome da função, args, kwargs).
+    Com `key`, a chave é (namespace, key(*args, **kwargs)); usado para
+    leituras de um único estudante, que precisam ser invalidadas pelo ID.
+    A função original fica em `wrapper.uncached`.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cache = get_cache()
+            cache_key = _cache_key(namespace, key, func, args, kwargs) if cache else None
+            if cache_key is None:
+                return func(*args, **kwargs)
+
+            hit, value = cache.get(cache_key)
+            if hit:
+                return value
+
+            generation = cache.generation
+            value = func(*args, **kwargs)
+            cache.set(cache_key, value, generation=generation)
+            return value
+
+        wrapper.uncached = func
+        return wrapper
+
+    return decorator
+
+
+def cached_async(namespace: str, key: Optional[Callable[..., Hashable]] = None):
+    """
+    Igual a `cached`, para corrotinas (database/async_queries.py).
+    As chaves são as mesmas: funções síncronas e assíncronas com o mesmo
+    nome compartilham as entradas do cache.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            cache = get_cache()
+            cache_key = _cache_key(namespace, key, func, args, kwargs) if cache else None
+            if cache_key is None:
+                return await func(*args, **kwargs)
+
+            hit, value = cache.get(cache_key)
+            if hit:
+                return value
+
+            generation = cache.generation
+            value = await func(*args, **kwargs)
+            cache.set(cache_key, value, generation=generation)
+            return value
+
+        wrapper.uncached = func
+        return wrapper
+
+    return decorator
+
+
+def invalidate_student(student_id: Optional[int] = None) -> None:
+    """
+    Chamado após escritas. Remove a entrada do estudante e tudo que depende
+    da tabela inteira. student_id=None (ex.: carga em lote) limpa tudo.
+    """
+    cache = _cache
+    if cache is None:
+        return
+    if student_id is None:
+        cache.clear()
+        return
+    cache.invalidate(
+        lambda k: k[0] == TABLE_NAMESPACE or k == (STUDENT_NAMESPACE, student_id)
+    )
+
+
+def sync_table_version(version: int) -> None:
+    """
+    Chamado com a versão da tabela lida do banco (ver table_version.py).
+    Se mudou, houve escrita, talvez de outro processo (CLI, outro worker),
+    que este cache não viu: tudo é descartado.
+    """
+    cache = _cache
+    if cache is not None and cache.sync_table_version(version):
+        logger.info(f"[CACHE] Table version changed to {version}, cache cleared")
@@ -0,0 +1,197 @@
+# database/changes.py
+"""
+Feed de alterações da tabela students.
+
+Eventos por linha, em ordem, com um número de sequência (seq) do processo:
+- upsert: estudante criado ou alterado (linha completa em `row`)
+- delete: estudante removido
+- reset: mudança grande demais para eventos por linha (carga em lote,
+  TRUNCATE) ou eventos perdidos; o cliente deve recarregar a tabela
+
+Publicação:
+- PostgreSQL: triggers (migração 5) fazem pg_notify em CHANGES_CHANNEL e
+  database/postgres_changes.py repassa as notificações para o feed do
+  processo, inclusive escritas feitas por outros processos (CLI, workers).
+- Demais casos (SQLite, testes, PostgreSQL sem listener): o queries layer
+  publica localmente após cada escrita. Com o listener ativo, a publicação
+  local é ignorada para não duplicar eventos.
+
+Os assinantes (rota SSE da API) recebem os eventos em uma asyncio.Queue.
+Os últimos CHANGE_BUFFER_SIZE eventos ficam guardados para quem reconecta
+informando o último seq recebido (Last-Event-ID).
+"""
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set
+
+import logging
+
+from .metrics import REGISTRY
+from .models import Student
+
+if TYPE_CHECKING:
+    import asyncio
+
+# Logger
+logger = logging.getLogger("changes")
+
+# Canal do LISTEN/NOTIFY no PostgreSQL
+CHANGES_CHANNEL = "students_changes"
+# Statements que alteram mais linhas que isso geram um único reset
+CHANGE_NOTIFY_MAX_ROWS = 100
+# Eventos guardados para reconexão
+CHANGE_BUFFER_SIZE = 1000
+# Eventos pendentes por assinante; se encher, o assinante recebe um reset
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+UPSERT = "upsert"
+DELETE = "delete"
+RESET = "reset"
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    seq: int
+    op: str
+    student_id: Optional[int] = None
+    row: Optional[Dict[str, Any]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"seq": self.seq, "op": self.op, "student_id": self.student_id, "row": self.row}
+
+
+class Subscription:
+    """Fila de eventos de um assinante, presa ao event loop que a criou."""
+
+    def __init__(self, loop: "asyncio.AbstractEventLoop", maxsize: int = SUBSCRIBER_QUEUE_SIZE):
+        # asyncio só é importado por quem assina (API): o CLI não paga por ele
+        import asyncio
+
+        self.loop = loop
+        # seq do feed no momento da inscrição: eventos depois dele chegam na fila
+        self.start_seq = 0
+        self._queue: "asyncio.Queue[ChangeEvent]" = asyncio.Queue(maxsize)
+
+    def deliver(self, event: ChangeEvent) -> None:
+        """Roda no event loop do assinante."""
+        if self._queue.full():
+            # assinante lento: descarta o atraso e manda recarregar tudo
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            event = ChangeEvent(seq=event.seq, op=RESET)
+        self._queue.put_nowait(event)
+
+    async def get(self) -> ChangeEvent:
+        return await self._queue.get()
+
+
+class ChangeFeed:
+    """Distribui eventos de alteração para os assinantes do processo (thread-safe)."""
+
+    def __init__(self, buffer_size: int = CHANGE_BUFFER_SIZE):
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._buffer: "deque[ChangeEvent]" = deque(maxlen=buffer_size)
+        self._subscribers: Set[Subscription] = set()
+        # True enquanto o listener do PostgreSQL alimenta o feed
+        self.native = False
+
+    @property
+    def last_seq(self) -> int:
+        return self._seq
+
+    def publish(
+        self, op: str, student_id: Optional[int] = None, row: Optional[Dict[str, Any]] = None
+    ) -> ChangeEvent:
+        """Registra o evento e entrega aos assinantes (pode ser chamado de qualquer thread)."""
+        with self._lock:
+            self._seq += 1
+            event = ChangeEvent(seq=self._seq, op=op, student_id=student_id, row=row)
+            self._buffer.append(event)
+            subscribers = list(self._subscribers)
+
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                # event loop do assinante já foi fechado
+                self.unsubscribe(subscription)
+        return event
+
+    def _backlog(self, after: int) -> List[ChangeEvent]:
+        if after == self._seq:
+            return []
+        oldest = self._buffer[0].seq if self._buffer else self._seq + 1
+        if after > self._seq or after < oldest - 1:
+            # seq de outra instância (API reiniciada) ou já fora do buffer
+            return [ChangeEvent(seq=self._seq, op=RESET)]
+        return [event for event in self._buffer if event.seq > after]
+
+    def subscribe(self, after: Optional[int] = None) -> Subscription:
+        """
+        Novo assinante no event loop atual. Com `after` (último seq recebido),
+        os eventos posteriores ainda no buffer são entregues primeiro.
+        """
+        import asyncio
+
+        subscription = Subscription(asyncio.get_running_loop())
+        with self._lock:
+            subscription.start_seq = self._seq
+            if after is not None:
+                for event in self._backlog(after):
+                    subscription.deliver(event)
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "last_seq": self._seq,
+            "subscribers": len(self._subscribers),
+            "source": "postgres" if self.native else "local",
+        }
+
+
+# Feed do processo
+_feed = ChangeFeed()
+
+
+def get_change_feed() -> ChangeFeed:
+    return _feed
+
+
+def _feed_metrics():
+    stats = _feed.stats()
+    return [
+        ("change_feed_subscribers", "gauge", "Open /students/changes subscriptions.",
+         [({}, stats["subscribers"])]),
+        ("change_feed_last_seq", "gauge", "Sequence number of the last published change.",
+         [({}, stats["last_seq"])]),
+    ]
+
+
+REGISTRY.add_collector(_feed_metrics)
+
+
+def _publish_local(op: str, student_id: Optional[int] = None, row: Optional[Dict[str, Any]] = None) -> None:
+    # com o listener do PostgreSQL ativo, o evento chega pelo NOTIFY
+    if not _feed.native:
+        _feed.publish(op, student_id, row)
+
+
+def student_changed(student: Student) -> None:
+    """Chamado pelo queries layer após criar/alterar um estudante."""
+    _publish_local(UPSERT, student.student_id, student.to_dict())
+
+
+def student_deleted(student_id: int) -> None:
+    _publish_local(DELETE, student_id)
+
+
+def table_reset() -> None:
+    """Chamado após cargas em lote: os assinantes recarregam a tabela."""
+    _publish_local(RESET)
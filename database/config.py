@@ -0,0 +1,42 @@
+# database/config.py
+"""
+Carregamento da configuração (.env na raiz do projeto).
+
+Nada acontece no import: o CLI e a API chamam load_config() no início, e
+as funções que criam recursos a partir de variáveis de ambiente
+(repositório, pools, cache, slow-query log) também chamam, para quem usa
+o queries layer direto (notebook, scripts, benchmarks).
+
+Variáveis já definidas no ambiente têm prioridade sobre o .env.
+"""
+import os
+import threading
+
+import logging
+
+# Logger
+logger = logging.getLogger("config")
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENV_PATH = os.path.join(PROJECT_DIR, ".env")
+
+_loaded = False
+_lock = threading.Lock()
+
+
+def load_config() -> None:
+    """Carrega o .env uma vez por processo (chamadas seguintes não fazem nada)."""
+    global _loaded
+    if _loaded:
+        return
+    with _lock:
+        if _loaded:
+            return
+        if os.path.exists(ENV_PATH):
+            from dotenv import load_dotenv
+
+            load_dotenv(ENV_PATH)
+            logger.debug(f"[CONFIG] Loaded {ENV_PATH}")
+        else:
+            logger.debug(f"[CONFIG] No .env at {ENV_PATH}, using the environment only")
+        _loaded = True
@@ -1,21 +1,34 @@
 # database/database.py
+"""
+Conexões síncronas com o PostgreSQL (psycopg2 + pool do processo).
+psycopg2 só é importado na primeira conexão: o backend SQLite e o
+startup do CLI não pagam por ele.
+"""
 import os
-import psycopg2
-from dotenv import load_dotenv
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
 import logging
 
+from .config import load_config
+from .metrics import REGISTRY, observe_acquire
+from .pool import ConnectionPool
+
 # Logger
 logger = logging.getLogger("database")
 
-# Carrega variáveis do .env na raiz do projeto
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-print(f"BASE_DIR as {BASE_DIR}")
-ENV_PATH = os.path.join(BASE_DIR, ".env")
-print(f"ENV_PATH as {ENV_PATH}")
-load_dotenv(ENV_PATH)
+# Pool compartilhado pelo processo (criado no primeiro uso)
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
 
+def open_connection():
+    """Abre uma conexão nova com o PostgreSQL (sem passar pelo pool)."""
+    import psycopg2
 
-def get_connection():
+    load_config()
     conn = psycopg2.connect(
         host=os.getenv("DB_HOST", "localhost"),
         port=os.getenv("DB_PORT", "5432"),
@@ -26,3 +39,89 @@ def get_connection():
     logger.info(f"[DB] Opening PostgreSQL connection (connection={conn})")
     conn.set_session(autocommit=True)
     return conn
+
+
+def get_pool() -> ConnectionPool:
+    """
+    Retorna o pool de conexões do processo, criando-o na primeira chamada.
+    Tamanhos e tempos vêm das variáveis DB_POOL_* do .env.
+    """
+    global _pool
+    if _pool is not None and not _pool.closed:
+        return _pool
+
+    load_config()
+    with _pool_lock:
+        if _pool is None or _pool.closed:
+            _pool = ConnectionPool(
+                connect=open_connection,
+                min_size=int(os.getenv("DB_POOL_MIN_SIZE", "1")),
+                max_size=int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+                timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+                max_lifetime=float(os.getenv("DB_POOL_MAX_LIFETIME", "3600")),
+                max_idle=float(os.getenv("DB_POOL_MAX_IDLE", "600")),
+                check_after=float(os.getenv("DB_POOL_CHECK_AFTER", "5")),
+            )
+            logger.info(
+                f"[DB] Connection pool created "
+                f"(min={_pool.min_size}, max={_pool.max_size})"
+            )
+    return _pool
+
+
+@contextmanager
+def get_connection() -> Iterator[Any]:
+    """
+    Empresta uma conexão do pool durante o bloco `with`.
+    A conexão volta ao pool no fim do bloco (e é descartada se quebrou).
+    """
+    import psycopg2
+
+    pool = get_pool()
+    start = time.perf_counter()
+    conn = pool.getconn()
+    observe_acquire("postgres", time.perf_counter() - start)
+    discard = False
+    try:
+        yield conn
+    except (psycopg2.InterfaceError, psycopg2.OperationalError):
+        discard = True
+        raise
+    finally:
+        pool.putconn(conn, discard=discard)
+
+
+def close_pool() -> None:
+    """Fecha o pool (usado no shutdown da API)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Estatísticas do pool; vazio se ainda não foi criado."""
+    pool = _pool
+    if pool is None:
+        return {}
+    return pool.stats()
+
+
+def _pool_metrics():
+    """Collector do /metrics: ocupação do pool síncrono."""
+    stats = get_pool_stats()
+    if not stats:
+        return []
+    return [
+        ("db_pool_connections", "gauge", "Connections in the pool by state.", [
+            ({"pool": "postgres", "state": "idle"}, stats["idle"]),
+            ({"pool": "postgres", "state": "in_use"}, stats["in_use"]),
+        ]),
+        ("db_pool_timeouts_total", "counter", "Connection requests that timed out.", [
+            ({"pool": "postgres"}, stats["timeouts"]),
+        ]),
+    ]
+
+
+REGISTRY.add_collector(_pool_metrics)
@@ -0,0 +1,153 @@
+# database/ingest.py
+"""
+Leitura de arquivos/streams de estudantes para carga em lote.
+Todos os leitores são geradores: nada é carregado inteiro em memória
+(exceto arrays JSON, que precisam ser parseados por completo).
+"""
+import csv
+import io
+import json
+from typing import Any, Iterable, Iterator, Mapping, Optional, TextIO
+
+from .models import MAX_MARKS, MIN_MARKS, Student
+
+
+def _optional_int(value: Any, field_name: str) -> Optional[int]:
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    if isinstance(value, bool):
+        raise ValueError(f"invalid {field_name}: {value!r}")
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"invalid {field_name}: {value!r}") from None
+
+
+def _optional_str(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def student_from_record(record: Any) -> Student:
+    """
+    Converte um registro (Student, dict do CSV/JSON) em Student.
+    Levanta ValueError se o registro for inválido.
+    """
+    if isinstance(record, Student):
+        return record
+    if not isinstance(record, Mapping):
+        raise ValueError(f"expected an object, got {record!r:.80}")
+
+    student_id = _optional_int(record.get("student_id"), "student_id")
+    if student_id is None:
+        raise ValueError("missing student_id")
+    name = _optional_str(record.get("name"))
+    if name is None:
+        raise ValueError(f"missing name (student_id={student_id})")
+
+    age = _optional_int(record.get("age"), "age")
+    if age is not None and age < 0:
+        raise ValueError(f"invalid age: {age} (student_id={student_id})")
+    marks = _optional_int(record.get("marks"), "marks")
+    if marks is not None and not MIN_MARKS <= marks <= MAX_MARKS:
+        raise ValueError(f"invalid marks: {marks} (student_id={student_id})")
+
+    return Student(
+        student_id=student_id,
+        name=name,
+        age=age,
+        gender=_optional_str(record.get("gender")),
+        subject=_optional_str(record.get("subject")),
+        marks=marks,
+    )
+
+
+def iter_csv_records(lines: Iterable[str]) -> Iterator[Mapping[str, Any]]:
+    """Lê CSV com cabeçalho (student_id,name,age,gender,subject,marks)."""
+    yield from csv.DictReader(lines)
+
+
+def iter_ndjson_records(lines: Iterable[str]) -> Iterator[Any]:
+    """Lê NDJSON (um objeto JSON por linha). Linhas inválidas viram strings."""
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            # repassa a linha crua: student_from_record vai rejeitá-la
+            yield line
+
+
+def iter_json_array_records(stream: TextIO) -> Iterator[Any]:
+    """Lê um array JSON de objetos."""
+    data = json.load(stream)
+    if not isinstance(data, list):
+        raise ValueError("expected a JSON array of students")
+    yield from data
+
+
+def detect_format(filename: str = "", content_type: str = "") -> str:
+    """Descobre o formato (csv, ndjson ou json) pelo content-type ou extensão."""
+    content_type = content_type.split(";")[0].strip().lower()
+    if content_type in ("text/csv", "application/csv"):
+        return "csv"
+    if content_type in ("application/x-ndjson", "application/ndjson", "application/jsonl"):
+        return "ndjson"
+    if content_type == "application/json":
+        return "json"
+
+    lowered = filename.lower()
+    if lowered.endswith(".csv"):
+        return "csv"
+    if lowered.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    if lowered.endswith(".json"):
+        return "json"
+    raise ValueError(f"Unsupported format (filename={filename!r}, content_type={content_type!r})")
+
+
+def iter_records(stream: TextIO, fmt: str) -> Iterator[Any]:
+    """Itera os registros de um stream de texto no formato indicado."""
+    if fmt == "csv":
+        return iter_csv_records(stream)
+    if fmt == "ndjson":
+        return iter_ndjson_records(stream)
+    if fmt == "json":
+        return iter_json_array_records(stream)
+    raise ValueError(f"Unsupported format: {fmt}")
+
+
+class IteratorFile(io.TextIOBase):
+    """
+    Arquivo somente-leitura alimentado por um iterador de strings.
+    Usado para fazer streaming para o COPY sem montar o payload inteiro.
+    Se o iterador falhar, a exceção original fica em `error` (o driver
+    costuma trocá-la por um erro genérico de COPY).
+    """
+
+    def __init__(self, chunks: Iterable[str]):
+        self._chunks = iter(chunks)
+        self._buffer = ""
+        self.error: Optional[BaseException] = None
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._buffer) < size:
+            try:
+                self._buffer += next(self._chunks)
+            except StopIteration:
+                break
+            except Exception as e:
+                self.error = e
+                raise
+        if size < 0:
+            data, self._buffer = self._buffer, ""
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
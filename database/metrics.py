@@ -0,0 +1,362 @@
+# database/metrics.py
+"""
+Métricas do processo (contadores, gauges e histogramas) no formato texto
+do Prometheus, expostas pela API em GET /metrics.
+
+Sem dependência externa: cada métrica guarda os valores por combinação de
+labels em um dict protegido por lock, e render() gera o texto na hora do
+scrape. Valores que já existem em outros lugares (cache, pools, feed de
+alterações) entram por collectors, lidos só no scrape.
+
+Métricas do queries layer:
+- db_query_duration_seconds{query}: tempo de cada leitura/escrita no banco
+  (acertos de cache não contam: ver query_cache_*)
+- db_query_rows_total{query}: linhas retornadas/afetadas
+- db_slow_queries_total{query}: consultas acima de SLOW_QUERY_MS
+- db_connection_acquire_seconds{pool}: espera para obter uma conexão
+
+Slow-query log (.env): SLOW_QUERY_MS=500 registra um warning para cada
+consulta mais lenta que isso; vazio ou 0 desliga.
+"""
+import bisect
+import functools
+import inspect
+import math
+import os
+import threading
+import time
+from typing import (
+    Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple,
+)
+
+import logging
+
+from .config import load_config
+
+# Logger
+logger = logging.getLogger("metrics")
+
+# Buckets padrão do Prometheus (segundos)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Aquisição de conexão: esperado bem abaixo de 1 ms com o pool aquecido
+ACQUIRE_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+Labels = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Labels:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_label_text(self.label_names, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [contagem por bucket (não cumulativa) + overflow, soma, total]
+        self._values: Dict[Labels, list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def count(self, **labels: str) -> int:
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, (list(state[0]), state[1], state[2])) for key, state in self._values.items())
+        lines = self.header()
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_label_text(self.label_names, key, le)} {cumulative}"
+                )
+            labels = _label_text(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+# Collector: função chamada no scrape que devolve
+# [(nome, tipo, ajuda, [(labels, valor), ...]), ...]
+Sample = Tuple[Dict[str, str], float]
+Collector = Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Collector] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Collector) -> None:
+        if collector not in self._collectors:
+            self._collectors.append(collector)
+
+    def reset(self) -> None:
+        for metric in self._metrics:
+            metric.reset()
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+
+        # famílias de mesmo nome (ex.: pools diferentes) saem juntas, uma vez
+        families: Dict[str, Tuple[str, str, List[Sample]]] = {}
+        for collector in self._collectors:
+            try:
+                collected = list(collector())
+            except Exception as e:  # um collector quebrado não derruba o scrape
+                logger.warning(f"[METRICS] Collector {collector.__name__} failed: {e}")
+                continue
+            for name, kind, help, samples in collected:
+                families.setdefault(name, (kind, help, []))[2].extend(samples)
+
+        for name, (kind, help, samples) in families.items():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(
+                    f"{name}{_label_text(list(labels), list(labels.values()))} {_format_value(value)}"
+                )
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+QUERY_DURATION = REGISTRY.register(Histogram(
+    "db_query_duration_seconds", "Time spent in queries layer database calls.", ["query"]
+))
+QUERY_ROWS = REGISTRY.register(Counter(
+    "db_query_rows_total", "Rows returned or affected by queries layer calls.", ["query"]
+))
+QUERY_ERRORS = REGISTRY.register(Counter(
+    "db_query_errors_total", "Queries layer calls that raised.", ["query"]
+))
+SLOW_QUERIES = REGISTRY.register(Counter(
+    "db_slow_queries_total", "Queries slower than SLOW_QUERY_MS.", ["query"]
+))
+CONNECTION_ACQUIRE = REGISTRY.register(Histogram(
+    "db_connection_acquire_seconds", "Time waiting for a database connection.", ["pool"],
+    buckets=ACQUIRE_BUCKETS,
+))
+
+# Limite do slow-query log em ms (lido do .env no primeiro uso; 0 = desligado)
+_slow_query_ms: Optional[float] = None
+
+
+def slow_query_threshold_ms() -> float:
+    global _slow_query_ms
+    if _slow_query_ms is None:
+        load_config()
+        _slow_query_ms = float(os.getenv("SLOW_QUERY_MS") or 0)
+    return _slow_query_ms
+
+
+def reset_metrics() -> None:
+    """Zera as métricas e relê SLOW_QUERY_MS (testes)."""
+    global _slow_query_ms
+    _slow_query_ms = None
+    REGISTRY.reset()
+
+
+def result_rows(result: Any) -> int:
+    """Linhas de um resultado do queries layer (lista, objeto, bool ou None)."""
+    if result is None or result is False:
+        return 0
+    if isinstance(result, list):
+        return len(result)
+    return 1
+
+
+def describe_args(args: tuple) -> str:
+    """
+    Tipos (e tamanhos) dos argumentos, nunca os valores: os argumentos
+    carregam dados pessoais (Student, filtros) que não vão para o log.
+    """
+    parts = []
+    for arg in args:
+        kind = type(arg).__name__
+        if isinstance(arg, (str, bytes, list, tuple, dict, set)):
+            kind = f"{kind}[{len(arg)}]"
+        parts.append(kind)
+    return ", ".join(parts)
+
+
+def record_query(name: str, seconds: float, rows: int, args: tuple = ()) -> None:
+    QUERY_DURATION.observe(seconds, query=name)
+    QUERY_ROWS.inc(rows, query=name)
+    threshold = slow_query_threshold_ms()
+    if threshold and seconds * 1000 >= threshold:
+        SLOW_QUERIES.inc(query=name)
+        logger.warning(
+            f"[DB] Slow query {name}: {seconds * 1000:.1f} ms "
+            f"(rows={rows}, args=({describe_args(args)}))"
+        )
+
+
+def timed_query(func=None, *, rows: Callable[[Any], int] = result_rows):
+    """
+    Decorator do queries layer (síncrono ou async): mede o tempo, conta as
+    linhas com `rows(resultado)` e alimenta o slow-query log.
+    Fica por dentro do @cached: só chamadas que vão ao banco são medidas.
+    """
+    def decorator(func):
+        name = func.__name__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    result = await func(*args, **kwargs)
+                except Exception:
+                    QUERY_ERRORS.inc(query=name)
+                    raise
+                record_query(name, time.perf_counter() - start, rows(result), args)
+                return result
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                QUERY_ERRORS.inc(query=name)
+                raise
+            record_query(name, time.perf_counter() - start, rows(result), args)
+            return result
+        return wrapper
+
+    return decorator(func) if func is not None else decorator
+
+
+def timed_chunks(name: str, chunks: Iterator[List[tuple]]) -> Iterator[List[tuple]]:
+    """Leitura em streaming: mede do primeiro ao último bloco e soma as linhas."""
+    start = time.perf_counter()
+    total = 0
+    try:
+        for rows in chunks:
+            total += len(rows)
+            yield rows
+    finally:
+        # fecha o gerador do repositório já (devolve a conexão ao pool)
+        chunks.close()
+        record_query(name, time.perf_counter() - start, total)
+
+
+async def timed_async_chunks(
+    name: str, chunks: AsyncIterator[List[tuple]]
+) -> AsyncIterator[List[tuple]]:
+    start = time.perf_counter()
+    total = 0
+    try:
+        async for rows in chunks:
+            total += len(rows)
+            yield rows
+    finally:
+        await chunks.aclose()
+        record_query(name, time.perf_counter() - start, total)
+
+
+def observe_acquire(pool: str, seconds: float) -> None:
+    CONNECTION_ACQUIRE.observe(seconds, pool=pool)
@@ -0,0 +1,324 @@
+# database/migrations.py
+"""
+Migrações versionadas do schema (tabela, índices e constraints).
+
+Cada migração tem um número de versão e roda uma única vez; as versões
+aplicadas ficam em schema_migrations. apply_migrations() é idempotente e
+pode ser chamada a cada start (CLI opção 1 e startup da API): um advisory
+lock serializa processos que sobem ao mesmo tempo.
+
+Para mudar o schema, acrescente uma Migration no fim de MIGRATIONS;
+nunca altere uma migração que já foi aplicada.
+"""
+from dataclasses import dataclass
+from typing import List, Sequence, Set, Tuple
+
+import logging
+
+from .changes import CHANGE_NOTIFY_MAX_ROWS, CHANGES_CHANNEL
+from .database import get_connection
+from .models import MAX_MARKS, MIN_MARKS
+from . import sql
+from .sql import SUBJECT_KEY
+
+# Logger
+logger = logging.getLogger("migrations")
+
+# Chave do advisory lock (qualquer bigint fixo, único neste banco)
+MIGRATIONS_LOCK_ID = 7_202_611
+
+CREATE_MIGRATIONS_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INT PRIMARY KEY,
+    name VARCHAR(200) NOT NULL,
+    applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+"""
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    statements: Tuple[str, ...]
+
+
+MIGRATIONS: Sequence[Migration] = (
+    Migration(1, "create students table", (sql.CREATE_STUDENTS_TABLE,)),
+    Migration(
+        2,
+        "indexes for filters and ordering by marks",
+        (
+            # filtro por disciplina + top N por disciplina (ORDER BY marks DESC)
+            "CREATE INDEX IF NOT EXISTS idx_students_subject_marks "
+            "ON students (subject, marks DESC, student_id);",
+            # filtro por gênero
+            "CREATE INDEX IF NOT EXISTS idx_students_gender ON students (gender);",
+            # top N geral: ORDER BY marks DESC, student_id
+            "CREATE INDEX IF NOT EXISTS idx_students_marks "
+            "ON students (marks DESC, student_id);",
+        ),
+    ),
+    Migration(
+        3,
+        "check constraints for marks and age",
+        (
+            # NOT VALID: vale para as escritas novas sem reler as linhas
+            # antigas (tabelas da versão inicial podem ter notas fora da
+            # faixa, e a migração não pode impedir a API de subir). Depois
+            # de corrigir essas linhas: ALTER TABLE students VALIDATE CONSTRAINT ...
+            "ALTER TABLE students ADD CONSTRAINT students_marks_range "
+            f"CHECK (marks BETWEEN {MIN_MARKS} AND {MAX_MARKS}) NOT VALID;",
+            "ALTER TABLE students ADD CONSTRAINT students_age_non_negative "
+            "CHECK (age >= 0) NOT VALID;",
+        ),
+    ),
+    Migration(
+        4,
+        "per-subject mark aggregates maintained by triggers",
+        (
+            f"""
+            CREATE TABLE subject_mark_stats (
+                subject_key TEXT GENERATED ALWAYS AS ({SUBJECT_KEY.format(column="subject")}) STORED
+                    PRIMARY KEY,
+                subject VARCHAR(100),
+                student_count BIGINT NOT NULL,
+                mark_count BIGINT NOT NULL,
+                mark_sum BIGINT NOT NULL,
+                mark_sumsq BIGINT NOT NULL,
+                min_marks INT,
+                max_marks INT
+            );
+            """,
+            # Triggers por statement: uma carga em lote atualiza cada
+            # disciplina uma vez, com os deltas agregados das transition tables
+            f"""
+            CREATE FUNCTION subject_mark_stats_apply() RETURNS trigger
+            LANGUAGE plpgsql AS $$
+            BEGIN
+                IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                    INSERT INTO subject_mark_stats AS s
+                        (subject, student_count, mark_count, mark_sum, mark_sumsq,
+                         min_marks, max_marks)
+                    SELECT subject, COUNT(*), COUNT(marks), COALESCE(SUM(marks), 0),
+                           COALESCE(SUM(marks::bigint * marks), 0), MIN(marks), MAX(marks)
+                    FROM new_rows
+                    GROUP BY subject
+                    ON CONFLICT (subject_key) DO UPDATE
+                    SET student_count = s.student_count + EXCLUDED.student_count,
+                        mark_count = s.mark_count + EXCLUDED.mark_count,
+                        mark_sum = s.mark_sum + EXCLUDED.mark_sum,
+                        mark_sumsq = s.mark_sumsq + EXCLUDED.mark_sumsq,
+                        min_marks = LEAST(s.min_marks, EXCLUDED.min_marks),
+                        max_marks = GREATEST(s.max_marks, EXCLUDED.max_marks);
+                END IF;
+
+                IF TG_OP IN ('DELETE', 'UPDATE') THEN
+                    -- mín./máx. não se desfazem por subtração: são relidos
+                    -- pelo índice (subject, marks) só nas disciplinas afetadas
+                    UPDATE subject_mark_stats s
+                    SET student_count = s.student_count - d.student_count,
+                        mark_count = s.mark_count - d.mark_count,
+                        mark_sum = s.mark_sum - d.mark_sum,
+                        mark_sumsq = s.mark_sumsq - d.mark_sumsq,
+                        min_marks = CASE WHEN s.subject IS NULL
+                            THEN (SELECT MIN(marks) FROM students WHERE subject IS NULL)
+                            ELSE (SELECT MIN(marks) FROM students WHERE subject = s.subject) END,
+                        max_marks = CASE WHEN s.subject IS NULL
+                            THEN (SELECT MAX(marks) FROM students WHERE subject IS NULL)
+                            ELSE (SELECT MAX(marks) FROM students WHERE subject = s.subject) END
+                    FROM (
+                        SELECT subject, COUNT(*) AS student_count, COUNT(marks) AS mark_count,
+                               COALESCE(SUM(marks), 0) AS mark_sum,
+                               COALESCE(SUM(marks::bigint * marks), 0) AS mark_sumsq
+                        FROM old_rows
+                        GROUP BY subject
+                    ) d
+                    WHERE s.subject_key = {SUBJECT_KEY.format(column="d.subject")};
+
+                    DELETE FROM subject_mark_stats WHERE student_count = 0;
+                END IF;
+
+                RETURN NULL;
+            END;
+            $$;
+            """,
+            """
+            CREATE FUNCTION subject_mark_stats_truncate() RETURNS trigger
+            LANGUAGE plpgsql AS $$
+            BEGIN
+                TRUNCATE subject_mark_stats;
+                RETURN NULL;
+            END;
+            $$;
+            """,
+            "CREATE TRIGGER students_stats_insert AFTER INSERT ON students "
+            "REFERENCING NEW TABLE AS new_rows "
+            "FOR EACH STATEMENT EXECUTE FUNCTION subject_mark_stats_apply();",
+            "CREATE TRIGGER students_stats_update AFTER UPDATE ON students "
+            "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+            "FOR EACH STATEMENT EXECUTE FUNCTION subject_mark_stats_apply();",
+            "CREATE TRIGGER students_stats_delete AFTER DELETE ON students "
+            "REFERENCING OLD TABLE AS old_rows "
+            "FOR EACH STATEMENT EXECUTE FUNCTION subject_mark_stats_apply();",
+            "CREATE TRIGGER students_stats_truncate AFTER TRUNCATE ON students "
+            "FOR EACH STATEMENT EXECUTE FUNCTION subject_mark_stats_truncate();",
+            # carga inicial com os dados já existentes
+            sql.REBUILD_SUBJECT_MARK_STATS,
+        ),
+    ),
+    Migration(
+        5,
+        "change notifications (LISTEN/NOTIFY) for the change feed",
+        (
+            # Um NOTIFY por linha alterada; statements grandes (carga em
+            # lote) mandam um único reset. As notificações só saem no COMMIT.
+            f"""
+            CREATE FUNCTION students_notify_changes() RETURNS trigger
+            LANGUAGE plpgsql AS $$
+            DECLARE
+                changed BIGINT;
+                r RECORD;
+            BEGIN
+                IF TG_OP = 'TRUNCATE' THEN
+                    PERFORM pg_notify('{CHANGES_CHANNEL}', '{{"op": "reset"}}');
+                    RETURN NULL;
+                END IF;
+
+                IF TG_OP = 'DELETE' THEN
+                    SELECT COUNT(*) INTO changed FROM old_rows;
+                ELSE
+                    SELECT COUNT(*) INTO changed FROM new_rows;
+                END IF;
+                IF changed = 0 THEN
+                    RETURN NULL;
+                END IF;
+                IF changed > {CHANGE_NOTIFY_MAX_ROWS} THEN
+                    PERFORM pg_notify('{CHANGES_CHANNEL}', '{{"op": "reset"}}');
+                    RETURN NULL;
+                END IF;
+
+                IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                    FOR r IN SELECT * FROM new_rows ORDER BY student_id LOOP
+                        PERFORM pg_notify('{CHANGES_CHANNEL}', json_build_object(
+                            'op', 'upsert', 'student_id', r.student_id, 'row', row_to_json(r)
+                        )::text);
+                    END LOOP;
+                END IF;
+
+                IF TG_OP = 'DELETE' THEN
+                    FOR r IN SELECT student_id FROM old_rows ORDER BY student_id LOOP
+                        PERFORM pg_notify('{CHANGES_CHANNEL}', json_build_object(
+                            'op', 'delete', 'student_id', r.student_id
+                        )::text);
+                    END LOOP;
+                END IF;
+
+                IF TG_OP = 'UPDATE' THEN
+                    -- student_id alterado: o ID antigo deixou de existir
+                    FOR r IN
+                        SELECT o.student_id FROM old_rows o
+                        WHERE NOT EXISTS (SELECT 1 FROM new_rows n WHERE n.student_id = o.student_id)
+                    LOOP
+                        PERFORM pg_notify('{CHANGES_CHANNEL}', json_build_object(
+                            'op', 'delete', 'student_id', r.student_id
+                        )::text);
+                    END LOOP;
+                END IF;
+
+                RETURN NULL;
+            END;
+            $$;
+            """,
+            "CREATE TRIGGER students_notify_insert AFTER INSERT ON students "
+            "REFERENCING NEW TABLE AS new_rows "
+            "FOR EACH STATEMENT EXECUTE FUNCTION students_notify_changes();",
+            "CREATE TRIGGER students_notify_update AFTER UPDATE ON students "
+            "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows "
+            "FOR EACH STATEMENT EXECUTE FUNCTION students_notify_changes();",
+            "CREATE TRIGGER students_notify_delete AFTER DELETE ON students "
+            "REFERENCING OLD TABLE AS old_rows "
+            "FOR EACH STATEMENT EXECUTE FUNCTION students_notify_changes();",
+            "CREATE TRIGGER students_notify_truncate AFTER TRUNCATE ON students "
+            "FOR EACH STATEMENT EXECUTE FUNCTION students_notify_changes();",
+        ),
+    ),
+    Migration(
+        6,
+        "table version for HTTP validators (ETag / Last-Modified)",
+        (
+            """
+            CREATE TABLE table_versions (
+                table_name TEXT PRIMARY KEY,
+                version BIGINT NOT NULL,
+                updated_at TIMESTAMPTZ NOT NULL
+            );
+            """,
+            "INSERT INTO table_versions (table_name, version, updated_at) "
+            "VALUES ('students', 0, clock_timestamp());",
+            # Um incremento por statement (não por linha); clock_timestamp e
+            # GREATEST: updated_at é o instante da escrita e nunca volta
+            """
+            CREATE FUNCTION table_versions_bump() RETURNS trigger
+            LANGUAGE plpgsql AS $$
+            BEGIN
+                UPDATE table_versions
+                SET version = version + 1,
+                    updated_at = GREATEST(updated_at, clock_timestamp())
+                WHERE table_name = TG_TABLE_NAME;
+                RETURN NULL;
+            END;
+            $$;
+            """,
+            "CREATE TRIGGER students_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE "
+            "ON students FOR EACH STATEMENT EXECUTE FUNCTION table_versions_bump();",
+        ),
+    ),
+)
+
+
+def get_applied_versions() -> Set[int]:
+    """Versões já aplicadas neste banco."""
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(CREATE_MIGRATIONS_TABLE)
+            cur.execute("SELECT version FROM schema_migrations;")
+            return {row[0] for row in cur.fetchall()}
+
+
+def apply_migrations(migrations: Sequence[Migration] = MIGRATIONS) -> List[int]:
+    """
+    Aplica as migrações pendentes, em ordem, em uma única transação.
+    Retorna as versões aplicadas agora (lista vazia se já estava em dia).
+    """
+    applied_now: List[int] = []
+    with get_connection() as conn:
+        conn.autocommit = False
+        try:
+            with conn:
+                with conn.cursor() as cur:
+                    # liberado no fim da transação
+                    cur.execute("SELECT pg_advisory_xact_lock(%s);", (MIGRATIONS_LOCK_ID,))
+                    cur.execute(CREATE_MIGRATIONS_TABLE)
+                    cur.execute("SELECT version FROM schema_migrations;")
+                    applied = {row[0] for row in cur.fetchall()}
+
+                    for migration in sorted(migrations, key=lambda m: m.version):
+                        if migration.version in applied:
+                            continue
+                        logger.info(
+                            f"[DB] Applying migration {migration.version}: {migration.name}"
+                        )
+                        for statement in migration.statements:
+                            cur.execute(statement)
+                        cur.execute(
+                            "INSERT INTO schema_migrations (version, name) VALUES (%s, %s);",
+                            (migration.version, migration.name),
+                        )
+                        applied_now.append(migration.version)
+        finally:
+            conn.autocommit = True
+
+    if applied_now:
+        logger.info(f"[DB] Schema migrated to version {applied_now[-1]}")
+    return applied_now
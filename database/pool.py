@@ -0,0 +1,291 @@
+# database/pool.py
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+# Logger
+logger = logging.getLogger("pool")
+
+
+class PoolTimeout(Exception):
+    """Nenhuma conexão ficou disponível dentro do tempo limite."""
+
+
+class PoolClosed(Exception):
+    """O pool já foi fechado (ex.: shutdown da API)."""
+
+
+def ping_connection(conn: Any) -> bool:
+    """
+    Health check padrão: executa um SELECT 1.
+    Retorna False se a conexão estiver quebrada.
+    """
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1;")
+            cur.fetchone()
+        return True
+    except Exception:
+        return False
+
+
+class ConnectionPool:
+    """
+    Pool de conexões thread-safe.
+
+    - mantém entre min_size e max_size conexões abertas
+    - faz health check no checkout de conexões que ficaram ociosas
+      mais do que check_after segundos
+    - descarta conexões mais velhas que max_lifetime ou ociosas há mais
+      de max_idle segundos (respeitando min_size para as ociosas)
+    - expõe estatísticas via stats()
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        min_size: int = 1,
+        max_size: int = 10,
+        timeout: float = 30.0,
+        max_lifetime: float = 3600.0,
+        max_idle: float = 600.0,
+        check_after: float = 5.0,
+        check: Callable[[Any], bool] = ping_connection,
+    ):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(
+                f"Invalid pool size (min_size={min_size}, max_size={max_size})"
+            )
+        self._connect = connect
+        self._check = check
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.max_idle = max_idle
+        self.check_after = check_after
+
+        self._cond = threading.Condition(threading.Lock())
+        # ociosas: (conexão, criada_em, devolvida_em); a mais recente fica à direita
+        self._idle: Deque[Tuple[Any, float, float]] = deque()
+        # em uso: id(conexão) -> criada_em
+        self._in_use: Dict[int, float] = {}
+        # slots reservados para conexões sendo abertas fora do lock
+        self._opening = 0
+        self._closed = False
+
+        self._counters = {
+            "requests": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "connections_opened": 0,
+            "connections_closed": 0,
+            "health_check_failures": 0,
+        }
+        self._wait_time_total = 0.0
+
+        for _ in range(min_size):
+            self._idle.append(self._open_new())
+
+    # ======== Helpers internos ========
+
+    def _size(self) -> int:
+        return len(self._idle) + len(self._in_use) + self._opening
+
+    def _open_new(self) -> Tuple[Any, float, float]:
+        conn = self._connect()
+        now = time.monotonic()
+        with self._cond:
+            self._counters["connections_opened"] += 1
+        return conn, now, now
+
+    def _close_conn(self, conn: Any) -> None:
+        with self._cond:
+            self._counters["connections_closed"] += 1
+        try:
+            conn.close()
+        except Exception:
+            logger.warning("[POOL] Error while closing connection", exc_info=True)
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return self.max_lifetime > 0 and now - created_at > self.max_lifetime
+
+    def _evict_idle(self, now: float) -> list:
+        """Remove (sem fechar) as ociosas que passaram de max_idle/max_lifetime."""
+        evicted = []
+        kept: Deque[Tuple[Any, float, float]] = deque()
+        # percorre da mais antiga para a mais recente
+        while self._idle:
+            conn, created_at, returned_at = self._idle.popleft()
+            idle_too_long = (
+                self.max_idle > 0
+                and now - returned_at > self.max_idle
+                and self._size() + len(kept) >= self.min_size
+            )
+            if self._is_expired(created_at, now) or idle_too_long:
+                evicted.append(conn)
+            else:
+                kept.append((conn, created_at, returned_at))
+        self._idle = kept
+        return evicted
+
+    # ======== API pública ========
+
+    def getconn(self, timeout: Optional[float] = None) -> Any:
+        """
+        Retira uma conexão do pool.
+        Bloqueia até timeout segundos se o pool estiver no tamanho máximo.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        started = time.monotonic()
+        counted = False
+        waited = False
+
+        while True:
+            to_close = []
+            candidate = None
+            must_open = False
+
+            with self._cond:
+                if self._closed:
+                    raise PoolClosed("Connection pool is closed")
+                if not counted:
+                    self._counters["requests"] += 1
+                    counted = True
+
+                now = time.monotonic()
+                to_close = self._evict_idle(now)
+
+                if self._idle:
+                    candidate = self._idle.pop()
+                    self._in_use[id(candidate[0])] = candidate[1]
+                elif self._size() < self.max_size:
+                    self._opening += 1
+                    must_open = True
+                else:
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self._counters["timeouts"] += 1
+                        raise PoolTimeout(
+                            f"No connection available after {timeout:.1f}s "
+                            f"(max_size={self.max_size})"
+                        )
+                    if not waited:
+                        self._counters["waits"] += 1
+                        waited = True
+                    self._cond.wait(remaining)
+
+            for conn in to_close:
+                self._close_conn(conn)
+
+            if must_open:
+                try:
+                    conn, created_at, _ = self._open_new()
+                except Exception:
+                    with self._cond:
+                        self._opening -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._opening -= 1
+                    self._in_use[id(conn)] = created_at
+                    self._wait_time_total += time.monotonic() - started
+                return conn
+
+            if candidate is None:
+                continue
+
+            conn, created_at, returned_at = candidate
+            healthy = not getattr(conn, "closed", False)
+            if healthy and time.monotonic() - returned_at >= self.check_after:
+                healthy = self._check(conn)
+
+            if healthy:
+                with self._cond:
+                    self._wait_time_total += time.monotonic() - started
+                return conn
+
+            # conexão quebrada: descarta e tenta de novo
+            logger.warning("[POOL] Discarding connection that failed health check")
+            with self._cond:
+                self._counters["health_check_failures"] += 1
+                self._in_use.pop(id(conn), None)
+                self._cond.notify()
+            self._close_conn(conn)
+
+    def putconn(self, conn: Any, discard: bool = False) -> None:
+        """
+        Devolve uma conexão ao pool.
+        Transações pendentes são desfeitas; conexões quebradas, expiradas
+        ou marcadas com discard=True são fechadas.
+        """
+        with self._cond:
+            created_at = self._in_use.pop(id(conn), None)
+        if created_at is None:
+            raise ValueError("Connection does not belong to this pool")
+
+        now = time.monotonic()
+        if not discard and not getattr(conn, "closed", False):
+            discard = self._is_expired(created_at, now) or not self._reset(conn)
+        else:
+            discard = True
+
+        with self._cond:
+            if discard or self._closed:
+                to_close = True
+            else:
+                to_close = False
+                self._idle.append((conn, created_at, now))
+            self._cond.notify()
+
+        if to_close:
+            self._close_conn(conn)
+
+    def _reset(self, conn: Any) -> bool:
+        """Desfaz transação aberta antes de devolver ao pool."""
+        try:
+            status = conn.info.transaction_status
+        except Exception:
+            return True
+        # 0 = psycopg2.extensions.TRANSACTION_STATUS_IDLE
+        if status == 0:
+            return True
+        try:
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def close(self) -> None:
+        """Fecha todas as conexões ociosas; as em uso são fechadas ao voltar."""
+        with self._cond:
+            self._closed = True
+            idle = [conn for conn, _, _ in self._idle]
+            self._idle.clear()
+            self._cond.notify_all()
+        for conn in idle:
+            self._close_conn(conn)
+        logger.info("[POOL] Connection pool closed")
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna um snapshot das estatísticas do pool."""
+        with self._cond:
+            served = self._counters["requests"] - self._counters["timeouts"]
+            return {
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "size": self._size(),
+                "idle": len(self._idle),
+                "in_use": len(self._in_use),
+                **self._counters,
+                "avg_wait_ms": round(
+                    (self._wait_time_total / served) * 1000, 3
+                ) if served else 0.0,
+            }
@@ -0,0 +1,135 @@
+# database/postgres_changes.py
+"""
+Listener do feed de alterações no PostgreSQL.
+
+Uma conexão asyncpg dedicada (fora do pool, que não pode ficar presa)
+faz LISTEN no canal dos triggers da migração 5 e repassa cada notificação
+para o feed do processo (database/changes.py). Escritas de outros
+processos também invalidam o cache.
+
+Se a conexão cai, o feed volta à publicação local e o listener tenta
+reconectar com backoff exponencial. Ao voltar, refaz o LISTEN, limpa o
+cache e publica um reset: o que aconteceu durante a queda se perdeu.
+"""
+import asyncio
+import json
+from typing import Optional
+
+import asyncpg
+import logging
+
+from .async_database import connection_kwargs
+from .cache import invalidate_student
+from .changes import CHANGES_CHANNEL, RESET, ChangeFeed, get_change_feed
+
+# Logger
+logger = logging.getLogger("postgres_changes")
+
+# Espera antes de cada tentativa de reconexão: dobra a cada falha, até o máximo
+RECONNECT_MIN_DELAY = 0.5
+RECONNECT_MAX_DELAY = 30.0
+
+
+class PostgresChangeListener:
+    def __init__(
+        self,
+        feed: ChangeFeed,
+        min_delay: float = RECONNECT_MIN_DELAY,
+        max_delay: float = RECONNECT_MAX_DELAY,
+    ):
+        self.feed = feed
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self._conn: Optional[asyncpg.Connection] = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._stopped = False
+
+    async def start(self) -> None:
+        self._stopped = False
+        await self._connect()
+        logger.info(f"[DB] Listening for changes on '{CHANGES_CHANNEL}'")
+
+    async def _connect(self) -> None:
+        conn = await asyncpg.connect(**connection_kwargs())
+        try:
+            await conn.add_listener(CHANGES_CHANNEL, self._on_notification)
+        except BaseException:
+            await conn.close()
+            raise
+        conn.add_termination_listener(self._on_termination)
+        self._conn = conn
+        self.feed.native = True
+
+    async def stop(self) -> None:
+        self._stopped = True
+        task, self._reconnect_task = self._reconnect_task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self.feed.native = False
+        conn, self._conn = self._conn, None
+        if conn is not None and not conn.is_closed():
+            await conn.remove_listener(CHANGES_CHANNEL, self._on_notification)
+            await conn.close()
+
+    def _on_notification(self, conn, pid: int, channel: str, payload: str) -> None:
+        try:
+            change = json.loads(payload)
+            op = change["op"]
+        except (ValueError, KeyError):
+            logger.warning(f"[DB] Invalid change notification: {payload!r:.200}")
+            return
+        student_id = change.get("student_id")
+        # a escrita pode ter vindo de outro processo: o cache local fica velho
+        invalidate_student(None if op == RESET else student_id)
+        self.feed.publish(op, student_id, change.get("row"))
+
+    def _on_termination(self, conn) -> None:
+        # conexão fechada pelo stop() (ou já substituída): nada a fazer
+        if self._stopped or conn is not self._conn:
+            return
+        # sem o LISTEN, as escritas deste processo voltam a ser publicadas localmente
+        logger.warning("[DB] Change listener connection lost, reconnecting")
+        self._conn = None
+        self.feed.native = False
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._reconnect_task = asyncio.get_running_loop().create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        delay = self.min_delay
+        while not self._stopped:
+            await asyncio.sleep(delay)
+            try:
+                await self._connect()
+            except Exception as e:
+                delay = min(delay * 2, self.max_delay)
+                logger.warning(f"[DB] Change listener reconnect failed ({e}), retrying in {delay:g}s")
+                continue
+            logger.info(f"[DB] Change listener reconnected to '{CHANGES_CHANNEL}'")
+            # notificações perdidas na queda: cache e clientes recarregam
+            invalidate_student(None)
+            self.feed.publish(RESET)
+            return
+
+
+_listener: Optional[PostgresChangeListener] = None
+
+
+async def start_change_listener() -> None:
+    """Chamado no startup da API com o backend PostgreSQL."""
+    global _listener
+    if _listener is not None:
+        return
+    listener = PostgresChangeListener(get_change_feed())
+    await listener.start()
+    _listener = listener
+
+
+async def stop_change_listener() -> None:
+    global _listener
+    listener, _listener = _listener, None
+    if listener is not None:
+        await listener.stop()
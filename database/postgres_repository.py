@@ -0,0 +1,366 @@
+# database/postgres_repository.py
+"""
+Repositório PostgreSQL (psycopg2 + pool de database/database.py).
+O SQL fica em database/sql.py, compartilhado com a camada asyncpg.
+"""
+import csv
+import io
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import logging
+
+from .database import close_pool, get_connection
+from .ingest import IteratorFile
+from .migrations import apply_migrations
+from .models import BatchOperation, BulkResult, Student
+from .repository import (
+    BULK_CHUNK_SIZE,
+    STREAM_CHUNK_SIZE,
+    MarkSummary,
+    StudentRepository,
+    batch_outcome,
+    iter_id_chunks,
+    iter_valid_students,
+)
+from . import sql
+from .sql import row_to_student, rows_to_students, student_values
+from .table_version import TableVersion, table_version_from_row
+
+# Logger
+logger = logging.getLogger("postgres_repository")
+
+CREATE_STAGING_TABLE = """
+CREATE TEMP TABLE students_staging (
+    seq BIGSERIAL,
+    student_id INT,
+    name VARCHAR(100),
+    age INT,
+    gender VARCHAR(10),
+    subject VARCHAR(100),
+    marks INT
+) ON COMMIT DROP;
+"""
+
+
+def _bulk_csv_chunks(students: Iterable[Student]) -> Iterator[str]:
+    """Serializa os estudantes em blocos CSV para o COPY."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    pending = 0
+    for student in students:
+        writer.writerow(student_values(student))
+        pending += 1
+        if pending >= BULK_CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+
+    if pending:
+        yield buffer.getvalue()
+
+
+def _bulk_merge_query(mode: str) -> str:
+    if mode == "upsert":
+        conflict = """
+        ON CONFLICT (student_id) DO UPDATE
+        SET name = EXCLUDED.name,
+            age = EXCLUDED.age,
+            gender = EXCLUDED.gender,
+            subject = EXCLUDED.subject,
+            marks = EXCLUDED.marks
+        """
+    else:
+        conflict = "ON CONFLICT (student_id) DO NOTHING"
+
+    return f"""
+    WITH latest AS (
+        SELECT DISTINCT ON (student_id)
+               student_id, name, age, gender, subject, marks
+        FROM students_staging
+        ORDER BY student_id, seq DESC
+    ),
+    merged AS (
+        INSERT INTO students (student_id, name, age, gender, subject, marks)
+        SELECT student_id, name, age, gender, subject, marks FROM latest
+        {conflict}
+        RETURNING (xmax = 0) AS inserted
+    )
+    SELECT
+        (SELECT count(*) FROM students_staging),
+        (SELECT count(*) FROM latest),
+        count(*) FILTER (WHERE inserted),
+        count(*) FILTER (WHERE NOT inserted)
+    FROM merged;
+    """
+
+
+class PostgresRepository(StudentRepository):
+    name = "postgres"
+
+    # ======== Schema ========
+
+    def create_schema(self) -> List[int]:
+        return apply_migrations()
+
+    def close(self) -> None:
+        close_pool()
+
+    def get_table_version(self) -> Optional[TableVersion]:
+        with get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql.SELECT_TABLE_VERSION)
+                row = cur.fetchone()
+
+        return table_version_from_row(row)
+
+    # ======== CRUD ========
+
+    def insert_student(self, student: Student) -> bool:
+        # ON CONFLICT detecta o ID duplicado no próprio INSERT (um round-trip só)
+        with get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql.INSERT_STUDENT, student_values(student))
+                return cur.rowcount > 0
+
+    def upsert_student(self, student: Student) -> bool:
+        with get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql.UPSERT_STUDENT, student_values(student))
+                return cur.fetchone()[0]
+
+    def get_student_by_id(self, student_id: int) -> Optional[Student]:
+        with get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql.SELECT_STUDENT_BY_ID, (student_id,))
+                row = cur.fetchone()
+
+        return row_to_student(row) if row is not None else None
+
+    def update_student(self, student: Student) -> bool:
+        values = student_values(student)
+        with get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql.UPDATE_STUDENT, values[1:] + values[:1])
+                return cur.rowcount > 0
+
+    def update_student_fields(self, student_id: int, fields: Dict[str, Any]) -> Optional[Student]:
+        if not fields:
+            return self.get_student_by_id(student_id)
+
+        query, values = sql.build_update_fields_query(student_id, fields)
+        with get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(query, values)
+                row = cur.fetchone()
+
+        return row_to_student(row) if row is not None else None
+
+    def delete_student_by_id(self, student_id: int) -> bool:
+        with get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql.DELETE_STUDENT_BY_ID, (student_id,))
+                # rowcount = número de linhas afetadas pelo DELETE
+                return cur.rowcount > 0
+
+    def bulk_insert_students(self, records: Iterable[Any], mode: str = "upsert") -> BulkResult:
+        """COPY para uma tabela temporária + merge em students."""
+        if mode not in ("upsert", "insert"):
+            raise ValueError(f"Invalid bulk mode: {mode}")
+
+        result = BulkResult()
+        with get_connection() as conn:
+            conn.autocommit = False
+            try:
+                with conn:
+                    with conn.cursor() as cur:
+                        cur.execute(CREATE_STAGING_TABLE)
+                        source = IteratorFile(
+                            _bulk_csv_chunks(iter_valid_students(records, result))
+                        )
+                        try:
+                            cur.copy_expert(
+                                "COPY students_staging "
+                                "(student_id, name, age, gender, subject, marks) "
+                                "FROM STDIN WITH (FORMAT csv)",
+                                source,
+                            )
+                        except Exception:
+                            # erro ao ler a entrada (ex.: JSON malformado): propaga o original
+                            if source.error is not None:
+                                raise source.error from None
+                            raise
+                        cur.execute(_bulk_merge_query(mode))
+                        staged, distinct, inserted, updated = cur.fetchone()
+            finally:
+                conn.autocommit = True
+
+        result.inserted = inserted
+        result.updated = updated
+        # duplicados dentro da carga + IDs já existentes no modo insert
+        result.rejected += (staged - distinct) + (distinct - inserted - updated)
+        return result
+
+    def apply_batch(self, operations: Sequence[BatchOperation]) -> List[Optional[Student]]:
+        results: List[Optional[Student]] = []
+        with get_connection() as conn:
+            conn.autocommit = False
+            try:
+                # with conn: COMMIT no fim, ROLLBACK se alguma operação falhar
+                with conn:
+                    with conn.cursor() as cur:
+                        for index, operation in enumerate(operations):
+                            cur.execute(*sql.build_batch_statement(operation))
+                            results.append(batch_outcome(index, operation, cur.fetchone()))
+            finally:
+                conn.autocommit = True
+        return results
+
+    def delete_students(self, student_ids: Iterable[int]) -> int:
+        deleted = 0
+        with get_connection() as conn:
+            conn.autocommit = False
+            try:
+                with conn:
+                    with conn.cursor() as cur:
+                        for chunk in iter_id_chunks(student_ids):
+                            cur.execute(*sql.build_delete_students(chunk))
+                            deleted += len(cur.fetchall())
+            finally:
+                conn.autocommit = True
+        return deleted
+
+    # ======== Leituras em lista ========
+
+    def get_all_students(self) -> List[Student]:
+        with get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql.SELECT_ALL_STUDENTS)
+                rows = cur.fetchall()
+
+        return rows_to_students(rows)
+
+    def iter_student_rows(
+        self,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+        subject: Optional[str] = None,
+        gender: Optional[str] = None,
+    ) -> Iterator[List[tuple]]:
+        """
+        Cursor nomeado (server-side): a memória fica constante, não importa o
+        tamanho da tabela. A conexão fica emprestada até o gerador terminar.
+        """
+        query, params = sql.build_stream_query(subject, gender)
+        with get_connection() as conn:
+            # cursores nomeados só existem dentro de uma transação
+            conn.autocommit = False
+            try:
+                with conn.cursor(name="students_stream") as cur:
+                    cur.itersize = chunk_size
+                    cur.execute(query, params)
+                    while True:
+                        rows = cur.fetchmany(chunk_size)
+                        if not rows:
+                            break
+                        yield rows
+            finally:
+                conn.rollback()
+                conn.autocommit = True
+
+    def get_students_page_rows(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[int] = None,
+        subject: Optional[str] = None,
+        gender: Optional[str] = None,
+        min_marks: Optional[int] = None,
+        max_marks: Optional[int] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Tuple[List[str], List[tuple]]:
+        query, params, columns = sql.build_students_page_query(
+            limit, after, subject, gender, min_marks, max_marks, fields
+        )
+        with get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(query, params)
+                rows = cur.fetchall()
+
+        return columns, rows
+
+    # ======== Analytics ========
+
+    def get_mark_stats(
+        self, subject: Optional[str] = None, gender: Optional[str] = None
+    ) -> Dict[str, Any]:
+        query, params = sql.build_mark_stats_query(subject, gender)
+        with get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(query, params)
+                row = cur.fetchone()
+
+        return sql.mark_stats_from_row(row)
+
+    def get_subject_mark_stats(
+        self, subject: Optional[str] = None, gender: Optional[str] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        query, params = sql.build_subject_stats_query(subject, gender)
+        with get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(query, params)
+                rows = cur.fetchall()
+
+        return sql.subject_stats_from_rows(rows)
+
+    def get_facets(self) -> Dict[str, List[str]]:
+        with get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql.SELECT_FACETS)
+                rows = cur.fetchall()
+
+        return sql.facets_from_rows(rows)
+
+    def get_top_students_by_marks(
+        self, limit: int = 5, subject: Optional[str] = None, gender: Optional[str] = None
+    ) -> List[Student]:
+        query, params = sql.build_top_students_query(limit, subject, gender)
+        with get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(query, params)
+                rows = cur.fetchall()
+
+        return rows_to_students(rows)
+
+    def get_mark_summary(
+        self,
+        top_n: int = 5,
+        percentiles: Sequence[float] = (0.25, 0.5, 0.75, 0.9),
+        subject: Optional[str] = None,
+        gender: Optional[str] = None,
+    ) -> MarkSummary:
+        query, params = sql.build_mark_summary_query(top_n, percentiles, subject, gender)
+        with get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(query, params)
+                rows = cur.fetchall()
+
+        return sql.mark_summary_from_rows(rows, percentiles)
+
+    def rebuild_subject_mark_stats(self) -> None:
+        with get_connection() as conn:
+            conn.autocommit = False
+            try:
+                with conn:
+                    with conn.cursor() as cur:
+                        # bloqueia escritas em students durante o recálculo
+                        cur.execute("LOCK TABLE students IN SHARE MODE;")
+                        cur.execute(sql.REBUILD_SUBJECT_MARK_STATS)
+            finally:
+                conn.autocommit = True
+
+    def check_subject_mark_stats(self) -> List[Dict[str, Any]]:
+        with get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql.CHECK_SUBJECT_MARK_STATS)
+                rows = cur.fetchall()
+
+        return sql.subject_stats_mismatches_from_rows(rows)
@@ -1,137 +1,331 @@
 # database/queries.py
-from typing import List, Optional
-from .database import get_connection
-from .models import Student
+"""
+Queries layer usado pelo CLI, API, analytics e notebook.
+
+O acesso aos dados é delegado ao repositório escolhido por DB_BACKEND
+(PostgreSQL ou SQLite, ver database/repository.py); aqui ficam o cache
+de leituras e a invalidação após escritas, iguais para todos os backends.
+@timed_query (por dentro do @cached) mede tempo e linhas de cada chamada
+que vai ao banco (ver database/metrics.py).
+"""
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from .cache import STUDENT_NAMESPACE, TABLE_NAMESPACE, cached, invalidate_student, sync_table_version
+from .changes import student_changed, student_deleted, table_reset
+from .metrics import timed_chunks, timed_query
+from .models import BatchOperation, BulkResult, Student
+from .repository import STREAM_CHUNK_SIZE, MarkSummary, get_repository, validate_batch
+from .sql import rows_to_students
+from .table_version import TableVersion
+# reexportadas: a API e o CLI importam as colunas daqui
+from .sql import STUDENT_COLUMNS, UPDATABLE_COLUMNS  # noqa: F401
 import logging
 
 # Logger
 logger = logging.getLogger("queries")
 
-def create_students_table():
-    query = """
-    CREATE TABLE IF NOT EXISTS students (
-        student_id INT PRIMARY KEY,
-        name VARCHAR(100) NOT NULL,
-        age INT,
-        gender VARCHAR(10),
-        subject VARCHAR(100),
-        marks INT
-    );
-    """
-    with get_connection() as conn:
-        with conn.cursor() as cur:
-            cur.execute(query)
 
+def create_students_table() -> List[int]:
+    """
+    Cria/atualiza o schema (tabela, índices, constraints) via migrações.
+    Retorna as versões de migração aplicadas agora.
+    """
+    return get_repository().create_schema()
+
+@timed_query
 def insert_student(student: Student) -> bool:
     """
     Insere um estudante.
     Retorna True se inseriu com sucesso.
     Retorna False se o ID já existe.
     """
-    # 1. checa se já existe
-    existing = get_student_by_id(student.student_id)
-    if existing is not None:
-        # já existe aluno com esse ID
-        return False
-
-    # 2. se não existe, insere
-    query = """
-    INSERT INTO students (student_id, name, age, gender, subject, marks)
-    VALUES (%s, %s, %s, %s, %s, %s);
-    """
-    values = (
-        student.student_id,
-        student.name,
-        student.age,
-        student.gender,
-        student.subject,
-        student.marks,
-    )
-    with get_connection() as conn:
-        with conn.cursor() as cur:
-            cur.execute(query, values)
+    inserted = get_repository().insert_student(student)
+    if inserted:
+        invalidate_student(student.student_id)
+        student_changed(student)
+    return inserted
 
-    return True
+@timed_query(rows=lambda created: 1)
+def upsert_student(student: Student) -> bool:
+    """
+    Insere o estudante ou substitui todos os campos se o ID já existe.
+    Retorna True se foi criado, False se um registro existente foi substituído.
+    """
+    created = get_repository().upsert_student(student)
+    invalidate_student(student.student_id)
+    student_changed(student)
+    return created
 
+@cached(TABLE_NAMESPACE)
+@timed_query
 def get_all_students() -> List[Student]:
     logger.info("[DB] Executing query: SELECT * FROM students")
-    query = "SELECT student_id, name, age, gender, subject, marks FROM students;"
-    with get_connection() as conn:
-        with conn.cursor() as cur:
-            cur.execute(query)
-            rows = cur.fetchall()
-
-    return [
-        Student(
-            student_id=row[0],
-            name=row[1],
-            age=row[2],
-            gender=row[3],
-            subject=row[4],
-            marks=row[5],
-        )
-        for row in rows
-    ]
+    return get_repository().get_all_students()
+
+def iter_student_rows(
+    chunk_size: int = STREAM_CHUNK_SIZE,
+    subject: Optional[str] = None,
+    gender: Optional[str] = None,
+) -> Iterator[List[tuple]]:
+    """
+    Lê a tabela inteira em blocos de até chunk_size tuplas, ordenados por
+    student_id: a memória fica constante, não importa o tamanho da tabela.
+    No PostgreSQL a conexão fica emprestada até o gerador terminar ou ser fechado.
+    """
+    return timed_chunks(
+        "iter_student_rows",
+        get_repository().iter_student_rows(chunk_size, subject=subject, gender=gender),
+    )
+
+def iter_students(
+    chunk_size: int = STREAM_CHUNK_SIZE,
+    subject: Optional[str] = None,
+    gender: Optional[str] = None,
+) -> Iterator[Student]:
+    """Versão de iter_student_rows que gera um Student por linha."""
+    for rows in iter_student_rows(chunk_size, subject=subject, gender=gender):
+        yield from rows_to_students(rows)
+
+@timed_query
+def get_students_page(
+    limit: Optional[int] = None,
+    after: Optional[int] = None,
+    subject: Optional[str] = None,
+    gender: Optional[str] = None,
+    min_marks: Optional[int] = None,
+    max_marks: Optional[int] = None,
+    fields: Optional[Sequence[str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Lista estudantes com paginação por keyset (student_id > after),
+    filtros no SQL e projeção de colunas.
+    Retorna dicts só com as colunas pedidas (student_id sempre incluso,
+    pois é o cursor da próxima página).
+    limit=None retorna todas as linhas que passam nos filtros.
+    """
+    return get_repository().get_students_page(
+        limit, after, subject, gender, min_marks, max_marks, fields
+    )
+
+@timed_query(rows=lambda result: len(result[1]))
+def get_students_page_rows(
+    limit: Optional[int] = None,
+    after: Optional[int] = None,
+    subject: Optional[str] = None,
+    gender: Optional[str] = None,
+    min_marks: Optional[int] = None,
+    max_marks: Optional[int] = None,
+    fields: Optional[Sequence[str]] = None,
+) -> Tuple[List[str], List[tuple]]:
+    """
+    Igual a get_students_page, mas retorna (colunas, tuplas) sem montar
+    um dict por linha (a API serializa as tuplas direto em JSON).
+    """
+    return get_repository().get_students_page_rows(
+        limit, after, subject, gender, min_marks, max_marks, fields
+    )
+
+@cached(TABLE_NAMESPACE)
+@timed_query
+def get_mark_stats(
+    subject: Optional[str] = None, gender: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Estatísticas gerais das notas calculadas no banco.
+    Filtros opcionais por disciplina e gênero.
+    No PostgreSQL, sem filtro de gênero, lê os agregados de subject_mark_stats
+    (O(disciplinas)).
+    Retorna {} se não há estudantes.
+    """
+    return get_repository().get_mark_stats(subject=subject, gender=gender)
+
+@cached(TABLE_NAMESPACE)
+@timed_query
+def get_facets() -> Dict[str, List[str]]:
+    """
+    Valores distintos de subject e gender, ordenados (opções dos filtros).
+    Retorna: {"subjects": ["History", "Math"], "genders": ["Female", "Male"]}
+    """
+    return get_repository().get_facets()
+
+@cached(TABLE_NAMESPACE)
+@timed_query(rows=len)
+def get_subject_mark_stats(
+    subject: Optional[str] = None, gender: Optional[str] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Estatísticas de notas por disciplina.
+    No PostgreSQL, sem filtro de gênero, vêm prontas de subject_mark_stats
+    (mantida por triggers); nos demais casos, GROUP BY na tabela students.
+    Retorna: { "Math": {"count": 10, "average": 82.5, "min": 60, "max": 99}, ... }
+    Disciplinas sem nenhuma nota preenchida ficam de fora.
+    """
+    return get_repository().get_subject_mark_stats(subject=subject, gender=gender)
+
+@timed_query
+def rebuild_subject_mark_stats() -> None:
+    """
+    Recalcula os agregados por disciplina do zero a partir de students.
+    Bloqueia escritas em students durante o recálculo.
+    """
+    get_repository().rebuild_subject_mark_stats()
+    invalidate_student(None)
+    logger.info("[DB] Subject mark aggregates rebuilt")
 
+@timed_query
+def check_subject_mark_stats() -> List[Dict[str, Any]]:
+    """
+    Compara os agregados por disciplina com um recálculo completo.
+    Retorna as divergências (lista vazia = consistente).
+    """
+    mismatches = get_repository().check_subject_mark_stats()
+    if mismatches:
+        logger.warning(f"[DB] Subject mark aggregates out of sync: {len(mismatches)} subject(s)")
+    return mismatches
+
+@cached(TABLE_NAMESPACE)
+@timed_query
+def get_top_students_by_marks(
+    limit: int = 5, subject: Optional[str] = None, gender: Optional[str] = None
+) -> List[Student]:
+    """
+    Top N estudantes por nota, ordenado no banco.
+    Filtros opcionais por disciplina e gênero.
+    Empates são desempatados pelo menor student_id (ordem determinística).
+    """
+    return get_repository().get_top_students_by_marks(limit, subject=subject, gender=gender)
+
+@cached(TABLE_NAMESPACE)
+@timed_query
+def get_mark_summary(
+    top_n: int = 5,
+    percentiles: Sequence[float] = (0.25, 0.5, 0.75, 0.9),
+    subject: Optional[str] = None,
+    gender: Optional[str] = None,
+) -> MarkSummary:
+    """
+    Resumo completo das notas: geral + por disciplina (count, média, min,
+    max, desvio padrão populacional e percentis) e o top N.
+    No PostgreSQL é UMA query (GROUPING SETS + subquery do top N).
+    Filtros opcionais por disciplina e gênero valem para tudo.
+
+    Retorna (total_estudantes, geral, por_disciplina, top_n_estudantes).
+    """
+    return get_repository().get_mark_summary(
+        top_n=top_n, percentiles=percentiles, subject=subject, gender=gender
+    )
+
+@timed_query
 def delete_student_by_id(student_id: int) -> bool:
     """
     Deleta um estudante pelo ID.
     Retorna True se algum registro foi deletado, False caso contrário.
     """
-    query = "DELETE FROM students WHERE student_id = %s;"
-    with get_connection() as conn:
-        with conn.cursor() as cur:
-            cur.execute(query, (student_id,))
-            # rowcount = número de linhas afetadas pelo DELETE
-            return cur.rowcount > 0
-        
+    deleted = get_repository().delete_student_by_id(student_id)
+    if deleted:
+        invalidate_student(student_id)
+        student_deleted(student_id)
+    return deleted
+
+@cached(STUDENT_NAMESPACE, key=lambda student_id: student_id)
+@timed_query
 def get_student_by_id(student_id: int) -> Optional[Student]:
-    query = """
-    SELECT student_id, name, age, gender, subject, marks
-    FROM students
-    WHERE student_id = %s;
-    """
-    with get_connection() as conn:
-        with conn.cursor() as cur:
-            cur.execute(query, (student_id,))
-            row = cur.fetchone()
-
-    if row is None:
-        return None
-
-    return Student(
-        student_id=row[0],
-        name=row[1],
-        age=row[2],
-        gender=row[3],
-        subject=row[4],
-        marks=row[5],
-    )
+    return get_repository().get_student_by_id(student_id)
 
+@timed_query
 def update_student(student: Student) -> bool:
     """
     Atualiza os dados de um estudante com base no student_id.
     Retorna True se alguma linha foi atualizada, False caso contrário.
     """
-    query = """
-    UPDATE students
-    SET name = %s,
-        age = %s,
-        gender = %s,
-        subject = %s,
-        marks = %s
-    WHERE student_id = %s;
-    """
-    values = (
-        student.name,
-        student.age,
-        student.gender,
-        student.subject,
-        student.marks,
-        student.student_id,
+    updated = get_repository().update_student(student)
+    if updated:
+        invalidate_student(student.student_id)
+        student_changed(student)
+    return updated
+
+@timed_query
+def update_student_fields(student_id: int, fields: Dict[str, Any]) -> Optional[Student]:
+    """
+    Update parcial em um único statement: só as colunas presentes em `fields`
+    são alteradas.
+    Retorna o estudante atualizado, ou None se o ID não existe.
+    """
+    if not fields:
+        return get_student_by_id(student_id)
+
+    updated = get_repository().update_student_fields(student_id, fields)
+    if updated is not None:
+        invalidate_student(student_id)
+        student_changed(updated)
+    return updated
+
+@timed_query
+def apply_batch(operations: Sequence[BatchOperation]) -> List[Optional[Student]]:
+    """
+    Aplica creates, updates parciais e deletes em uma única transação,
+    na ordem recebida. Retorna, por operação, o estudante criado/alterado
+    (None nos deletes).
+    Se alguma operação não vale (ID duplicado no create, inexistente no
+    update/delete), levanta BatchError e nada é gravado.
+    """
+    validate_batch(operations)
+    results = get_repository().apply_batch(operations)
+    for operation, student in zip(operations, results):
+        invalidate_student(operation.student_id)
+        if student is None:
+            student_deleted(operation.student_id)
+        else:
+            student_changed(student)
+    logger.info(f"[DB] Batch applied ({len(operations)} operations)")
+    return results
+
+@timed_query(rows=lambda deleted: deleted)
+def delete_students(student_ids: Iterable[int]) -> int:
+    """
+    Deleta vários estudantes em uma única transação. `student_ids` pode ser
+    um gerador (ex.: lendo um arquivo): é consumido em blocos.
+    Retorna quantos IDs existiam e foram deletados.
+    """
+    deleted = get_repository().delete_students(student_ids)
+    if deleted:
+        invalidate_student(None)
+        table_reset()
+    logger.info(f"[DB] Deleted {deleted} students")
+    return deleted
+
+@timed_query(rows=lambda result: result.inserted + result.updated)
+def bulk_insert_students(records: Iterable[Any], mode: str = "upsert") -> BulkResult:
+    """
+    Carga em lote (no PostgreSQL, COPY para uma tabela temporária + merge).
+
+    `records` pode ser qualquer iterável (inclusive um gerador lendo um arquivo)
+    de Student ou dicts; é consumido em streaming, sem materializar tudo.
+    mode="upsert": IDs existentes são atualizados.
+    mode="insert": IDs existentes são rejeitados (mantém o registro atual).
+    IDs repetidos dentro da mesma carga: vale a última ocorrência, as
+    anteriores contam como rejeitadas.
+    Tudo roda em uma única transação.
+    """
+    result = get_repository().bulk_insert_students(records, mode=mode)
+
+    invalidate_student(None)
+    table_reset()
+    logger.info(
+        f"[DB] Bulk load finished (inserted={result.inserted}, "
+        f"updated={result.updated}, rejected={result.rejected})"
     )
+    return result
 
-    with get_connection() as conn:
-        with conn.cursor() as cur:
-            cur.execute(query, values)
-            return cur.rowcount > 0
\ No newline at end of file
+
+@timed_query
+def get_table_version() -> Optional[TableVersion]:
+    """
+    Versão da tabela students mantida pelos triggers do banco (nunca vem
+    do cache). Se mudou desde a última leitura, o cache do processo é
+    descartado: a escrita pode ter vindo de outro processo.
+    None se a linha da versão não existe.
+    """
+    version = get_repository().get_table_version()
+    if version is not None:
+        sync_table_version(version.version)
+    return version
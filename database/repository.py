@@ -0,0 +1,296 @@
+# database/repository.py
+"""
+Interface de armazenamento (repository) dos estudantes.
+
+database/queries.py é a fachada usada pelo CLI, API, analytics e notebook:
+ela cuida do cache e da invalidação e delega o acesso aos dados para o
+repositório escolhido pela variável DB_BACKEND:
+
+- "postgres" (padrão): PostgresRepository, psycopg2 + pool
+- "sqlite": SQLiteRepository, arquivo em SQLITE_PATH ou ":memory:",
+  sem nenhum serviço externo (testes, notebook, benchmarks locais)
+"""
+import itertools
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import logging
+
+from .config import load_config
+from .ingest import student_from_record
+from .models import BATCH_CREATE, BATCH_DELETE, BATCH_OPS, BatchOperation, BulkResult, Student
+from .sql import UPDATABLE_COLUMNS, row_to_student
+from .table_version import TableVersion
+
+# Logger
+logger = logging.getLogger("repository")
+
+# Carga em lote: linhas por bloco enviado ao banco e máximo de erros guardados
+BULK_CHUNK_SIZE = 5000
+BULK_MAX_ERRORS = 20
+
+# Leitura em streaming: linhas trazidas do banco por vez
+STREAM_CHUNK_SIZE = 2000
+
+# Máximo de operações em um lote (apply_batch)
+BATCH_MAX_OPERATIONS = 1000
+
+# IDs por DELETE em delete_students (abaixo do limite de parâmetros do SQLite)
+DELETE_CHUNK_SIZE = 500
+
+# Resumo de analytics: (total_estudantes, geral, por_disciplina, top_n)
+MarkSummary = Tuple[int, Dict[str, Any], Dict[str, Dict[str, Any]], List[Student]]
+
+
+def iter_valid_students(records: Iterable[Any], result: BulkResult) -> Iterator[Student]:
+    """
+    Valida os registros de uma carga em lote.
+    Registros inválidos são contados em result.rejected (com a mensagem
+    de erro nos primeiros BULK_MAX_ERRORS).
+    """
+    for index, record in enumerate(records, start=1):
+        try:
+            yield student_from_record(record)
+        except ValueError as e:
+            result.rejected += 1
+            if len(result.errors) < BULK_MAX_ERRORS:
+                result.errors.append(f"record {index}: {e}")
+
+
+class BatchError(Exception):
+    """Uma operação do lote não pôde ser aplicada; a transação foi desfeita."""
+
+    def __init__(self, index: int, operation: BatchOperation, reason: str):
+        self.index = index
+        self.operation = operation
+        # "exists" (create com ID existente) ou "not_found" (update/delete)
+        self.reason = reason
+        detail = "already exists" if reason == "exists" else "not found"
+        super().__init__(
+            f"Operation {index} ({operation.op}): student {operation.student_id} {detail}"
+        )
+
+
+def iter_id_chunks(student_ids: Iterable[int], size: int = DELETE_CHUNK_SIZE) -> Iterator[List[int]]:
+    """IDs em blocos de até `size` (o iterável pode ser um gerador lendo um arquivo)."""
+    ids = iter(student_ids)
+    while True:
+        chunk = [int(student_id) for student_id in itertools.islice(ids, size)]
+        if not chunk:
+            return
+        yield chunk
+
+
+def validate_batch(operations: Sequence[BatchOperation]) -> None:
+    """Checa o lote antes de abrir a transação (ValueError com a operação inválida)."""
+    if len(operations) > BATCH_MAX_OPERATIONS:
+        raise ValueError(f"Batch has {len(operations)} operations (max {BATCH_MAX_OPERATIONS})")
+    for index, operation in enumerate(operations):
+        if operation.op not in BATCH_OPS:
+            raise ValueError(f"Operation {index}: unknown op {operation.op!r}")
+        if operation.op == BATCH_CREATE and (
+            operation.student is None or operation.student.student_id != operation.student_id
+        ):
+            raise ValueError(f"Operation {index}: create needs the student with the same student_id")
+        unknown = set(operation.fields) - set(UPDATABLE_COLUMNS)
+        if unknown:
+            raise ValueError(f"Operation {index}: unknown student fields {sorted(unknown)}")
+
+
+def batch_outcome(index: int, operation: BatchOperation, row) -> Optional[Student]:
+    """
+    Resultado de uma operação do lote a partir da linha do RETURNING
+    (ver sql.build_batch_statement): o estudante criado/alterado, None no delete.
+    """
+    if row is None:
+        raise BatchError(index, operation, "exists" if operation.op == BATCH_CREATE else "not_found")
+    return None if operation.op == BATCH_DELETE else row_to_student(row)
+
+
+class StudentRepository(ABC):
+    """
+    Operações de CRUD e analytics sobre a tabela de estudantes.
+    Sem cache: quem chama (database/queries.py) decide o que cachear.
+    """
+
+    name: str = ""
+
+    # ======== Schema ========
+
+    @abstractmethod
+    def create_schema(self) -> List[int]:
+        """Cria/atualiza o schema. Retorna as versões aplicadas agora."""
+
+    def close(self) -> None:
+        """Libera conexões abertas pelo repositório."""
+
+    @abstractmethod
+    def get_table_version(self) -> Optional[TableVersion]:
+        """Versão da tabela students mantida pelos triggers (None se o schema não tem)."""
+
+    # ======== CRUD ========
+
+    @abstractmethod
+    def insert_student(self, student: Student) -> bool:
+        """True se inseriu, False se o ID já existe."""
+
+    @abstractmethod
+    def upsert_student(self, student: Student) -> bool:
+        """True se criou, False se substituiu um registro existente."""
+
+    @abstractmethod
+    def get_student_by_id(self, student_id: int) -> Optional[Student]:
+        ...
+
+    @abstractmethod
+    def update_student(self, student: Student) -> bool:
+        """Substitui todos os campos. True se alguma linha foi atualizada."""
+
+    @abstractmethod
+    def update_student_fields(self, student_id: int, fields: Dict[str, Any]) -> Optional[Student]:
+        """Update parcial; retorna o estudante atualizado ou None se não existe."""
+
+    @abstractmethod
+    def delete_student_by_id(self, student_id: int) -> bool:
+        ...
+
+    @abstractmethod
+    def bulk_insert_students(self, records: Iterable[Any], mode: str = "upsert") -> BulkResult:
+        """Carga em lote em uma transação (ver queries.bulk_insert_students)."""
+
+    @abstractmethod
+    def apply_batch(self, operations: Sequence[BatchOperation]) -> List[Optional[Student]]:
+        """Operações mistas em uma transação; BatchError desfaz todas."""
+
+    @abstractmethod
+    def delete_students(self, student_ids: Iterable[int]) -> int:
+        """
+        Deleta os IDs (consumidos em blocos de DELETE_CHUNK_SIZE) em uma
+        transação. Retorna quantos existiam.
+        """
+
+    # ======== Leituras em lista ========
+
+    @abstractmethod
+    def get_all_students(self) -> List[Student]:
+        ...
+
+    @abstractmethod
+    def iter_student_rows(
+        self,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+        subject: Optional[str] = None,
+        gender: Optional[str] = None,
+    ) -> Iterator[List[tuple]]:
+        """Tabela em blocos de tuplas, ordenada por student_id, memória constante."""
+
+    @abstractmethod
+    def get_students_page_rows(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[int] = None,
+        subject: Optional[str] = None,
+        gender: Optional[str] = None,
+        min_marks: Optional[int] = None,
+        max_marks: Optional[int] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Tuple[List[str], List[tuple]]:
+        """(colunas, tuplas) da página: a API serializa as tuplas direto."""
+
+    def get_students_page(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[int] = None,
+        subject: Optional[str] = None,
+        gender: Optional[str] = None,
+        min_marks: Optional[int] = None,
+        max_marks: Optional[int] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        columns, rows = self.get_students_page_rows(
+            limit, after, subject, gender, min_marks, max_marks, fields
+        )
+        return [dict(zip(columns, row)) for row in rows]
+
+    # ======== Analytics ========
+
+    @abstractmethod
+    def get_mark_stats(
+        self, subject: Optional[str] = None, gender: Optional[str] = None
+    ) -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    def get_subject_mark_stats(
+        self, subject: Optional[str] = None, gender: Optional[str] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def get_top_students_by_marks(
+        self, limit: int = 5, subject: Optional[str] = None, gender: Optional[str] = None
+    ) -> List[Student]:
+        ...
+
+    @abstractmethod
+    def get_facets(self) -> Dict[str, List[str]]:
+        """{"subjects": [...], "genders": [...]}: valores distintos, ordenados."""
+
+    @abstractmethod
+    def get_mark_summary(
+        self,
+        top_n: int = 5,
+        percentiles: Sequence[float] = (0.25, 0.5, 0.75, 0.9),
+        subject: Optional[str] = None,
+        gender: Optional[str] = None,
+    ) -> MarkSummary:
+        ...
+
+    @abstractmethod
+    def rebuild_subject_mark_stats(self) -> None:
+        ...
+
+    @abstractmethod
+    def check_subject_mark_stats(self) -> List[Dict[str, Any]]:
+        ...
+
+
+# Repositório do processo (criado no primeiro uso, configurado pelo .env)
+_repository: Optional[StudentRepository] = None
+_repository_lock = threading.Lock()
+
+
+def create_repository(backend: Optional[str] = None) -> StudentRepository:
+    """Instancia o repositório de `backend` (padrão: variável DB_BACKEND)."""
+    load_config()
+    backend = (backend or os.getenv("DB_BACKEND", "postgres")).lower()
+    if backend in ("postgres", "postgresql"):
+        from .postgres_repository import PostgresRepository
+        return PostgresRepository()
+    if backend == "sqlite":
+        from .sqlite_repository import SQLiteRepository
+        return SQLiteRepository(os.getenv("SQLITE_PATH", "students.db"))
+    raise ValueError(f"Unknown DB_BACKEND: {backend}")
+
+
+def get_repository() -> StudentRepository:
+    """Retorna o repositório do processo."""
+    global _repository
+    if _repository is not None:
+        return _repository
+    with _repository_lock:
+        if _repository is None:
+            _repository = create_repository()
+            logger.info(f"[DB] Using {_repository.name} backend")
+    return _repository
+
+
+def close_repository() -> None:
+    """Fecha e descarta o repositório do processo (shutdown ou troca de backend)."""
+    global _repository
+    with _repository_lock:
+        repository, _repository = _repository, None
+    if repository is not None:
+        repository.close()
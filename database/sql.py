@@ -0,0 +1,500 @@
+# database/sql.py
+"""
+SQL do PostgreSQL compartilhado entre o queries layer síncrono (psycopg2,
+database/queries.py) e o assíncrono (asyncpg, database/async_queries.py).
+
+Os builders retornam (query, params) no estilo do psycopg2 (%s);
+o lado assíncrono converte os placeholders com to_asyncpg() e o
+repositório SQLite reaproveita os builders portáveis com to_sqlite().
+Também ficam aqui as funções que transformam linhas em resultados,
+para as duas camadas devolverem exatamente as mesmas estruturas.
+"""
+import re
+from itertools import starmap
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .models import BATCH_CREATE, BATCH_DELETE, BatchOperation, Student
+
+# Colunas que podem ser alteradas em um update parcial
+UPDATABLE_COLUMNS = ("name", "age", "gender", "subject", "marks")
+# Todas as colunas, na ordem do SELECT
+STUDENT_COLUMNS = ("student_id",) + UPDATABLE_COLUMNS
+
+
+def row_to_student(row) -> Student:
+    # as colunas vêm na ordem dos campos de Student (STUDENT_COLUMNS)
+    return Student(*row)
+
+
+def rows_to_students(rows: Iterable[Sequence[Any]]) -> List[Student]:
+    """Linhas de um fetchall -> Students (construtor posicional via starmap)."""
+    return list(starmap(Student, rows))
+
+
+def student_values(student: Student) -> tuple:
+    return (
+        student.student_id,
+        student.name,
+        student.age,
+        student.gender,
+        student.subject,
+        student.marks,
+    )
+
+
+def to_asyncpg(query: str) -> str:
+    """Troca os placeholders %s por $1, $2, ... (formato do asyncpg)."""
+    counter = iter(range(1, query.count("%s") + 1))
+    return re.sub(r"%s", lambda _: f"${next(counter)}", query)
+
+
+def to_sqlite(query: str) -> str:
+    """Troca os placeholders %s por ? (formato do sqlite3)."""
+    return query.replace("%s", "?")
+
+
+def filter_clause(
+    subject: Optional[str] = None,
+    gender: Optional[str] = None,
+    extra: Sequence[str] = (),
+) -> Tuple[str, tuple]:
+    """
+    Monta o WHERE dos filtros opcionais (disciplina/gênero).
+    Retorna (sql, parâmetros); sql vazio se não houver filtro.
+    """
+    conditions = list(extra)
+    params: list = []
+    if subject is not None:
+        conditions.append("subject = %s")
+        params.append(subject)
+    if gender is not None:
+        conditions.append("gender = %s")
+        params.append(gender)
+    if not conditions:
+        return "", ()
+    return "WHERE " + " AND ".join(conditions), tuple(params)
+
+
+# ======== CRUD ========
+
+CREATE_STUDENTS_TABLE = """
+CREATE TABLE IF NOT EXISTS students (
+    student_id INT PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    age INT,
+    gender VARCHAR(10),
+    subject VARCHAR(100),
+    marks INT
+);
+"""
+
+# ON CONFLICT detecta o ID duplicado no próprio INSERT (um round-trip só,
+# sem corrida entre checar e inserir)
+INSERT_STUDENT = """
+INSERT INTO students (student_id, name, age, gender, subject, marks)
+VALUES (%s, %s, %s, %s, %s, %s)
+ON CONFLICT (student_id) DO NOTHING;
+"""
+
+UPSERT_STUDENT = """
+INSERT INTO students (student_id, name, age, gender, subject, marks)
+VALUES (%s, %s, %s, %s, %s, %s)
+ON CONFLICT (student_id) DO UPDATE
+SET name = EXCLUDED.name,
+    age = EXCLUDED.age,
+    gender = EXCLUDED.gender,
+    subject = EXCLUDED.subject,
+    marks = EXCLUDED.marks
+RETURNING (xmax = 0) AS inserted;
+"""
+
+SELECT_ALL_STUDENTS = "SELECT student_id, name, age, gender, subject, marks FROM students;"
+
+SELECT_STUDENT_BY_ID = """
+SELECT student_id, name, age, gender, subject, marks
+FROM students
+WHERE student_id = %s;
+"""
+
+DELETE_STUDENT_BY_ID = "DELETE FROM students WHERE student_id = %s;"
+
+UPDATE_STUDENT = """
+UPDATE students
+SET name = %s,
+    age = %s,
+    gender = %s,
+    subject = %s,
+    marks = %s
+WHERE student_id = %s;
+"""
+
+
+def build_update_fields_query(student_id: int, fields: Dict[str, Any]) -> Tuple[str, tuple]:
+    """UPDATE ... RETURNING só com as colunas presentes em `fields`."""
+    unknown = set(fields) - set(UPDATABLE_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown student fields: {sorted(unknown)}")
+
+    # nomes de coluna vêm da whitelist, os valores vão como parâmetros
+    columns = [col for col in UPDATABLE_COLUMNS if col in fields]
+    assignments = ", ".join(f"{col} = %s" for col in columns)
+    query = f"""
+    UPDATE students
+    SET {assignments}
+    WHERE student_id = %s
+    RETURNING student_id, name, age, gender, subject, marks;
+    """
+    return query, tuple(fields[col] for col in columns) + (student_id,)
+
+
+# ======== Lote (apply_batch) ========
+
+BATCH_CREATE_STUDENT = """
+INSERT INTO students (student_id, name, age, gender, subject, marks)
+VALUES (%s, %s, %s, %s, %s, %s)
+ON CONFLICT (student_id) DO NOTHING
+RETURNING student_id, name, age, gender, subject, marks;
+"""
+
+BATCH_DELETE_STUDENT = "DELETE FROM students WHERE student_id = %s RETURNING student_id;"
+
+
+def build_delete_students(student_ids: Sequence[int]) -> Tuple[str, tuple]:
+    """Um DELETE para um bloco de IDs; o RETURNING conta os que existiam."""
+    placeholders = ", ".join(["%s"] * len(student_ids))
+    return (
+        f"DELETE FROM students WHERE student_id IN ({placeholders}) RETURNING student_id;",
+        tuple(student_ids),
+    )
+
+
+def build_batch_statement(operation: BatchOperation) -> Tuple[str, tuple]:
+    """
+    Statement de uma operação do lote. Todos retornam uma linha quando a
+    operação vale; nenhuma linha = ID já existente (create) ou inexistente
+    (update/delete), e o lote inteiro é desfeito.
+    """
+    if operation.op == BATCH_CREATE:
+        return BATCH_CREATE_STUDENT, student_values(operation.student)
+    if operation.op == BATCH_DELETE:
+        return BATCH_DELETE_STUDENT, (operation.student_id,)
+    if operation.fields:
+        return build_update_fields_query(operation.student_id, operation.fields)
+    # update sem campos: só confirma que o estudante existe
+    return SELECT_STUDENT_BY_ID, (operation.student_id,)
+
+
+# ======== Leituras em lista ========
+
+def build_stream_query(
+    subject: Optional[str] = None, gender: Optional[str] = None
+) -> Tuple[str, tuple]:
+    where, params = filter_clause(subject, gender)
+    query = f"""
+    SELECT student_id, name, age, gender, subject, marks
+    FROM students
+    {where}
+    ORDER BY student_id;
+    """
+    return query, params
+
+
+def build_students_page_query(
+    limit: Optional[int] = None,
+    after: Optional[int] = None,
+    subject: Optional[str] = None,
+    gender: Optional[str] = None,
+    min_marks: Optional[int] = None,
+    max_marks: Optional[int] = None,
+    fields: Optional[Sequence[str]] = None,
+) -> Tuple[str, tuple, List[str]]:
+    """Paginação por keyset + filtros + projeção. Retorna (query, params, colunas)."""
+    columns = list(STUDENT_COLUMNS)
+    if fields:
+        unknown = set(fields) - set(STUDENT_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown student fields: {sorted(unknown)}")
+        columns = [col for col in STUDENT_COLUMNS if col == "student_id" or col in fields]
+
+    conditions = []
+    params: list = []
+    if after is not None:
+        conditions.append("student_id > %s")
+        params.append(after)
+    if min_marks is not None:
+        conditions.append("marks >= %s")
+        params.append(min_marks)
+    if max_marks is not None:
+        conditions.append("marks <= %s")
+        params.append(max_marks)
+    where, filter_params = filter_clause(subject, gender, extra=conditions)
+    params.extend(filter_params)
+
+    # nomes de coluna vêm de STUDENT_COLUMNS, nunca do input do usuário
+    query = f"""
+    SELECT {", ".join(columns)}
+    FROM students
+    {where}
+    ORDER BY student_id
+    """
+    if limit is not None:
+        query += "LIMIT %s"
+        params.append(limit)
+    return query, tuple(params), columns
+
+
+# ======== Agregados por disciplina (subject_mark_stats) ========
+
+# Chave da disciplina em subject_mark_stats (NULL vira 'null', sem colidir
+# com uma disciplina chamada "null", que vira 's:null')
+SUBJECT_KEY = "COALESCE('s:' || {column}, 'null')"
+
+# Agregados recalculados a partir da tabela students (rebuild e verificação)
+_FULL_SUBJECT_STATS = """
+SELECT subject,
+       COUNT(*) AS student_count,
+       COUNT(marks) AS mark_count,
+       COALESCE(SUM(marks), 0) AS mark_sum,
+       COALESCE(SUM(marks::bigint * marks), 0) AS mark_sumsq,
+       MIN(marks) AS min_marks,
+       MAX(marks) AS max_marks
+FROM students
+GROUP BY subject
+"""
+
+SUBJECT_STATS_COLUMNS = (
+    "student_count", "mark_count", "mark_sum", "mark_sumsq", "min_marks", "max_marks"
+)
+
+REBUILD_SUBJECT_MARK_STATS = f"""
+DELETE FROM subject_mark_stats;
+INSERT INTO subject_mark_stats (subject, {", ".join(SUBJECT_STATS_COLUMNS)})
+{_FULL_SUBJECT_STATS};
+"""
+
+# Disciplinas em que o agregado difere de um recálculo completo
+CHECK_SUBJECT_MARK_STATS = f"""
+WITH fresh AS ({_FULL_SUBJECT_STATS})
+SELECT COALESCE(f.subject, s.subject),
+       {", ".join(f"s.{col}" for col in SUBJECT_STATS_COLUMNS)},
+       {", ".join(f"f.{col}" for col in SUBJECT_STATS_COLUMNS)}
+FROM fresh f
+FULL JOIN subject_mark_stats s ON s.subject_key = {SUBJECT_KEY.format(column="f.subject")}
+WHERE ({", ".join(f"s.{col}" for col in SUBJECT_STATS_COLUMNS)})
+      IS DISTINCT FROM ({", ".join(f"f.{col}" for col in SUBJECT_STATS_COLUMNS)})
+ORDER BY 1;
+"""
+
+
+def subject_stats_mismatches_from_rows(rows) -> List[Dict[str, Any]]:
+    """Linhas de CHECK_SUBJECT_MARK_STATS -> [{subject, stored, expected}]."""
+    size = len(SUBJECT_STATS_COLUMNS)
+    mismatches = []
+    for subject, *values in rows:
+        stored, expected = values[:size], values[size:]
+        mismatches.append({
+            "subject": subject,
+            # None: disciplina ausente de um dos lados
+            "stored": dict(zip(SUBJECT_STATS_COLUMNS, stored)) if stored[0] is not None else None,
+            "expected": dict(zip(SUBJECT_STATS_COLUMNS, expected)) if expected[0] is not None else None,
+        })
+    return mismatches
+
+
+# ======== Versão da tabela (validadores HTTP, ver table_version.py) ========
+
+# Linha de students em table_versions, avançada pelos triggers da migração 6
+SELECT_TABLE_VERSION = """
+SELECT version,
+       EXTRACT(EPOCH FROM updated_at)::float8,
+       EXTRACT(EPOCH FROM clock_timestamp())::float8
+FROM table_versions
+WHERE table_name = 'students';
+"""
+
+
+# ======== Analytics ========
+
+def build_mark_stats_query(
+    subject: Optional[str] = None, gender: Optional[str] = None, aggregates: bool = True
+) -> Tuple[str, tuple]:
+    """aggregates=False força a varredura de students (ex.: SQLite)."""
+    if aggregates and gender is None:
+        # O(disciplinas): soma as linhas de subject_mark_stats
+        where, params = filter_clause(subject)
+        query = f"""
+        SELECT COALESCE(SUM(student_count), 0)::bigint,
+               SUM(mark_sum)::numeric / NULLIF(SUM(mark_count), 0),
+               MIN(min_marks),
+               MAX(max_marks)
+        FROM subject_mark_stats
+        {where};
+        """
+        return query, params
+
+    where, params = filter_clause(subject, gender)
+    query = f"""
+    SELECT COUNT(*), AVG(marks), MIN(marks), MAX(marks)
+    FROM students
+    {where};
+    """
+    return query, params
+
+
+def mark_stats_from_row(row) -> Dict[str, Any]:
+    count, average, min_marks, max_marks = row
+    if count == 0:
+        return {}
+    return {
+        "count": count,
+        "average": round(float(average), 2) if average is not None else None,
+        "min": min_marks,
+        "max": max_marks,
+    }
+
+
+def build_subject_stats_query(
+    subject: Optional[str] = None, gender: Optional[str] = None, aggregates: bool = True
+) -> Tuple[str, tuple]:
+    """aggregates=False força o GROUP BY em students (ex.: SQLite)."""
+    if aggregates and gender is None:
+        # O(disciplinas): lê direto de subject_mark_stats
+        where, params = filter_clause(subject, extra=["mark_count > 0"])
+        query = f"""
+        SELECT subject, mark_count, mark_sum::numeric / mark_count, min_marks, max_marks
+        FROM subject_mark_stats
+        {where}
+        ORDER BY subject NULLS LAST;
+        """
+        return query, params
+
+    where, params = filter_clause(subject, gender)
+    query = f"""
+    SELECT subject, COUNT(marks), AVG(marks), MIN(marks), MAX(marks)
+    FROM students
+    {where}
+    GROUP BY subject
+    HAVING COUNT(marks) > 0
+    ORDER BY subject NULLS LAST;
+    """
+    return query, params
+
+
+def subject_stats_from_rows(rows) -> Dict[str, Dict[str, Any]]:
+    return {
+        subject: {
+            "count": count,
+            "average": round(float(average), 2),
+            "min": min_marks,
+            "max": max_marks,
+        }
+        for subject, count, average, min_marks, max_marks in rows
+    }
+
+
+def build_top_students_query(
+    limit: int = 5, subject: Optional[str] = None, gender: Optional[str] = None
+) -> Tuple[str, tuple]:
+    where, params = filter_clause(subject, gender, extra=["marks IS NOT NULL"])
+    query = f"""
+    SELECT student_id, name, age, gender, subject, marks
+    FROM students
+    {where}
+    ORDER BY marks DESC, student_id ASC
+    LIMIT %s;
+    """
+    return query, params + (limit,)
+
+
+def build_mark_summary_query(
+    top_n: int = 5,
+    percentiles: Sequence[float] = (0.25, 0.5, 0.75, 0.9),
+    subject: Optional[str] = None,
+    gender: Optional[str] = None,
+) -> Tuple[str, tuple]:
+    """
+    GROUPING SETS calcula geral + por disciplina (count, média, min, max,
+    desvio padrão populacional e percentis) e uma subquery traz o top N.
+    """
+    where, filter_params = filter_clause(subject, gender)
+    top_where, _ = filter_clause(subject, gender, extra=["marks IS NOT NULL"])
+    query = f"""
+    SELECT
+        GROUPING(subject) = 1 AS is_total,
+        subject,
+        COUNT(*),
+        COUNT(marks),
+        AVG(marks),
+        MIN(marks),
+        MAX(marks),
+        STDDEV_POP(marks),
+        percentile_cont(%s::float8[]) WITHIN GROUP (ORDER BY marks),
+        CASE WHEN GROUPING(subject) = 1 THEN (
+            SELECT json_agg(
+                json_build_array(student_id, name, age, gender, subject, marks)
+                ORDER BY marks DESC, student_id ASC
+            )
+            FROM (
+                SELECT student_id, name, age, gender, subject, marks
+                FROM students
+                {top_where}
+                ORDER BY marks DESC, student_id ASC
+                LIMIT %s
+            ) top
+        ) END
+    FROM students
+    {where}
+    GROUP BY GROUPING SETS ((), (subject));
+    """
+    params = (list(percentiles),) + filter_params + (top_n,) + filter_params
+    return query, params
+
+
+def _summary_stats(count, average, min_marks, max_marks, stddev, percentiles, keys) -> Dict[str, Any]:
+    return {
+        "count": count,
+        "average": round(float(average), 2) if average is not None else None,
+        "min": min_marks,
+        "max": max_marks,
+        "stddev": round(float(stddev), 2) if stddev is not None else None,
+        "percentiles": {
+            key: round(value, 2) for key, value in zip(keys, percentiles or [])
+        },
+    }
+
+
+def mark_summary_from_rows(
+    rows, percentiles: Sequence[float]
+) -> Tuple[int, Dict[str, Any], Dict[str, Dict[str, Any]], List[Student]]:
+    """Retorna (total_estudantes, geral, por_disciplina, top_n_estudantes)."""
+    keys = [f"p{round(p * 100)}" for p in percentiles]
+    total_students = 0
+    overall: Dict[str, Any] = {}
+    subjects: Dict[str, Dict[str, Any]] = {}
+    top_students: List[Student] = []
+    for is_total, subject, students, count, *stats, top in rows:
+        if is_total:
+            total_students = students
+            overall = _summary_stats(count, *stats, keys)
+            top_students = rows_to_students(top or [])
+        elif count > 0:
+            subjects[subject] = _summary_stats(count, *stats, keys)
+
+    subjects = dict(sorted(subjects.items(), key=lambda kv: str(kv[0])))
+    return total_students, overall, subjects, top_students
+
+
+# Valores distintos de subject e gender (opções de filtro do dashboard)
+SELECT_FACETS = """
+SELECT 'subject', subject FROM students WHERE subject IS NOT NULL GROUP BY subject
+UNION ALL
+SELECT 'gender', gender FROM students WHERE gender IS NOT NULL GROUP BY gender
+ORDER BY 1, 2;
+"""
+
+
+def facets_from_rows(rows) -> Dict[str, List[str]]:
+    facets: Dict[str, List[str]] = {"subjects": [], "genders": []}
+    for facet, value in rows:
+        facets[f"{facet}s"].append(value)
+    return facets
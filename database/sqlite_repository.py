@@ -0,0 +1,504 @@
+# database/sqlite_repository.py
+"""
+Repositório SQLite (arquivo ou ":memory:"), sem serviços externos.
+
+Reaproveita os builders portáveis de database/sql.py (placeholders
+convertidos com to_sqlite) e devolve exatamente as mesmas estruturas do
+PostgreSQL. O que o SQLite não tem (percentile_cont, STDDEV_POP) é
+calculado em Python a partir do histograma das notas, que tem no máximo
+(disciplinas x notas distintas) linhas.
+
+Uma única conexão é compartilhada entre threads, protegida por um lock:
+o SQLite serializa as escritas de qualquer forma, e ":memory:" só existe
+dentro da conexão que o criou.
+"""
+import itertools
+import math
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import logging
+
+from .metrics import observe_acquire
+from .models import MAX_MARKS, MIN_MARKS, BatchOperation, BulkResult, Student
+from .repository import (
+    BULK_CHUNK_SIZE,
+    STREAM_CHUNK_SIZE,
+    MarkSummary,
+    StudentRepository,
+    batch_outcome,
+    iter_id_chunks,
+    iter_valid_students,
+)
+from . import sql
+from .sql import row_to_student, rows_to_students, student_values, to_sqlite
+from .table_version import TableVersion, table_version_from_row
+
+# Logger
+logger = logging.getLogger("sqlite_repository")
+
+# Epoch em segundos (com milissegundos) pelo relógio do SQLite
+SQLITE_NOW = "(julianday('now') - 2440587.5) * 86400.0"
+
+# SQLite só tem triggers por linha: a versão avança uma vez por linha escrita
+_BUMP_TABLE_VERSION = f"""
+BEGIN
+    UPDATE table_versions
+    SET version = version + 1,
+        updated_at = MAX(updated_at, {SQLITE_NOW})
+    WHERE table_name = 'students';
+END;
+"""
+
+# Migrações do SQLite (versão guardada em PRAGMA user_version)
+SQLITE_MIGRATIONS: Sequence[Tuple[int, str, Tuple[str, ...]]] = (
+    (
+        1,
+        "create students table",
+        (
+            f"""
+            CREATE TABLE IF NOT EXISTS students (
+                student_id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                age INTEGER CHECK (age >= 0),
+                gender TEXT,
+                subject TEXT,
+                marks INTEGER CHECK (marks BETWEEN {MIN_MARKS} AND {MAX_MARKS})
+            );
+            """,
+        ),
+    ),
+    (
+        2,
+        "indexes for filters and ordering by marks",
+        (
+            "CREATE INDEX IF NOT EXISTS idx_students_subject_marks "
+            "ON students (subject, marks DESC, student_id);",
+            "CREATE INDEX IF NOT EXISTS idx_students_gender ON students (gender);",
+            "CREATE INDEX IF NOT EXISTS idx_students_marks "
+            "ON students (marks DESC, student_id);",
+        ),
+    ),
+    (
+        3,
+        "table version for HTTP validators (ETag / Last-Modified)",
+        (
+            """
+            CREATE TABLE table_versions (
+                table_name TEXT PRIMARY KEY,
+                version INTEGER NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            """,
+            "INSERT INTO table_versions (table_name, version, updated_at) "
+            f"VALUES ('students', 0, {SQLITE_NOW});",
+            f"CREATE TRIGGER students_version_insert AFTER INSERT ON students {_BUMP_TABLE_VERSION}",
+            f"CREATE TRIGGER students_version_update AFTER UPDATE ON students {_BUMP_TABLE_VERSION}",
+            f"CREATE TRIGGER students_version_delete AFTER DELETE ON students {_BUMP_TABLE_VERSION}",
+        ),
+    ),
+)
+
+SELECT_TABLE_VERSION = f"""
+SELECT version, updated_at, {SQLITE_NOW}
+FROM table_versions
+WHERE table_name = 'students';
+"""
+
+UPSERT_CONFLICT = """
+ON CONFLICT (student_id) DO UPDATE
+SET name = excluded.name,
+    age = excluded.age,
+    gender = excluded.gender,
+    subject = excluded.subject,
+    marks = excluded.marks
+"""
+
+UPSERT_STUDENT = f"""
+INSERT INTO students (student_id, name, age, gender, subject, marks)
+VALUES (?, ?, ?, ?, ?, ?)
+{UPSERT_CONFLICT};
+"""
+
+CREATE_STAGING_TABLE = """
+CREATE TEMP TABLE students_staging (
+    seq INTEGER PRIMARY KEY,
+    student_id INTEGER,
+    name TEXT,
+    age INTEGER,
+    gender TEXT,
+    subject TEXT,
+    marks INTEGER
+);
+"""
+
+# última ocorrência de cada ID na carga
+CREATE_LATEST_TABLE = """
+CREATE TEMP TABLE students_latest AS
+SELECT s.student_id, s.name, s.age, s.gender, s.subject, s.marks
+FROM students_staging s
+JOIN (
+    SELECT MAX(seq) AS seq FROM students_staging GROUP BY student_id
+) last ON last.seq = s.seq;
+"""
+
+
+def _histogram_stats(
+    histogram: Dict[int, int], percentiles: Sequence[float], keys: Sequence[str]
+) -> Dict[str, Any]:
+    """Mesmo formato e arredondamento de sql._summary_stats, a partir de {nota: ocorrências}."""
+    count = sum(histogram.values())
+    if count == 0:
+        return {
+            "count": 0, "average": None, "min": None, "max": None,
+            "stddev": None, "percentiles": {},
+        }
+
+    total = sum(mark * n for mark, n in histogram.items())
+    total_sq = sum(mark * mark * n for mark, n in histogram.items())
+    # aritmética exata, como o numeric do PostgreSQL
+    variance = Decimal(count * total_sq - total * total) / Decimal(count * count)
+
+    sorted_marks = sorted(histogram.items())
+
+    def value_at(index: int) -> int:
+        seen = 0
+        for mark, n in sorted_marks:
+            seen += n
+            if index < seen:
+                return mark
+        return sorted_marks[-1][0]
+
+    def percentile(fraction: float) -> float:
+        # interpolação linear, igual ao percentile_cont
+        position = fraction * (count - 1)
+        lower = math.floor(position)
+        lower_value = value_at(lower)
+        upper_value = value_at(min(lower + 1, count - 1))
+        return lower_value + (upper_value - lower_value) * (position - lower)
+
+    return {
+        "count": count,
+        "average": round(float(Decimal(total) / Decimal(count)), 2),
+        "min": sorted_marks[0][0],
+        "max": sorted_marks[-1][0],
+        "stddev": round(float(variance.sqrt()), 2),
+        "percentiles": {key: round(percentile(p), 2) for key, p in zip(keys, percentiles)},
+    }
+
+
+class SQLiteRepository(StudentRepository):
+    name = "sqlite"
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+
+    # ======== Conexão ========
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            # isolation_level=None: autocommit; transações explícitas com BEGIN
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            if self.path != ":memory:":
+                conn.execute("PRAGMA journal_mode = WAL;")
+                conn.execute("PRAGMA synchronous = NORMAL;")
+            self._conn = conn
+            logger.info(f"[DB] SQLite database opened ({self.path})")
+        return self._conn
+
+    @contextmanager
+    def _cursor(self) -> Iterator[sqlite3.Cursor]:
+        # a conexão é uma só: "adquirir" = esperar o lock
+        start = time.perf_counter()
+        with self._lock:
+            observe_acquire("sqlite", time.perf_counter() - start)
+            cur = self._connection().cursor()
+            try:
+                yield cur
+            finally:
+                cur.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Cursor]:
+        with self._cursor() as cur:
+            cur.execute("BEGIN IMMEDIATE;")
+            try:
+                yield cur
+            except BaseException:
+                cur.execute("ROLLBACK;")
+                raise
+            cur.execute("COMMIT;")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ======== Schema ========
+
+    def create_schema(self) -> List[int]:
+        applied_now: List[int] = []
+        with self._transaction() as cur:
+            version = cur.execute("PRAGMA user_version;").fetchone()[0]
+            for number, name, statements in SQLITE_MIGRATIONS:
+                if number <= version:
+                    continue
+                logger.info(f"[DB] Applying SQLite migration {number}: {name}")
+                for statement in statements:
+                    cur.execute(statement)
+                applied_now.append(number)
+            if applied_now:
+                # PRAGMA não aceita parâmetros; o valor é um int nosso
+                cur.execute(f"PRAGMA user_version = {applied_now[-1]};")
+        return applied_now
+
+    def get_table_version(self) -> Optional[TableVersion]:
+        with self._cursor() as cur:
+            row = cur.execute(SELECT_TABLE_VERSION).fetchone()
+
+        return table_version_from_row(row)
+
+    # ======== CRUD ========
+
+    def insert_student(self, student: Student) -> bool:
+        with self._cursor() as cur:
+            cur.execute(to_sqlite(sql.INSERT_STUDENT), student_values(student))
+            return cur.rowcount > 0
+
+    def upsert_student(self, student: Student) -> bool:
+        with self._transaction() as cur:
+            cur.execute(to_sqlite(sql.SELECT_STUDENT_BY_ID), (student.student_id,))
+            created = cur.fetchone() is None
+            cur.execute(UPSERT_STUDENT, student_values(student))
+        return created
+
+    def get_student_by_id(self, student_id: int) -> Optional[Student]:
+        with self._cursor() as cur:
+            cur.execute(to_sqlite(sql.SELECT_STUDENT_BY_ID), (student_id,))
+            row = cur.fetchone()
+
+        return row_to_student(row) if row is not None else None
+
+    def update_student(self, student: Student) -> bool:
+        values = student_values(student)
+        with self._cursor() as cur:
+            cur.execute(to_sqlite(sql.UPDATE_STUDENT), values[1:] + values[:1])
+            return cur.rowcount > 0
+
+    def update_student_fields(self, student_id: int, fields: Dict[str, Any]) -> Optional[Student]:
+        if not fields:
+            return self.get_student_by_id(student_id)
+
+        # UPDATE ... RETURNING (SQLite >= 3.35)
+        query, values = sql.build_update_fields_query(student_id, fields)
+        with self._cursor() as cur:
+            cur.execute(to_sqlite(query), values)
+            row = cur.fetchone()
+
+        return row_to_student(row) if row is not None else None
+
+    def delete_student_by_id(self, student_id: int) -> bool:
+        with self._cursor() as cur:
+            cur.execute(to_sqlite(sql.DELETE_STUDENT_BY_ID), (student_id,))
+            return cur.rowcount > 0
+
+    def bulk_insert_students(self, records: Iterable[Any], mode: str = "upsert") -> BulkResult:
+        """Tabela temporária em blocos de executemany + merge, em uma transação."""
+        if mode not in ("upsert", "insert"):
+            raise ValueError(f"Invalid bulk mode: {mode}")
+
+        result = BulkResult()
+        students = iter_valid_students(records, result)
+        insert_staging = (
+            "INSERT INTO students_staging (student_id, name, age, gender, subject, marks) "
+            "VALUES (?, ?, ?, ?, ?, ?);"
+        )
+        conflict = UPSERT_CONFLICT if mode == "upsert" else "ON CONFLICT (student_id) DO NOTHING"
+        # WHERE true: evita a ambiguidade do parser entre SELECT e ON CONFLICT
+        merge = f"""
+        INSERT INTO students (student_id, name, age, gender, subject, marks)
+        SELECT student_id, name, age, gender, subject, marks FROM students_latest
+        WHERE true
+        {conflict};
+        """
+
+        with self._transaction() as cur:
+            cur.execute("DROP TABLE IF EXISTS temp.students_staging;")
+            cur.execute("DROP TABLE IF EXISTS temp.students_latest;")
+            cur.execute(CREATE_STAGING_TABLE)
+            while True:
+                chunk = [student_values(s) for s in itertools.islice(students, BULK_CHUNK_SIZE)]
+                if not chunk:
+                    break
+                cur.executemany(insert_staging, chunk)
+
+            cur.execute(CREATE_LATEST_TABLE)
+            staged = cur.execute("SELECT COUNT(*) FROM students_staging;").fetchone()[0]
+            distinct = cur.execute("SELECT COUNT(*) FROM students_latest;").fetchone()[0]
+            existing = cur.execute(
+                "SELECT COUNT(*) FROM students_latest JOIN students USING (student_id);"
+            ).fetchone()[0]
+            cur.execute(merge)
+            cur.execute("DROP TABLE temp.students_staging;")
+            cur.execute("DROP TABLE temp.students_latest;")
+
+        result.inserted = distinct - existing
+        result.updated = existing if mode == "upsert" else 0
+        # duplicados dentro da carga + IDs já existentes no modo insert
+        result.rejected += (staged - distinct) + (existing - result.updated)
+        return result
+
+    def apply_batch(self, operations: Sequence[BatchOperation]) -> List[Optional[Student]]:
+        results: List[Optional[Student]] = []
+        with self._transaction() as cur:
+            for index, operation in enumerate(operations):
+                query, values = sql.build_batch_statement(operation)
+                cur.execute(to_sqlite(query), values)
+                results.append(batch_outcome(index, operation, cur.fetchone()))
+        return results
+
+    def delete_students(self, student_ids: Iterable[int]) -> int:
+        deleted = 0
+        with self._transaction() as cur:
+            for chunk in iter_id_chunks(student_ids):
+                query, values = sql.build_delete_students(chunk)
+                deleted += len(cur.execute(to_sqlite(query), values).fetchall())
+        return deleted
+
+    # ======== Leituras em lista ========
+
+    def get_all_students(self) -> List[Student]:
+        with self._cursor() as cur:
+            rows = cur.execute(sql.SELECT_ALL_STUDENTS).fetchall()
+
+        return rows_to_students(rows)
+
+    def iter_student_rows(
+        self,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+        subject: Optional[str] = None,
+        gender: Optional[str] = None,
+    ) -> Iterator[List[tuple]]:
+        """
+        Keyset por student_id, um bloco por vez: o lock só é mantido durante
+        cada leitura, então quem consome o gerador pode escrever no meio.
+        """
+        after = None
+        while True:
+            query, params, _ = sql.build_students_page_query(
+                limit=chunk_size, after=after, subject=subject, gender=gender
+            )
+            with self._cursor() as cur:
+                rows = cur.execute(to_sqlite(query), params).fetchall()
+            if not rows:
+                break
+            yield rows
+            after = rows[-1][0]
+
+    def get_students_page_rows(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[int] = None,
+        subject: Optional[str] = None,
+        gender: Optional[str] = None,
+        min_marks: Optional[int] = None,
+        max_marks: Optional[int] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Tuple[List[str], List[tuple]]:
+        query, params, columns = sql.build_students_page_query(
+            limit, after, subject, gender, min_marks, max_marks, fields
+        )
+        with self._cursor() as cur:
+            rows = cur.execute(to_sqlite(query), params).fetchall()
+
+        return columns, rows
+
+    # ======== Analytics ========
+
+    def get_mark_stats(
+        self, subject: Optional[str] = None, gender: Optional[str] = None
+    ) -> Dict[str, Any]:
+        query, params = sql.build_mark_stats_query(subject, gender, aggregates=False)
+        with self._cursor() as cur:
+            row = cur.execute(to_sqlite(query), params).fetchone()
+
+        return sql.mark_stats_from_row(row)
+
+    def get_subject_mark_stats(
+        self, subject: Optional[str] = None, gender: Optional[str] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        query, params = sql.build_subject_stats_query(subject, gender, aggregates=False)
+        with self._cursor() as cur:
+            rows = cur.execute(to_sqlite(query), params).fetchall()
+
+        return sql.subject_stats_from_rows(rows)
+
+    def get_facets(self) -> Dict[str, List[str]]:
+        with self._cursor() as cur:
+            rows = cur.execute(sql.SELECT_FACETS).fetchall()
+
+        return sql.facets_from_rows(rows)
+
+    def get_top_students_by_marks(
+        self, limit: int = 5, subject: Optional[str] = None, gender: Optional[str] = None
+    ) -> List[Student]:
+        query, params = sql.build_top_students_query(limit, subject, gender)
+        with self._cursor() as cur:
+            rows = cur.execute(to_sqlite(query), params).fetchall()
+
+        return rows_to_students(rows)
+
+    def get_mark_summary(
+        self,
+        top_n: int = 5,
+        percentiles: Sequence[float] = (0.25, 0.5, 0.75, 0.9),
+        subject: Optional[str] = None,
+        gender: Optional[str] = None,
+    ) -> MarkSummary:
+        where, params = sql.filter_clause(subject, gender)
+        histogram_query = f"""
+        SELECT subject, marks, COUNT(*)
+        FROM students
+        {where}
+        GROUP BY subject, marks;
+        """
+        with self._cursor() as cur:
+            rows = cur.execute(to_sqlite(histogram_query), params).fetchall()
+        top_students = self.get_top_students_by_marks(top_n, subject=subject, gender=gender)
+
+        keys = [f"p{round(p * 100)}" for p in percentiles]
+        total_students = 0
+        overall: Dict[int, int] = {}
+        by_subject: Dict[Optional[str], Dict[int, int]] = {}
+        for row_subject, mark, n in rows:
+            total_students += n
+            if mark is None:
+                continue
+            overall[mark] = overall.get(mark, 0) + n
+            histogram = by_subject.setdefault(row_subject, {})
+            histogram[mark] = histogram.get(mark, 0) + n
+
+        subjects = {
+            name: _histogram_stats(histogram, percentiles, keys)
+            for name, histogram in sorted(by_subject.items(), key=lambda kv: str(kv[0]))
+        }
+        return (
+            total_students,
+            _histogram_stats(overall, percentiles, keys),
+            subjects,
+            top_students,
+        )
+
+    def rebuild_subject_mark_stats(self) -> None:
+        # sem tabela de agregados: as estatísticas saem direto de students
+        pass
+
+    def check_subject_mark_stats(self) -> List[Dict[str, Any]]:
+        return []
@@ -0,0 +1,58 @@
+# database/table_version.py
+"""
+Versão da tabela students, usada como validador do cache HTTP da API.
+
+A versão fica no próprio banco (tabela table_versions): triggers avançam
+o contador e updated_at a cada statement que escreve em students
+(migração 6 no PostgreSQL, migração 3 no SQLite). Assim qualquer escrita
+conta, venha da API, do CLI, de outro worker ou de outro processo no
+mesmo arquivo SQLite, e todos os workers geram o mesmo ETag.
+
+Last-Modified tem resolução de segundos: enquanto o segundo da última
+escrita não termina, outra escrita ainda pode cair nele com a mesma data.
+Nesse intervalo a data é ambígua (RFC 7232, 2.2.2) e não é enviada.
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+# updated_at é marcado pelo trigger e a escrita só aparece no COMMIT, logo
+# depois: margem para uma transação ainda aberta no fim do segundo
+COMMIT_GRACE_SECONDS = 1.0
+
+
+@dataclass(frozen=True)
+class TableVersion:
+    version: int
+    # epoch em segundos da última escrita
+    last_modified: float
+    # epoch do relógio do banco no momento da leitura
+    checked_at: float
+
+    @property
+    def etag(self) -> str:
+        # fraco (W/): o mesmo conteúdo pode sair com ou sem compressão.
+        # updated_at entra no ETag: um banco recriado volta à versão 0,
+        # mas não ao mesmo instante
+        return f'W/"{self.version}-{int(self.last_modified * 1_000_000):x}"'
+
+    @property
+    def second_closed(self) -> bool:
+        """True se o segundo da última escrita já terminou (data sem ambiguidade)."""
+        return self.checked_at >= int(self.last_modified) + 1 + COMMIT_GRACE_SECONDS
+
+    @property
+    def last_modified_http(self) -> Optional[str]:
+        """Data no formato do header Last-Modified (RFC 7231); None enquanto ambígua."""
+        if not self.second_closed:
+            return None
+        from email.utils import formatdate
+
+        return formatdate(int(self.last_modified), usegmt=True)
+
+
+def table_version_from_row(row) -> Optional[TableVersion]:
+    """(version, updated_at, agora) do SELECT da versão -> TableVersion (None sem a linha)."""
+    if row is None:
+        return None
+    version, updated_at, now = row
+    return TableVersion(version=int(version), last_modified=float(updated_at), checked_at=float(now))
@@ -1,96 +1,192 @@
 # src/analytics/marks_analysis.py
-from typing import Dict, List
+import heapq
+from typing import Dict, List, Optional, Union
 from statistics import mean
 
 from database.models import Student
-from database.queries import get_all_students
+from database.queries import (
+    get_mark_stats,
+    get_subject_mark_stats,
+    get_top_students_by_marks,
+)
+from src.analytics.snapshot import compute_analytics_snapshot
+from src.analytics.student_table import StudentTable
+from src.profiling import analytics_profiling_enabled, profiled_when
 
+# As funções em memória aceitam uma lista de Student ou uma StudentTable
+# (colunar, vetorizada; ver student_table.py)
+Students = Union[List[Student], StudentTable]
 
-def group_students_by_subject(students: List[Student]) -> Dict[str, List[Student]]:
+
+def group_students_by_subject(students: Students) -> Dict[str, Students]:
     """
     Agrupa estudantes por disciplina (subject).
     Retorna um dicionário: { "Math": [Student, Student, ...], ... }
+    Com uma StudentTable, cada grupo é uma StudentTable.
     """
+    if isinstance(students, StudentTable):
+        return students.group_by_subject()
+
     grouped: Dict[str, List[Student]] = {}
     for student in students:
         grouped.setdefault(student.subject, []).append(student)
     return grouped
 
 
-def calculate_average_marks_by_subject() -> Dict[str, float]:
+def filter_students(
+    students: Students,
+    subject: Optional[str] = None,
+    gender: Optional[str] = None,
+) -> Students:
+    """Filtra em memória por disciplina e/ou gênero (None = sem filtro)."""
+    if isinstance(students, StudentTable):
+        return students.filter(subject=subject, gender=gender)
+
+    return [
+        s for s in students
+        if (subject is None or s.subject == subject)
+        and (gender is None or s.gender == gender)
+    ]
+
+
+def _marks_of(students: List[Student]) -> List[int]:
+    return [s.marks for s in students if s.marks is not None]
+
+
+def calculate_subject_mark_stats(
+    students: Optional[Students] = None,
+    subject: Optional[str] = None,
+    gender: Optional[str] = None,
+) -> Dict[str, Dict[str, float]]:
+    """
+    Calcula quantidade, média, mínimo e máximo de notas por disciplina.
+    Sem lista, a agregação roda no banco (GROUP BY).
+    Com uma lista de Student ou StudentTable, calcula em memória.
+    subject/gender filtram os estudantes considerados.
+    Retorna: { "Math": {"count": 10, "average": 82.5, "min": 60, "max": 99}, ... }
+    """
+    if students is None:
+        return get_subject_mark_stats(subject=subject, gender=gender)
+
+    students = filter_students(students, subject, gender)
+    if isinstance(students, StudentTable):
+        return students.subject_mark_stats()
+
+    stats: Dict[str, Dict[str, float]] = {}
+    for group, subject_students in group_students_by_subject(students).items():
+        marks = _marks_of(subject_students)
+        if not marks:
+            continue
+        stats[group] = {
+            "count": len(marks),
+            "average": round(mean(marks), 2),
+            "min": min(marks),
+            "max": max(marks),
+        }
+    return stats
+
+
+def calculate_average_marks_by_subject(
+    students: Optional[Students] = None,
+    subject: Optional[str] = None,
+    gender: Optional[str] = None,
+) -> Dict[str, float]:
     """
     Calcula a média de notas por disciplina.
+    Sem lista, a agregação roda no banco (GROUP BY).
+    Com uma lista de Student ou StudentTable, calcula em memória.
     Retorna: { "Math": 82.5, "English": 74.0, ... }
     """
-    students = get_all_students()
-    if not students:
-        return {}
-
-    grouped = group_students_by_subject(students)
-    averages: Dict[str, float] = {}
+    stats = calculate_subject_mark_stats(students, subject=subject, gender=gender)
+    return {group: group_stats["average"] for group, group_stats in stats.items()}
 
-    for subject, subject_students in grouped.items():
-        marks = [s.marks for s in subject_students]
-        averages[subject] = round(mean(marks), 2)
 
-    return averages
-
-
-def get_top_students(limit: int = 5) -> List[Student]:
+def get_top_students(
+    limit: int = 5,
+    students: Optional[Students] = None,
+    subject: Optional[str] = None,
+    gender: Optional[str] = None,
+) -> List[Student]:
     """
     Retorna os top N estudantes com base nas notas (marks).
-    Se houver notas iguais, a ordem entre eles não é garantida.
+    Sem lista, o banco faz ORDER BY ... LIMIT.
+    Se houver notas iguais, o menor student_id vem primeiro.
     """
-    students = get_all_students()
-    sorted_students = sorted(students, key=lambda s: s.marks, reverse=True)
-    return sorted_students[:limit]
+    if students is None:
+        return get_top_students_by_marks(limit, subject=subject, gender=gender)
+    if isinstance(students, StudentTable):
+        return students.filter(subject=subject, gender=gender).top_students(limit)
 
+    ranked = [s for s in filter_students(students, subject, gender) if s.marks is not None]
+    return heapq.nsmallest(limit, ranked, key=lambda s: (-s.marks, s.student_id))
 
-def get_overall_mark_stats() -> Dict[str, float]:
+
+def get_overall_mark_stats(
+    students: Optional[Students] = None,
+    subject: Optional[str] = None,
+    gender: Optional[str] = None,
+) -> Dict[str, float]:
     """
     Retorna estatísticas gerais das notas:
+    - quantidade de estudantes
     - média
     - mínimo
     - máximo
+    Sem lista, calcula no banco; com lista, em memória.
     """
-    students = get_all_students()
+    if students is None:
+        return get_mark_stats(subject=subject, gender=gender)
+
+    students = filter_students(students, subject, gender)
+    if isinstance(students, StudentTable):
+        return students.overall_mark_stats()
     if not students:
         return {}
 
-    marks = [s.marks for s in students]
+    marks = _marks_of(students)
     return {
-        "count": len(marks),
-        "average": round(mean(marks), 2),
-        "min": min(marks),
-        "max": max(marks),
+        "count": len(students),
+        "average": round(mean(marks), 2) if marks else None,
+        "min": min(marks) if marks else None,
+        "max": max(marks) if marks else None,
     }
 
 
-def print_analytics_summary(top_n: int = 5) -> None:
+@profiled_when(analytics_profiling_enabled, "print_analytics_summary")
+def print_analytics_summary(
+    top_n: int = 5, subject: Optional[str] = None, gender: Optional[str] = None
+) -> None:
     """
     Imprime um resumo simples de analytics no terminal.
-    Útil para testar o módulo isoladamente.
+    Todos os números vêm de um único AnalyticsSnapshot (uma ida ao banco).
+    Com PROFILE_ANALYTICS=true, cada execução grava um perfil (src/profiling.py).
     """
     print("\n=== Analytics: Estatísticas de Notas ===")
 
-    overall = get_overall_mark_stats()
-    if not overall:
-        print("Nenhum estudante cadastrado. Não há dados para análise.")
+    snapshot = compute_analytics_snapshot(top_n=top_n, subject=subject, gender=gender)
+    if snapshot.is_empty:
+        if subject is None and gender is None:
+            print("Nenhum estudante cadastrado. Não há dados para análise.")
+        else:
+            print("Nenhum estudante para os filtros informados.")
         return
 
-    print(f"Total de estudantes: {overall['count']}")
-    print(f"Média geral de notas: {overall['average']}")
-    print(f"Nota mínima: {overall['min']}")
-    print(f"Nota máxima: {overall['max']}")
+    overall = snapshot.overall
+    print(f"Total de estudantes: {snapshot.total_students}")
+    print(f"Média geral de notas: {overall.average}")
+    print(f"Nota mínima: {overall.min}")
+    print(f"Nota máxima: {overall.max}")
+    print(f"Desvio padrão: {overall.stddev}")
+    if overall.percentiles:
+        percentiles = ", ".join(f"{k}={v}" for k, v in overall.percentiles.items())
+        print(f"Percentis: {percentiles}")
 
     print("\nMédia de notas por disciplina:")
-    averages = calculate_average_marks_by_subject()
-    for subject, avg in averages.items():
-        print(f" - {subject}: {avg}")
+    for subject, stats in snapshot.subjects.items():
+        print(f" - {subject}: {stats.average} ({stats.count} notas, min {stats.min}, max {stats.max})")
 
     print(f"\nTop {top_n} estudantes por nota:")
-    top_students = get_top_students(limit=top_n)
-    for idx, s in enumerate(top_students, start=1):
+    for idx, s in enumerate(snapshot.top_students, start=1):
         print(f" {idx}. {s.name} ({s.subject}) - {s.marks} pontos")
 
 
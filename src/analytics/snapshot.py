@@ -0,0 +1,198 @@
+# src/analytics/snapshot.py
+"""
+Snapshot de analytics calculado em uma única passada.
+
+O mesmo objeto (AnalyticsSnapshot) alimenta o CLI, a API e o dashboard:
+- a partir do banco: uma única query (GROUPING SETS + top N)
+- a partir de uma lista/gerador de Student: uma única varredura em streaming,
+  com memória O(disciplinas + top N)
+"""
+import heapq
+import math
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from database.models import Student
+from database.queries import get_mark_summary
+
+# Percentis calculados (interpolação linear, igual ao percentile_cont do PostgreSQL)
+PERCENTILES = (0.25, 0.5, 0.75, 0.9)
+
+
+def percentile_key(fraction: float) -> str:
+    """0.5 -> "p50" """
+    return f"p{round(fraction * 100)}"
+
+
+@dataclass
+class MarkStats:
+    count: int
+    average: Optional[float]
+    min: Optional[int]
+    max: Optional[int]
+    stddev: Optional[float]
+    percentiles: Dict[str, float] = field(default_factory=dict)
+
+
+@dataclass
+class AnalyticsSnapshot:
+    total_students: int
+    overall: MarkStats
+    subjects: Dict[str, MarkStats]
+    top_students: List[Student]
+    top_n: int
+
+    @property
+    def is_empty(self) -> bool:
+        return self.total_students == 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Representação serializável em JSON (usada pela API)."""
+        return asdict(self)
+
+
+class MarkAccumulator:
+    """
+    Acumula notas em streaming.
+    Soma e soma dos quadrados são inteiros exatos; o histograma das notas
+    (O(notas distintas), na prática 0-100) permite percentis exatos.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.total_sq = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+        self.histogram: Counter = Counter()
+
+    def add(self, mark: int) -> None:
+        self.count += 1
+        self.total += mark
+        self.total_sq += mark * mark
+        if self.min is None or mark < self.min:
+            self.min = mark
+        if self.max is None or mark > self.max:
+            self.max = mark
+        self.histogram[mark] += 1
+
+    def _value_at(self, index: int, sorted_marks: List[Tuple[int, int]]) -> int:
+        seen = 0
+        for mark, occurrences in sorted_marks:
+            seen += occurrences
+            if index < seen:
+                return mark
+        return sorted_marks[-1][0]
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if self.count == 0:
+            return None
+        sorted_marks = sorted(self.histogram.items())
+        position = fraction * (self.count - 1)
+        lower = math.floor(position)
+        lower_value = self._value_at(lower, sorted_marks)
+        upper_value = self._value_at(min(lower + 1, self.count - 1), sorted_marks)
+        return lower_value + (upper_value - lower_value) * (position - lower)
+
+    def to_stats(self) -> MarkStats:
+        if self.count == 0:
+            return MarkStats(count=0, average=None, min=None, max=None, stddev=None)
+        average = self.total / self.count
+        variance = (self.total_sq - self.total * self.total / self.count) / self.count
+        return MarkStats(
+            count=self.count,
+            average=round(average, 2),
+            min=self.min,
+            max=self.max,
+            stddev=round(math.sqrt(max(variance, 0.0)), 2),
+            percentiles={
+                percentile_key(p): round(self.percentile(p), 2) for p in PERCENTILES
+            },
+        )
+
+
+def build_snapshot(students: Iterable[Student], top_n: int = 5) -> AnalyticsSnapshot:
+    """
+    Calcula o snapshot em uma única passada sobre `students`
+    (lista ou gerador). Memória: O(disciplinas + top_n).
+    """
+    total_students = 0
+    overall = MarkAccumulator()
+    by_subject: Dict[str, MarkAccumulator] = {}
+    # min-heap com os top N: (nota, -student_id, ordem, Student)
+    top_heap: List[Tuple[int, int, int, Student]] = []
+
+    for order, student in enumerate(students):
+        total_students += 1
+        if student.marks is None:
+            continue
+        overall.add(student.marks)
+        by_subject.setdefault(student.subject, MarkAccumulator()).add(student.marks)
+
+        item = (student.marks, -student.student_id, order, student)
+        if len(top_heap) < top_n:
+            heapq.heappush(top_heap, item)
+        elif top_n > 0 and item[:2] > top_heap[0][:2]:
+            heapq.heapreplace(top_heap, item)
+
+    top_students = [item[3] for item in sorted(top_heap, reverse=True)]
+    return AnalyticsSnapshot(
+        total_students=total_students,
+        overall=overall.to_stats(),
+        subjects={
+            subject: acc.to_stats()
+            for subject, acc in sorted(by_subject.items(), key=lambda kv: str(kv[0]))
+        },
+        top_students=top_students,
+        top_n=top_n,
+    )
+
+
+def _stats_from_row(row: Dict[str, Any]) -> MarkStats:
+    return MarkStats(
+        count=row["count"],
+        average=row["average"],
+        min=row["min"],
+        max=row["max"],
+        stddev=row["stddev"],
+        percentiles=row["percentiles"],
+    )
+
+
+def snapshot_from_summary(summary: Tuple, top_n: int) -> AnalyticsSnapshot:
+    """Monta o snapshot a partir do resultado de get_mark_summary (sync ou async)."""
+    total_students, overall, subjects, top_students = summary
+    return AnalyticsSnapshot(
+        total_students=total_students,
+        overall=_stats_from_row(overall),
+        subjects={name: _stats_from_row(row) for name, row in subjects.items()},
+        top_students=top_students,
+        top_n=top_n,
+    )
+
+
+def compute_analytics_snapshot(
+    top_n: int = 5,
+    students: Optional[Iterable[Student]] = None,
+    subject: Optional[str] = None,
+    gender: Optional[str] = None,
+) -> AnalyticsSnapshot:
+    """
+    Snapshot completo de analytics.
+    Sem `students`, tudo vem de uma única query no banco;
+    com `students`, é calculado em uma varredura em memória.
+    subject/gender filtram os estudantes considerados.
+    """
+    if students is not None:
+        filtered = (
+            s for s in students
+            if (subject is None or s.subject == subject)
+            and (gender is None or s.gender == gender)
+        )
+        return build_snapshot(filtered, top_n=top_n)
+
+    summary = get_mark_summary(
+        top_n=top_n, percentiles=PERCENTILES, subject=subject, gender=gender
+    )
+    return snapshot_from_summary(summary, top_n)
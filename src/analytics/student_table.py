@@ -0,0 +1,318 @@
+# src/analytics/student_table.py
+"""
+Tabela colunar de estudantes para analytics em memória.
+
+Uma List[Student] guarda um objeto Python por linha e toda agregação
+é um loop em Python. StudentTable guarda uma coluna por campo:
+
+- student_id/age/marks em arrays NumPy (int64/int32/int16)
+- subject/gender como categorias: códigos int32 + lista de valores distintos
+- name em um array de objetos (as strings continuam sendo do Python)
+
+Valores ausentes (age/marks NULL) viram NULL_INT, já que idade e nota
+nunca são negativas (CHECK no banco, validação em ingest.py).
+Group-by, top N e filtros são vetorizados.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from database.models import Student
+from database.queries import iter_student_rows
+from database.repository import STREAM_CHUNK_SIZE
+from database.sql import student_values
+
+# Marcador de valor ausente nas colunas inteiras
+NULL_INT = -1
+
+# Colunas categóricas aceitas em group_mark_stats
+CATEGORICAL_COLUMNS = ("subject", "gender")
+
+
+def _encode(values: Sequence[Any], index: Dict[Any, int]) -> np.ndarray:
+    """Códigos das categorias; valores novos entram no fim de `index`."""
+    return np.array(
+        [index.setdefault(value, len(index)) for value in values], dtype=np.int32
+    )
+
+
+def _int_column(values: Sequence[Optional[int]], dtype) -> np.ndarray:
+    return np.array([NULL_INT if v is None else v for v in values], dtype=dtype)
+
+
+class StudentTable:
+    """
+    Coleção colunar de estudantes (ordem das linhas preservada).
+    Construa com from_rows / from_row_chunks (tuplas do cursor, na ordem
+    de STUDENT_COLUMNS), from_students ou from_database.
+    """
+
+    __slots__ = (
+        "student_id",
+        "name",
+        "age",
+        "marks",
+        "subject_codes",
+        "subjects",
+        "gender_codes",
+        "genders",
+    )
+
+    def __init__(
+        self,
+        student_id: np.ndarray,
+        name: np.ndarray,
+        age: np.ndarray,
+        marks: np.ndarray,
+        subject_codes: np.ndarray,
+        subjects: List[Optional[str]],
+        gender_codes: np.ndarray,
+        genders: List[Optional[str]],
+    ):
+        self.student_id = student_id
+        self.name = name
+        self.age = age
+        self.marks = marks
+        self.subject_codes = subject_codes
+        self.subjects = subjects
+        self.gender_codes = gender_codes
+        self.genders = genders
+
+    # ======== Construção ========
+
+    @classmethod
+    def from_row_chunks(cls, chunks: Iterable[Sequence[tuple]]) -> "StudentTable":
+        """
+        Monta a tabela a partir de blocos de tuplas
+        (student_id, name, age, gender, subject, marks), como os de
+        queries.iter_student_rows: só um bloco vira objetos Python por vez.
+        """
+        subject_index: Dict[Optional[str], int] = {}
+        gender_index: Dict[Optional[str], int] = {}
+        columns: Dict[str, List[np.ndarray]] = {
+            "student_id": [], "name": [], "age": [], "marks": [],
+            "subject_codes": [], "gender_codes": [],
+        }
+
+        for rows in chunks:
+            if not rows:
+                continue
+            ids, names, ages, genders, subjects, marks = zip(*rows)
+            columns["student_id"].append(np.array(ids, dtype=np.int64))
+            columns["name"].append(np.array(names, dtype=object))
+            columns["age"].append(_int_column(ages, np.int32))
+            columns["marks"].append(_int_column(marks, np.int16))
+            columns["subject_codes"].append(_encode(subjects, subject_index))
+            columns["gender_codes"].append(_encode(genders, gender_index))
+
+        dtypes = {
+            "student_id": np.int64, "name": object, "age": np.int32,
+            "marks": np.int16, "subject_codes": np.int32, "gender_codes": np.int32,
+        }
+        arrays = {
+            key: np.concatenate(parts) if parts else np.empty(0, dtype=dtypes[key])
+            for key, parts in columns.items()
+        }
+        return cls(
+            subjects=list(subject_index),
+            genders=list(gender_index),
+            **arrays,
+        )
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[tuple]) -> "StudentTable":
+        return cls.from_row_chunks([rows])
+
+    @classmethod
+    def from_students(cls, students: Iterable[Student]) -> "StudentTable":
+        return cls.from_rows([student_values(s) for s in students])
+
+    @classmethod
+    def from_database(
+        cls,
+        subject: Optional[str] = None,
+        gender: Optional[str] = None,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+    ) -> "StudentTable":
+        """Carrega a tabela do banco em streaming (filtros aplicados no SQL)."""
+        return cls.from_row_chunks(
+            iter_student_rows(chunk_size, subject=subject, gender=gender)
+        )
+
+    # ======== Acesso ========
+
+    def __len__(self) -> int:
+        return len(self.student_id)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes dos arrays (sem contar as strings de name)."""
+        return sum(
+            getattr(self, column).nbytes
+            for column in ("student_id", "name", "age", "marks", "subject_codes", "gender_codes")
+        )
+
+    def take(self, indices: np.ndarray) -> "StudentTable":
+        """Nova tabela com as linhas `indices` (array de posições ou máscara)."""
+        return StudentTable(
+            student_id=self.student_id[indices],
+            name=self.name[indices],
+            age=self.age[indices],
+            marks=self.marks[indices],
+            subject_codes=self.subject_codes[indices],
+            subjects=self.subjects,
+            gender_codes=self.gender_codes[indices],
+            genders=self.genders,
+        )
+
+    def to_students(self, indices: Optional[np.ndarray] = None) -> List[Student]:
+        """Converte as linhas (todas ou `indices`) em Student."""
+        table = self if indices is None else self.take(indices)
+        subjects = [table.subjects[code] for code in table.subject_codes.tolist()]
+        genders = [table.genders[code] for code in table.gender_codes.tolist()]
+        return [
+            Student(
+                student_id=student_id,
+                name=name,
+                age=None if age == NULL_INT else age,
+                gender=gender,
+                subject=subject,
+                marks=None if marks == NULL_INT else marks,
+            )
+            for student_id, name, age, gender, subject, marks in zip(
+                table.student_id.tolist(),
+                table.name.tolist(),
+                table.age.tolist(),
+                genders,
+                subjects,
+                table.marks.tolist(),
+            )
+        ]
+
+    # ======== Filtros ========
+
+    @staticmethod
+    def _category_mask(codes: np.ndarray, categories: List[Optional[str]], value: str) -> np.ndarray:
+        try:
+            return codes == categories.index(value)
+        except ValueError:
+            # valor que não aparece na tabela: nenhuma linha
+            return np.zeros(len(codes), dtype=bool)
+
+    def mask(
+        self,
+        subject: Optional[str] = None,
+        gender: Optional[str] = None,
+        min_marks: Optional[int] = None,
+        max_marks: Optional[int] = None,
+    ) -> np.ndarray:
+        """Máscara booleana das linhas que passam nos filtros (None = sem filtro)."""
+        selected = np.ones(len(self), dtype=bool)
+        if subject is not None:
+            selected &= self._category_mask(self.subject_codes, self.subjects, subject)
+        if gender is not None:
+            selected &= self._category_mask(self.gender_codes, self.genders, gender)
+        # como no SQL, filtros de nota excluem quem não tem nota
+        if min_marks is not None:
+            selected &= (self.marks != NULL_INT) & (self.marks >= min_marks)
+        if max_marks is not None:
+            selected &= (self.marks != NULL_INT) & (self.marks <= max_marks)
+        return selected
+
+    def filter(
+        self,
+        subject: Optional[str] = None,
+        gender: Optional[str] = None,
+        min_marks: Optional[int] = None,
+        max_marks: Optional[int] = None,
+    ) -> "StudentTable":
+        if subject is None and gender is None and min_marks is None and max_marks is None:
+            return self
+        return self.take(self.mask(subject, gender, min_marks, max_marks))
+
+    # ======== Analytics ========
+
+    def group_by_subject(self) -> Dict[Optional[str], "StudentTable"]:
+        """{ "Math": StudentTable, ... } na ordem em que as disciplinas aparecem."""
+        present = np.unique(self.subject_codes)
+        return {
+            self.subjects[code]: self.take(self.subject_codes == code)
+            for code in present.tolist()
+        }
+
+    def group_mark_stats(self, by: str = "subject") -> Dict[Optional[str], Dict[str, Any]]:
+        """
+        count, média, mínimo e máximo das notas por subject ou gender,
+        com um sort + reduceat (sem loop por linha).
+        Grupos sem nenhuma nota preenchida ficam de fora.
+        """
+        if by not in CATEGORICAL_COLUMNS:
+            raise ValueError(f"Cannot group by {by!r}")
+        codes = getattr(self, f"{by}_codes")
+        categories = getattr(self, f"{by}s")
+
+        has_marks = self.marks != NULL_INT
+        codes = codes[has_marks]
+        if not len(codes):
+            return {}
+        order = np.argsort(codes, kind="stable")
+        codes = codes[order]
+        marks = self.marks[has_marks][order].astype(np.int64)
+
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        counts = np.diff(np.r_[starts, len(codes)])
+        sums = np.add.reduceat(marks, starts)
+        mins = np.minimum.reduceat(marks, starts)
+        maxs = np.maximum.reduceat(marks, starts)
+
+        return {
+            categories[code]: {
+                "count": count,
+                # divisão de inteiros: mesmo arredondamento de statistics.mean
+                "average": round(total / count, 2),
+                "min": low,
+                "max": high,
+            }
+            for code, count, total, low, high in zip(
+                codes[starts].tolist(), counts.tolist(), sums.tolist(),
+                mins.tolist(), maxs.tolist(),
+            )
+        }
+
+    def subject_mark_stats(self) -> Dict[Optional[str], Dict[str, Any]]:
+        return self.group_mark_stats("subject")
+
+    def overall_mark_stats(self) -> Dict[str, Any]:
+        """Mesmo formato de queries.get_mark_stats; {} se a tabela está vazia."""
+        if not len(self):
+            return {}
+        marks = self.marks[self.marks != NULL_INT].astype(np.int64)
+        if not len(marks):
+            return {"count": len(self), "average": None, "min": None, "max": None}
+        return {
+            "count": len(self),
+            "average": round(int(marks.sum()) / len(marks), 2),
+            "min": int(marks.min()),
+            "max": int(marks.max()),
+        }
+
+    def top_students(self, limit: int = 5) -> List[Student]:
+        """
+        Top N por nota, empates pelo menor student_id.
+        np.partition acha a nota de corte em O(n); só quem está acima
+        dela (com os empates) é ordenado.
+        """
+        if limit <= 0:
+            return []
+        candidates = np.flatnonzero(self.marks != NULL_INT)
+        if len(candidates) > limit:
+            marks = self.marks[candidates]
+            cut = len(marks) - limit
+            threshold = np.partition(marks, cut)[cut]
+            candidates = candidates[marks >= threshold]
+
+        # lexsort: a última chave é a principal (nota desc, depois id asc)
+        order = np.lexsort(
+            (self.student_id[candidates], -self.marks[candidates].astype(np.int32))
+        )
+        return self.to_students(candidates[order[:limit]])
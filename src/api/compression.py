@@ -0,0 +1,184 @@
+# src/api/compression.py
+"""
+Compressão das respostas (gzip ou brotli) negociada pelo Accept-Encoding.
+
+Só respostas com pelo menos API_COMPRESSION_MIN_SIZE bytes são comprimidas
+(em respostas pequenas o custo de CPU não compensa). Respostas em streaming
+(export) são comprimidas bloco a bloco. brotli é opcional: sem o pacote
+`brotli` instalado, só gzip é oferecido.
+
+Configuração (.env):
+- API_COMPRESSION: true/false (padrão true)
+- API_COMPRESSION_MIN_SIZE: bytes (padrão 1024)
+"""
+import os
+import zlib
+from typing import Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # opcional
+    brotli = None
+
+DEFAULT_MIN_SIZE = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+
+# Streams de eventos não podem ficar retidos no buffer do compressor
+UNCOMPRESSED_MEDIA_TYPES = ("text/event-stream",)
+
+
+def supported_encodings() -> tuple:
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Escolhe a codificação pelo Accept-Encoding (com pesos q).
+    Empate: brotli antes de gzip. None = sem compressão.
+    """
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip()] = q
+
+    candidates = [
+        (weights.get(encoding, weights.get("*", 0.0)), -rank, encoding)
+        for rank, encoding in enumerate(supported_encodings())
+    ]
+    q, _, encoding = max(candidates)
+    return encoding if q > 0 else None
+
+
+class _GzipCompressor:
+    def __init__(self):
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliCompressor:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.finish()
+
+
+COMPRESSORS = {"gzip": _GzipCompressor, "br": _BrotliCompressor}
+
+
+class CompressionMiddleware:
+    """Middleware ASGI: comprime respostas grandes se o cliente aceitar."""
+
+    def __init__(self, app: ASGIApp, minimum_size: Optional[int] = None):
+        self.app = app
+        # lido ao montar a pilha de middlewares (primeira requisição), não no import
+        self.enabled = os.getenv("API_COMPRESSION", "true").lower() not in ("0", "false", "no")
+        self.minimum_size = (
+            minimum_size if minimum_size is not None
+            else int(os.getenv("API_COMPRESSION_MIN_SIZE", str(DEFAULT_MIN_SIZE)))
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self.app, encoding, self.minimum_size)
+        await responder(scope, receive, send)
+
+
+class _CompressionResponder:
+    """
+    Segura o http.response.start até o primeiro bloco do corpo: só então
+    dá para saber se a resposta é grande (ou em streaming) o suficiente.
+    """
+
+    def __init__(self, app: ASGIApp, encoding: str, minimum_size: int):
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.send: Send = None
+        self.start_message: Optional[Message] = None
+        self.compressor = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    def _should_compress(self, headers: MutableHeaders, body: bytes, more_body: bool) -> bool:
+        if "content-encoding" in headers:
+            return False
+        if headers.get("content-type", "").startswith(UNCOMPRESSED_MEDIA_TYPES):
+            return False
+        return more_body or len(body) >= self.minimum_size
+
+    async def send_compressed(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start_message is not None:
+            start, self.start_message = self.start_message, None
+            headers = MutableHeaders(raw=start["headers"])
+            if not self._should_compress(headers, body, more_body):
+                self.passthrough = True
+                await self.send(start)
+                await self.send(message)
+                return
+
+            self.compressor = COMPRESSORS[self.encoding]()
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            data = self.compressor.compress(body)
+            if more_body:
+                # tamanho final desconhecido: chunked
+                if "content-length" in headers:
+                    del headers["content-length"]
+            else:
+                data += self.compressor.flush()
+                headers["Content-Length"] = str(len(data))
+            await self.send(start)
+            await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
+            return
+
+        if self.passthrough:
+            await self.send(message)
+            return
+
+        data = self.compressor.compress(body)
+        if not more_body:
+            data += self.compressor.flush()
+        await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
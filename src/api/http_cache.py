@@ -0,0 +1,73 @@
+# src/api/http_cache.py
+"""
+Requisições condicionais (ETag / Last-Modified) nas rotas de leitura.
+
+Os validadores vêm da versão da tabela mantida no banco
+(database/table_version.py), não do conteúdo: checar se o cliente está
+atualizado custa uma leitura de uma linha por chave primária, e vale
+para escritas de qualquer processo (API, CLI, outros workers).
+"""
+from email.utils import parsedate_to_datetime
+from typing import Dict, Mapping
+
+from fastapi import HTTPException, Request
+
+from database import async_queries
+from database.table_version import TableVersion
+
+
+def _strip_weak(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def is_not_modified(headers: Mapping[str, str], version: TableVersion) -> bool:
+    """
+    True se o cliente já tem esta versão.
+    If-None-Match (comparação fraca) tem precedência sobre If-Modified-Since.
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        etag = _strip_weak(version.etag)
+        return "*" in tags or any(_strip_weak(tag) == etag for tag in tags)
+
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        # Last-Modified tem resolução de segundos: a mesma data só vale
+        # depois que o segundo da última escrita terminou (table_version.py)
+        modified = int(version.last_modified)
+        return modified < since or (modified == since and version.second_closed)
+    return False
+
+
+def validator_headers(version: TableVersion) -> Dict[str, str]:
+    headers = {
+        "ETag": version.etag,
+        # o cliente pode guardar, mas revalida sempre
+        "Cache-Control": "no-cache",
+    }
+    last_modified = version.last_modified_http
+    if last_modified is not None:
+        headers["Last-Modified"] = last_modified
+    return headers
+
+
+async def table_validators(request: Request) -> Dict[str, str]:
+    """
+    Dependência das rotas de leitura: retorna os headers ETag/Last-Modified
+    para a resposta, ou responde 304 direto se o cliente já está atualizado.
+    A versão é lida ANTES da consulta: se uma escrita acontecer no meio, a
+    resposta sai com a versão antiga e o próximo pedido baixa de novo.
+    """
+    version = await async_queries.get_table_version()
+    if version is None:
+        # sem a linha de versão: sem validadores, nunca 304
+        return {"Cache-Control": "no-cache"}
+    headers = validator_headers(version)
+    if is_not_modified(request.headers, version):
+        raise HTTPException(status_code=304, headers=headers)
+    return headers
@@ -1,18 +1,41 @@
 # src/api/main.py
-from typing import Optional
+import asyncio
+import csv
+import io
+import json
+import sqlite3
+import tempfile
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Literal, Optional
 from typing import List
 
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field
 
-from database.models import Student as StudentDomain
-from database.queries import (
-    get_all_students,
-    get_student_by_id,
-    insert_student,
-    update_student,
-    delete_student_by_id,
+from database import async_queries
+from database.async_repository import (
+    close_async_repository,
+    get_async_repository,
+    open_async_repository,
 )
+from database.cache import get_cache_stats
+from database.changes import ChangeFeed, get_change_feed
+from database.config import load_config
+from database.database import get_pool_stats
+from database.ingest import detect_format, iter_records
+from database.metrics import REGISTRY
+from database.models import BATCH_CREATE, MAX_MARKS, MIN_MARKS, BatchOperation, Student as StudentDomain
+from database.queries import bulk_insert_students, create_students_table, STUDENT_COLUMNS
+from database.sql import student_values
+from database.repository import BATCH_MAX_OPERATIONS, BatchError, close_repository, get_repository
+from src.analytics.snapshot import PERCENTILES, snapshot_from_summary
+from src.api.compression import CompressionMiddleware
+from src.api.http_cache import table_validators
+from src.api.metrics import MetricsMiddleware
+from src.api.profiling import ProfilingMiddleware
+from src.api.responses import FastJSONResponse, RowEncoder, RowsJSONResponse
 
 import logging
 
@@ -24,22 +47,66 @@ logging.basicConfig(
     format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
 )
 
+# .env antes de montar o app (middlewares e pools leem variáveis de ambiente)
+load_config()
+
+
+def _database_errors() -> tuple:
+    """Erros de banco que não impedem a API de subir (drivers só com PostgreSQL)."""
+    if get_repository().name != "postgres":
+        return (OSError, sqlite3.Error)
+    import asyncpg
+    import psycopg2
+
+    return (OSError, sqlite3.Error, psycopg2.Error, asyncpg.PostgresError)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup: aplica as migrações pendentes e abre o pool assíncrono
+    database_errors = _database_errors()
+    try:
+        await run_in_threadpool(create_students_table)
+        await open_async_repository()
+        if get_repository().name == "postgres":
+            # feed de alterações via LISTEN/NOTIFY (pega escritas de outros processos)
+            from database.postgres_changes import start_change_listener
+            await start_change_listener()
+    except database_errors as e:
+        # a API sobe mesmo assim; o pool é criado na primeira requisição
+        logger.warning(f"[API] Could not open database at startup: {e}")
+    yield
+    # Shutdown: devolve as conexões ao banco
+    if get_repository().name == "postgres":
+        from database.postgres_changes import stop_change_listener
+        await stop_change_listener()
+    await close_async_repository()
+    close_repository()
+
 
 app = FastAPI(
     title="Student Performance API",
     description="API para gerenciamento e análise de desempenho de estudantes.",
     version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
+# gzip/brotli para respostas grandes, se o cliente aceitar (ver compression.py)
+app.add_middleware(CompressionMiddleware)
+# cProfile sob demanda (PROFILE_REQUESTS, desligado por padrão; ver src/profiling.py)
+app.add_middleware(ProfilingMiddleware)
+# por fora da compressão: a latência inclui comprimir a resposta
+app.add_middleware(MetricsMiddleware)
 
 
 # ======== Pydantic Models (para requests/responses) ========
 
 class StudentBase(BaseModel):
     name: str
-    age: Optional[int] = None
+    age: Optional[int] = Field(None, ge=0)
     gender: Optional[str] = None
     subject: Optional[str] = None
-    marks: Optional[int] = None
+    marks: Optional[int] = Field(None, ge=MIN_MARKS, le=MAX_MARKS)
 
 
 class StudentCreate(StudentBase):
@@ -48,17 +115,110 @@ class StudentCreate(StudentBase):
 
 class StudentUpdate(BaseModel):
     name: str | None = None
-    age: int | None = None
+    age: int | None = Field(None, ge=0)
     gender: str | None = None
     subject: str | None = None
-    marks: int | None = None
+    marks: int | None = Field(None, ge=MIN_MARKS, le=MAX_MARKS)
 
 
 class StudentResponse(StudentBase):
     student_id: int
 
-    class Config:
-        from_attributes = True   # permite criar a partir do dataclass StudentDomain
+    model_config = ConfigDict(from_attributes=True)   # permite criar a partir do dataclass StudentDomain
+
+
+class StudentListItem(BaseModel):
+    """Item de GET /students: só os campos pedidos em `fields` aparecem."""
+    student_id: int
+    name: Optional[str] = None
+    age: Optional[int] = None
+    gender: Optional[str] = None
+    subject: Optional[str] = None
+    marks: Optional[int] = None
+
+
+class BulkResponse(BaseModel):
+    inserted: int
+    updated: int
+    rejected: int
+    errors: List[str] = []
+
+
+class BatchOperationRequest(BaseModel):
+    """
+    Uma operação de POST /students/batch:
+    - create: `student` com todos os campos
+    - update: `fields` só com os campos alterados
+    - delete: só o student_id
+    """
+    op: Literal["create", "update", "delete"]
+    student_id: int
+    student: Optional[StudentBase] = None
+    fields: Optional[StudentUpdate] = None
+
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperationRequest] = Field(..., min_length=1, max_length=BATCH_MAX_OPERATIONS)
+
+
+class BatchResultItem(BaseModel):
+    op: str
+    student_id: int
+    # estudante criado/alterado; None nos deletes
+    student: Optional[StudentResponse] = None
+
+
+class BatchResponse(BaseModel):
+    results: List[BatchResultItem]
+
+
+class MarkStatsResponse(BaseModel):
+    count: int
+    average: Optional[float] = None
+    min: Optional[int] = None
+    max: Optional[int] = None
+    stddev: Optional[float] = None
+    percentiles: Dict[str, float] = {}
+
+
+class SubjectStatsResponse(BaseModel):
+    subject: Optional[str] = None
+    count: int
+    average: Optional[float] = None
+    min: Optional[int] = None
+    max: Optional[int] = None
+
+
+class FacetsResponse(BaseModel):
+    subjects: List[str]
+    genders: List[str]
+
+
+class SubjectSummaryResponse(MarkStatsResponse):
+    subject: Optional[str] = None
+
+
+class AnalyticsSummaryResponse(BaseModel):
+    total_students: int
+    overall: MarkStatsResponse
+    subjects: List[SubjectSummaryResponse]
+    top_students: List[StudentResponse]
+    top_n: int
+
+
+# Tamanho máximo de página em GET /students
+MAX_PAGE_SIZE = 1000
+
+# Corpo da carga em lote fica em memória até este tamanho, depois vai para disco
+BULK_SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+
+# Comentário keep-alive no stream de alterações (segundos sem eventos)
+SSE_HEARTBEAT_SECONDS = 15
+# Espera sugerida ao cliente antes de reconectar (ms)
+SSE_RETRY_MS = 3000
+
+# Content-Type do formato texto do Prometheus
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
 
 
 # ======== Helpers de conversão ========
@@ -74,43 +234,182 @@ def domain_to_response(student: StudentDomain) -> StudentResponse:
     )
 
 
-def merge_student_update(
-    existing: StudentDomain, update: StudentUpdate
-) -> StudentDomain:
+def request_to_operation(item: BatchOperationRequest) -> BatchOperation:
+    if item.op == BATCH_CREATE:
+        if item.student is None:
+            raise ValueError(f"create {item.student_id}: 'student' is required")
+        student = StudentDomain(student_id=item.student_id, **item.student.model_dump())
+        return BatchOperation(op=item.op, student_id=item.student_id, student=student)
+    fields = item.fields.model_dump(exclude_none=True) if item.fields is not None else {}
+    return BatchOperation(op=item.op, student_id=item.student_id, fields=fields)
+
+
+async def _ndjson_chunks(row_chunks) -> AsyncIterator[str]:
+    encoder = RowEncoder(STUDENT_COLUMNS)
+    async for rows in row_chunks:
+        yield encoder.encode_lines(rows)
+
+
+async def _csv_chunks(row_chunks) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(STUDENT_COLUMNS)
+    async for rows in row_chunks:
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # cabeçalho mesmo com a tabela vazia
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def _sse_message(event_id: int, event: str, data: Dict) -> str:
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _change_events(feed: ChangeFeed, after: Optional[int]) -> AsyncIterator[str]:
     """
-    Aplica os campos do update (quando não nulos) em um StudentDomain existente.
+    Stream SSE do feed de alterações. O primeiro evento (ready) traz o seq
+    atual: o cliente carrega a tabela depois dele e aplica os eventos
+    seguintes por cima (upsert/delete são idempotentes).
     """
-    return StudentDomain(
-        student_id=existing.student_id,
-        name=update.name if update.name is not None else existing.name,
-        age=update.age if update.age is not None else existing.age,
-        gender=update.gender if update.gender is not None else existing.gender,
-        subject=update.subject if update.subject is not None else existing.subject,
-        marks=update.marks if update.marks is not None else existing.marks,
-    )
+    subscription = feed.subscribe(after=after)
+    # na reconexão, a posição do cliente; os eventos perdidos vêm em seguida
+    position = after if after is not None else subscription.start_seq
+    try:
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+        yield _sse_message(position, "ready", {"seq": position})
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), SSE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield _sse_message(event.seq, event.op, event.to_dict())
+    finally:
+        feed.unsubscribe(subscription)
 
 
 # ======== Rotas ========
 
-@app.get("/students", response_model=List[StudentResponse])
-def list_students():
-    logger.info("[API] GET /students")
-    """Lista todos os estudantes."""
-    students = get_all_students()
-    return [domain_to_response(s) for s in students]
+@app.get(
+    "/students",
+    response_model=List[StudentListItem],
+    response_model_exclude_unset=True,
+)
+async def list_students(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[int] = Query(None, description="Último student_id da página anterior"),
+    fields: Optional[str] = Query(None, description="Ex.: name,subject,marks"),
+    subject: Optional[str] = None,
+    gender: Optional[str] = None,
+    min_marks: Optional[int] = None,
+    max_marks: Optional[int] = None,
+    validators: Dict[str, str] = Depends(table_validators),
+):
+    """
+    Lista estudantes ordenados por student_id.
+
+    - paginação por keyset: `limit` + `after`; o cursor da próxima página
+      vem no header X-Next-Cursor (e em Link rel="next")
+    - `fields` limita as colunas retornadas (student_id sempre vem)
+    - filtros por disciplina, gênero e faixa de notas rodam no SQL
+
+    Sem `limit`, retorna todos os estudantes que passam nos filtros.
+    ETag/Last-Modified seguem a versão da tabela: com If-None-Match
+    atual, a resposta é 304 sem consultar o banco.
+    As tuplas do banco são serializadas direto em JSON (RowsJSONResponse),
+    sem dict nem modelo pydantic por linha; response_model fica só para
+    a documentação.
+    """
+    logger.info(f"[API] GET /students (limit={limit}, after={after})")
+    field_list = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    try:
+        columns, rows = await async_queries.get_students_page_rows(
+            # uma linha extra indica se existe próxima página
+            limit=limit + 1 if limit is not None else None,
+            after=after,
+            subject=subject,
+            gender=gender,
+            min_marks=min_marks,
+            max_marks=max_marks,
+            fields=field_list,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    headers = dict(validators)
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        # student_id é sempre a primeira coluna
+        next_cursor = rows[-1][0]
+        headers["X-Next-Cursor"] = str(next_cursor)
+        next_url = request.url.include_query_params(after=next_cursor)
+        headers["Link"] = f'<{next_url}>; rel="next"'
+
+    return RowsJSONResponse(columns, rows, headers=headers)
+
+
+@app.get("/students/export")
+async def export_students(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    subject: Optional[str] = None,
+    gender: Optional[str] = None,
+):
+    """
+    Exporta a tabela inteira em streaming (NDJSON ou CSV).
+    As linhas vêm do banco em blocos por um cursor server-side e são
+    escritas direto na resposta: memória constante.
+    """
+    logger.info(f"[API] GET /students/export (format={format})")
+    row_chunks = async_queries.iter_student_rows(subject=subject, gender=gender)
+    if format == "csv":
+        body, media_type = _csv_chunks(row_chunks), "text/csv"
+    else:
+        body, media_type = _ndjson_chunks(row_chunks), "application/x-ndjson"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="students.{format}"'},
+    )
+
+
+@app.get("/students/changes")
+async def student_changes(
+    after: Optional[int] = Query(None, description="Último seq recebido"),
+    last_event_id: Optional[str] = Header(None),
+):
+    """
+    Feed de alterações em Server-Sent Events: eventos upsert (com a linha),
+    delete e reset (recarregar tudo). Ao reconectar, o EventSource manda
+    Last-Event-ID e os eventos perdidos (ainda no buffer) são reenviados.
+    """
+    if after is None and last_event_id is not None and last_event_id.isdigit():
+        after = int(last_event_id)
+    logger.info(f"[API] GET /students/changes (after={after})")
+    return StreamingResponse(
+        _change_events(get_change_feed(), after),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.get("/students/{student_id}", response_model=StudentResponse)
-def get_student(student_id: int):
-    """Busca um estudante pelo ID."""
-    student = get_student_by_id(student_id)
+async def get_student(
+    student_id: int, validators: Dict[str, str] = Depends(table_validators)
+):
+    """Busca um estudante pelo ID (304 se If-None-Match bate com a versão da tabela)."""
+    student = await async_queries.get_student_by_id(student_id)
     if student is None:
         raise HTTPException(status_code=404, detail="Student not found")
-    return domain_to_response(student)
+    return FastJSONResponse(student.to_dict(), headers=validators)
 
 
 @app.post("/students", response_model=StudentResponse, status_code=201)
-def create_student(student: StudentCreate):
+async def create_student(student: StudentCreate):
     """
     Cria um novo estudante.
     Fails se student_id já existir.
@@ -124,7 +423,7 @@ def create_student(student: StudentCreate):
         subject=student.subject,
         marks=student.marks,
     )
-    inserted = insert_student(new_student_domain)
+    inserted = await async_queries.insert_student(new_student_domain)
     if not inserted:
         raise HTTPException(
             status_code=400,
@@ -134,29 +433,193 @@ def create_student(student: StudentCreate):
     return domain_to_response(new_student_domain)
 
 
+@app.get("/stats")
+async def runtime_stats():
+    """Estatísticas do processo: pools de conexões e cache de consultas."""
+    return {
+        "backend": get_repository().name,
+        "pool": get_pool_stats(),
+        "async_pool": get_async_repository().stats(),
+        "cache": get_cache_stats(),
+        "changes": get_change_feed().stats(),
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Métricas no formato texto do Prometheus (rotas, consultas, pools e cache)."""
+    return Response(REGISTRY.render(), media_type=PROMETHEUS_MEDIA_TYPE)
+
+
+@app.get("/analytics/summary", response_model=AnalyticsSummaryResponse)
+async def analytics_summary(
+    top_n: int = Query(5, ge=0, le=100),
+    subject: Optional[str] = None,
+    gender: Optional[str] = None,
+    validators: Dict[str, str] = Depends(table_validators),
+):
+    """
+    Resumo completo (geral + por disciplina + top N) calculado no banco
+    em uma única query. Filtros opcionais por disciplina e gênero.
+    """
+    logger.info(f"[API] GET /analytics/summary (subject={subject}, gender={gender})")
+    summary = await async_queries.get_mark_summary(
+        top_n=top_n, percentiles=PERCENTILES, subject=subject, gender=gender
+    )
+    snapshot = snapshot_from_summary(summary, top_n)
+    # dados já calculados no banco: vai direto para o JSON, sem validar de novo
+    return FastJSONResponse({
+        "total_students": snapshot.total_students,
+        "overall": vars(snapshot.overall),
+        "subjects": [
+            {"subject": name, **vars(stats)} for name, stats in snapshot.subjects.items()
+        ],
+        "top_students": [s.to_dict() for s in snapshot.top_students],
+        "top_n": snapshot.top_n,
+    }, headers=validators)
+
+
+@app.get("/analytics/subjects", response_model=List[SubjectStatsResponse])
+async def analytics_subjects(
+    subject: Optional[str] = None,
+    gender: Optional[str] = None,
+    validators: Dict[str, str] = Depends(table_validators),
+):
+    """Quantidade, média, mínimo e máximo de notas por disciplina (GROUP BY no banco)."""
+    stats = await async_queries.get_subject_mark_stats(subject=subject, gender=gender)
+    return FastJSONResponse([
+        {"subject": name, **subject_stats} for name, subject_stats in stats.items()
+    ], headers=validators)
+
+
+@app.get("/analytics/facets", response_model=FacetsResponse)
+async def analytics_facets(validators: Dict[str, str] = Depends(table_validators)):
+    """Valores distintos de subject e gender (opções de filtro do dashboard)."""
+    return FastJSONResponse(await async_queries.get_facets(), headers=validators)
+
+
+@app.get("/analytics/top", response_model=List[StudentResponse])
+async def analytics_top(
+    n: int = Query(5, ge=1, le=100),
+    subject: Optional[str] = None,
+    gender: Optional[str] = None,
+    validators: Dict[str, str] = Depends(table_validators),
+):
+    """Top N estudantes por nota (empates: menor student_id primeiro)."""
+    students = await async_queries.get_top_students_by_marks(n, subject=subject, gender=gender)
+    return RowsJSONResponse(
+        STUDENT_COLUMNS, [student_values(s) for s in students], headers=validators
+    )
+
+
+@app.post("/students/bulk", response_model=BulkResponse)
+async def bulk_create_students(
+    request: Request,
+    mode: str = Query("upsert", pattern="^(upsert|insert)$"),
+):
+    """
+    Carga em lote de estudantes (COPY + merge).
+    Aceita array JSON (application/json), NDJSON (application/x-ndjson)
+    ou CSV com cabeçalho (text/csv).
+    O corpo é lido em streaming para um arquivo temporário e carregado sem
+    ser materializado em memória.
+    """
+    try:
+        fmt = detect_format(content_type=request.headers.get("content-type", ""))
+    except ValueError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+
+    logger.info(f"[API] POST /students/bulk (format={fmt}, mode={mode})")
+    with tempfile.SpooledTemporaryFile(max_size=BULK_SPOOL_MAX_MEMORY) as spool:
+        async for chunk in request.stream():
+            spool.write(chunk)
+        spool.seek(0)
+
+        stream = io.TextIOWrapper(spool, encoding="utf-8", newline="")
+        try:
+            result = await run_in_threadpool(
+                bulk_insert_students, iter_records(stream, fmt), mode
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid {fmt} payload: {e}")
+        finally:
+            stream.detach()
+
+    return BulkResponse(**vars(result))
+
+
+@app.post("/students/batch", response_model=BatchResponse)
+async def batch_students(batch: BatchRequest):
+    """
+    Creates, updates parciais e deletes misturados, aplicados em ordem em
+    uma única transação: ou todas as operações valem, ou nenhuma.
+    404 se um update/delete aponta para um ID inexistente, 409 se um
+    create usa um ID que já existe (detail traz o índice da operação).
+    """
+    logger.info(f"[API] POST /students/batch ({len(batch.operations)} operations)")
+    try:
+        operations = [request_to_operation(item) for item in batch.operations]
+        results = await async_queries.apply_batch(operations)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except BatchError as e:
+        raise HTTPException(
+            status_code=409 if e.reason == "exists" else 404,
+            detail={"index": e.index, "message": str(e)},
+        )
+
+    return FastJSONResponse({
+        "results": [
+            {
+                "op": operation.op,
+                "student_id": operation.student_id,
+                "student": student.to_dict() if student is not None else None,
+            }
+            for operation, student in zip(operations, results)
+        ]
+    })
+
+
 @app.put("/students/{student_id}", response_model=StudentResponse)
-def update_student_endpoint(student_id: int, update: StudentUpdate):
+async def update_student_endpoint(student_id: int, update: StudentUpdate):
     """
     Atualiza um estudante (update parcial).
     Campos não enviados permanecem com o valor anterior.
     """
-    existing = get_student_by_id(student_id)
-    if existing is None:
+    # Um único UPDATE ... RETURNING: sem SELECT prévio
+    updated = await async_queries.update_student_fields(
+        student_id, update.model_dump(exclude_none=True)
+    )
+    if updated is None:
         raise HTTPException(status_code=404, detail="Student not found")
 
-    updated_domain = merge_student_update(existing, update)
-    updated_ok = update_student(updated_domain)
-    if not updated_ok:
-        # Em teoria não deveria acontecer, mas deixamos por segurança
-        raise HTTPException(status_code=400, detail="Update failed")
+    return domain_to_response(updated)
+
+
+@app.put("/students/{student_id}/replace", response_model=StudentResponse)
+async def replace_student_endpoint(student_id: int, student: StudentBase, response: Response):
+    """
+    Cria ou substitui (create-or-replace) o estudante com este ID.
+    Retorna 201 se foi criado, 200 se um registro existente foi substituído.
+    """
+    student_domain = StudentDomain(
+        student_id=student_id,
+        name=student.name,
+        age=student.age,
+        gender=student.gender,
+        subject=student.subject,
+        marks=student.marks,
+    )
+    created = await async_queries.upsert_student(student_domain)
+    response.status_code = 201 if created else 200
 
-    return domain_to_response(updated_domain)
+    return domain_to_response(student_domain)
 
 
 @app.delete("/students/{student_id}")
-def delete_student_endpoint(student_id: int):
+async def delete_student_endpoint(student_id: int):
     """Deleta um estudante pelo ID."""
-    deleted = delete_student_by_id(student_id)
+    deleted = await async_queries.delete_student_by_id(student_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Student not found")
     return {"message": f"Student {student_id} deleted successfully"}
@@ -0,0 +1,61 @@
+# src/api/metrics.py
+"""
+Métricas HTTP da API (ver database/metrics.py e GET /metrics).
+
+- api_requests_in_flight: requisições em andamento
+- api_request_duration_seconds{method,route,status}: do recebimento ao
+  último byte da resposta
+
+`route` é o template da rota (/students/{student_id}), não a URL, para não
+criar uma série por estudante. Requisições sem rota viram "<unmatched>".
+"""
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from database.metrics import REGISTRY, Gauge, Histogram
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+IN_FLIGHT = REGISTRY.register(Gauge(
+    "api_requests_in_flight", "HTTP requests being served."
+))
+REQUEST_DURATION = REGISTRY.register(Histogram(
+    "api_request_duration_seconds", "HTTP request latency until the last body byte.",
+    ["method", "route", "status"],
+))
+
+
+class MetricsMiddleware:
+    """Middleware ASGI: in-flight e latência por rota."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+        IN_FLIGHT.inc()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            IN_FLIGHT.dec()
+            # o router grava a rota escolhida no próprio scope
+            route = scope.get("route")
+            REQUEST_DURATION.observe(
+                time.perf_counter() - start,
+                method=scope["method"],
+                route=getattr(route, "path", UNMATCHED_ROUTE),
+                status=str(status),
+            )
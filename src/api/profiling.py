@@ -0,0 +1,76 @@
+# src/api/profiling.py
+"""
+Profiling de requisições da API sob demanda (ver src/profiling.py).
+
+Com PROFILE_REQUESTS=header, uma requisição com `X-Profile: 1` (ou o
+PROFILE_TOKEN) é perfilada; a resposta traz X-Profile-Id com o id do
+perfil gravado. Com PROFILE_REQUESTS=all, toda requisição é perfilada
+(uma por vez).
+
+O cProfile mede a thread do event loop inteira, não a requisição: enquanto
+ela espera (banco, rede), as corrotinas de outras requisições que rodam no
+mesmo loop entram no perfil. Para um perfil limpo, use o modo header com a
+API sem outro tráfego. Streams longos (UNPROFILED_PATHS) nunca são
+perfilados: segurariam a vaga única de perfil durante toda a conexão.
+"""
+import asyncio
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.profiling import (
+    PROFILE_HEADER,
+    finish_profile,
+    header_allows,
+    request_profiling_mode,
+    save_profile,
+    start_profile,
+)
+
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+# Rotas de streaming sem fim definido (SSE do dashboard)
+UNPROFILED_PATHS = frozenset({"/students/changes"})
+
+
+def _wants_profile(scope: Scope) -> bool:
+    if scope["path"] in UNPROFILED_PATHS:
+        return False
+    mode = request_profiling_mode()
+    if mode == "all":
+        return True
+    if mode == "header":
+        return header_allows(Headers(scope=scope).get(PROFILE_HEADER))
+    return False
+
+
+class ProfilingMiddleware:
+    """Middleware ASGI: perfila a requisição inteira, até o último byte."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not _wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        run = start_profile(f"{scope['method']} {scope['path']}")
+        if run is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(PROFILE_ID_HEADER, run.profile_id)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            finish_profile(run)
+            route = scope.get("route")
+            if route is not None:
+                run.label = f"{scope['method']} {route.path} ({scope['path']})"
+            # gravar e ordenar as estatísticas é trabalho de disco/CPU: fora do event loop
+            await asyncio.to_thread(save_profile, run)
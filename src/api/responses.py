@@ -0,0 +1,98 @@
+# src/api/responses.py
+"""
+Respostas JSON rápidas para as rotas de estudantes e analytics.
+
+- FastJSONResponse: classe padrão da app; usa orjson se estiver instalado
+  (senão json.dumps compacto).
+- RowsJSONResponse: lista de objetos JSON montada direto das tuplas do
+  banco, sem modelo pydantic por linha. Só para dados vindos do banco
+  (já validados na escrita): não há validação na saída.
+"""
+import json
+from json.encoder import encode_basestring
+from typing import Any, Callable, Iterable, List, Mapping, Optional, Sequence
+
+from fastapi.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:  # opcional: sem orjson, usa o json da stdlib
+    orjson = None
+
+# Colunas inteiras da tabela students; as demais são texto
+INT_COLUMNS = frozenset(("student_id", "age", "marks"))
+
+
+def _encode_int(value: Optional[int]) -> str:
+    return "null" if value is None else str(value)
+
+
+def _encode_str(value: Optional[str]) -> str:
+    # ensure_ascii=False, igual ao JSONResponse do Starlette
+    return "null" if value is None else encode_basestring(value)
+
+
+class RowEncoder:
+    """
+    Serializa tuplas (na ordem de `columns`) como objetos JSON.
+    O template do objeto é montado uma vez por conjunto de colunas e os
+    valores são codificados coluna a coluna (map sobre cada coluna), o
+    que evita um dict e um loop Python por campo em cada linha.
+    """
+
+    def __init__(self, columns: Sequence[str]):
+        self.columns = tuple(columns)
+        self._encoders: Sequence[Callable[[Any], str]] = tuple(
+            _encode_int if column in INT_COLUMNS else _encode_str for column in self.columns
+        )
+        self._template = "{" + ",".join(f"{encode_basestring(c)}:%s" for c in self.columns) + "}"
+
+    def _objects(self, rows: Iterable[Sequence[Any]]) -> List[str]:
+        encoded_columns = [
+            list(map(encode, column)) for encode, column in zip(self._encoders, zip(*rows))
+        ]
+        template = self._template
+        return [template % values for values in zip(*encoded_columns)]
+
+    def encode_rows(self, rows: Iterable[Sequence[Any]]) -> bytes:
+        """Array JSON com um objeto por linha."""
+        if orjson is not None:
+            columns = self.columns
+            return orjson.dumps([dict(zip(columns, row)) for row in rows])
+        return ("[" + ",".join(self._objects(rows)) + "]").encode("utf-8")
+
+    def encode_lines(self, rows: Iterable[Sequence[Any]]) -> str:
+        """NDJSON: um objeto por linha, cada um terminado em \\n."""
+        objects = self._objects(rows)
+        return "\n".join(objects) + "\n" if objects else ""
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse com orjson quando disponível."""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content)
+        return json.dumps(
+            content, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode("utf-8")
+
+
+class RowsJSONResponse(Response):
+    """Array JSON de objetos, codificado direto das tuplas do banco."""
+
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        columns: Sequence[str],
+        rows: Iterable[Sequence[Any]],
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+    ):
+        super().__init__(
+            content=RowEncoder(columns).encode_rows(rows),
+            status_code=status_code,
+            headers=dict(headers) if headers else None,
+        )
+
@@ -1,14 +1,30 @@
 # src/cli/main.py
-from database.models import Student
+import argparse
+import contextlib
+import csv
+import json
+import os
+import sys
+from typing import Iterator, Optional
+
+from database.ingest import detect_format, iter_records
+from database.models import MAX_MARKS, MIN_MARKS, Student
 from database.queries import (create_students_table, 
                               insert_student, 
-                              get_all_students, 
+                              iter_students, 
+                              iter_student_rows,
                               delete_student_by_id, 
+                              delete_students,
                               get_student_by_id,
                               update_student,
+                              bulk_insert_students,
+                              check_subject_mark_stats,
+                              rebuild_subject_mark_stats,
+                              STUDENT_COLUMNS,
 )
 
-from src.analytics.marks_analysis import print_analytics_summary
+from database.config import load_config
+from src.profiling import SORT_KEYS, SUMMARY_TOP, list_profiles, profile_dir, render_profile
 
 def show_menu():
     print("\n=== Student Performance CLI ===")
@@ -18,10 +34,14 @@ def show_menu():
     print("4. Deletar estudante por ID")
     print("5. Atualizar estudante por ID")
     print("6. Ver resumo de analytics")
+    print("7. Importar estudantes de arquivo (CSV/NDJSON/JSON)")
+    print("8. Verificar/reconstruir agregados por disciplina")
     print("0. Sair")
 
 def handle_create_table():
-    create_students_table()
+    applied = create_students_table()
+    if applied:
+        print(f"Migrações aplicadas: {', '.join(map(str, applied))}")
     print("Tabela 'students' criada/verificada com sucesso.")
 
 def handle_insert_student():
@@ -37,6 +57,9 @@ def handle_insert_student():
     except ValueError:
         print("Idade inválida. Digite um número inteiro.")
         return
+    if age < 0:
+        print("Idade inválida. Digite um número não negativo.")
+        return
 
     gender = input("Gênero: ")
     subject = input("Disciplina: ")
@@ -45,6 +68,9 @@ def handle_insert_student():
     except ValueError:
         print("Nota inválida. Digite um número inteiro.")
         return
+    if not MIN_MARKS <= marks <= MAX_MARKS:
+        print(f"Nota inválida. Digite um valor entre {MIN_MARKS} e {MAX_MARKS}.")
+        return
 
     student = Student(
         student_id=student_id,
@@ -63,16 +89,18 @@ def handle_insert_student():
 
 
 def handle_list_students():
-    students = get_all_students()
-    if not students:
-        print("Nenhum estudante cadastrado.")
-        return
-
-    print("\nID | Nome | Idade | Gênero | Disciplina | Nota")
-    print("-" * 50)
-    for s in students:
+    # gerador: as linhas chegam do banco em blocos, sem carregar a tabela toda
+    found = False
+    for s in iter_students():
+        if not found:
+            print("\nID | Nome | Idade | Gênero | Disciplina | Nota")
+            print("-" * 50)
+            found = True
         print(f"{s.student_id} | {s.name} | {s.age} | {s.gender} | {s.subject} | {s.marks}")
 
+    if not found:
+        print("Nenhum estudante cadastrado.")
+
 def handle_delete_student():
     try:
         student_id = int(input("Informe o ID do estudante a ser deletado: "))
@@ -87,10 +115,353 @@ def handle_delete_student():
         print(f"Nenhum estudante encontrado com ID {student_id}.")
 
 def handle_show_analytics():
+    # analytics (NumPy) só é importado quando usado: o menu abre rápido
+    from src.analytics.marks_analysis import print_analytics_summary
+
     print_analytics_summary(top_n=5)
 
+def handle_import_students():
+    path = input("Caminho do arquivo (.csv, .ndjson, .jsonl ou .json): ").strip()
+    try:
+        fmt = detect_format(filename=path)
+    except ValueError:
+        print("Formato não suportado. Use .csv, .ndjson, .jsonl ou .json.")
+        return
+
+    update_existing = input("Atualizar estudantes com ID já existente? (s/N): ").strip().lower()
+    mode = "upsert" if update_existing == "s" else "insert"
+
+    try:
+        # o arquivo é lido em streaming, linha a linha, direto para o COPY
+        with open(path, encoding="utf-8", newline="") as f:
+            result = bulk_insert_students(iter_records(f, fmt), mode=mode)
+    except FileNotFoundError:
+        print(f"Arquivo não encontrado: {path}")
+        return
+    except ValueError as e:
+        print(f"Arquivo inválido: {e}")
+        return
+
+    print(f"Inseridos: {result.inserted}")
+    print(f"Atualizados: {result.updated}")
+    print(f"Rejeitados: {result.rejected}")
+    for error in result.errors:
+        print(f" - {error}")
+
+
+def handle_rebuild_subject_stats():
+    mismatches = check_subject_mark_stats()
+    if not mismatches:
+        print("Agregados por disciplina consistentes com a tabela students.")
+        return
+
+    print(f"Divergências em {len(mismatches)} disciplina(s):")
+    for m in mismatches:
+        print(f" - {m['subject']}: armazenado={m['stored']} esperado={m['expected']}")
+    rebuild_subject_mark_stats()
+    print("Agregados reconstruídos.")
+
+
+# ======== Subcomandos (modo não interativo) ========
+# Dados vão para stdout (para pipes) e mensagens/erros para stderr.
+# Cada subcomando faz uma única chamada ao queries layer: uma conexão e,
+# nas escritas, uma transação (import: COPY; delete: todos os IDs).
+
+EXIT_OK = 0
+# falha na operação ou registros rejeitados no import
+EXIT_ERROR = 1
+# argumentos inválidos (argparse usa o mesmo código)
+EXIT_USAGE = 2
+EXIT_INTERRUPTED = 130
+
+LIST_FORMATS = ("table", "json", "csv")
+EXPORT_FORMATS = ("ndjson", "csv")
+
+
+def _error(message: str) -> None:
+    print(f"Erro: {message}", file=sys.stderr)
+
+
+def _open_text(path: str):
+    """Arquivo de entrada ou stdin ("-"); stdin não é fechado no fim."""
+    if path == "-":
+        return contextlib.nullcontext(sys.stdin)
+    return open(path, encoding="utf-8", newline="")
+
+
+def _row_dict(row: tuple) -> dict:
+    return dict(zip(STUDENT_COLUMNS, row))
+
+
+def write_rows(row_chunks, fmt: str, out) -> int:
+    """Escreve os blocos de linhas em `out` conforme o formato; retorna o total."""
+    total = 0
+    if fmt == "csv":
+        writer = csv.writer(out, lineterminator="\n")
+        writer.writerow(STUDENT_COLUMNS)
+        for rows in row_chunks:
+            writer.writerows(rows)
+            total += len(rows)
+    elif fmt == "ndjson":
+        for rows in row_chunks:
+            out.write("".join(json.dumps(_row_dict(row), ensure_ascii=False) + "\n" for row in rows))
+            total += len(rows)
+    elif fmt == "json":
+        # array JSON escrito em streaming, um objeto por linha
+        out.write("[")
+        for rows in row_chunks:
+            for row in rows:
+                out.write(",\n" if total else "\n")
+                out.write(json.dumps(_row_dict(row), ensure_ascii=False))
+                total += 1
+        out.write("\n]\n" if total else "]\n")
+    else:
+        found = False
+        for rows in row_chunks:
+            if not found:
+                out.write("ID | Nome | Idade | Gênero | Disciplina | Nota\n" + "-" * 50 + "\n")
+                found = True
+            out.write("".join(" | ".join(map(str, row)) + "\n" for row in rows))
+            total += len(rows)
+    return total
+
+
+def iter_ids(lines) -> Iterator[int]:
+    """IDs de um arquivo, um por linha (linhas vazias e # comentários são ignorados)."""
+    for number, line in enumerate(lines, start=1):
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        try:
+            yield int(line)
+        except ValueError:
+            raise ValueError(f"line {number}: invalid student_id {line!r}") from None
+
+
+def command_create_table(args) -> int:
+    applied = create_students_table()
+    if applied:
+        print(f"Migrações aplicadas: {', '.join(map(str, applied))}", file=sys.stderr)
+    return EXIT_OK
+
+
+def command_import(args) -> int:
+    try:
+        fmt = args.format or detect_format(filename=args.file)
+    except ValueError:
+        _error("formato não reconhecido pela extensão; use --format csv|ndjson|json")
+        return EXIT_USAGE
+    # o arquivo é lido em streaming, direto para a carga em lote (uma transação)
+    with _open_text(args.file) as f:
+        result = bulk_insert_students(iter_records(f, fmt), mode=args.mode)
+    print(f"inserted={result.inserted} updated={result.updated} rejected={result.rejected}")
+    for error in result.errors:
+        print(f" - {error}", file=sys.stderr)
+    return EXIT_ERROR if result.rejected else EXIT_OK
+
+
+def _output(path: Optional[str]):
+    if path is None or path == "-":
+        return contextlib.nullcontext(sys.stdout)
+    return open(path, "w", encoding="utf-8", newline="")
+
 
-def main():
+def command_export(args) -> int:
+    with _output(args.output) as out:
+        total = write_rows(
+            iter_student_rows(subject=args.subject, gender=args.gender), args.format, out
+        )
+    if args.output not in (None, "-"):
+        print(f"{total} estudantes exportados para {args.output}", file=sys.stderr)
+    return EXIT_OK
+
+
+def command_list(args) -> int:
+    row_chunks = iter_student_rows(subject=args.subject, gender=args.gender)
+    if args.limit is not None:
+        row_chunks = _limit_chunks(row_chunks, args.limit)
+    total = write_rows(row_chunks, args.format, sys.stdout)
+    if total == 0 and args.format == "table":
+        print("Nenhum estudante cadastrado.", file=sys.stderr)
+    return EXIT_OK
+
+
+def _limit_chunks(row_chunks, limit: int):
+    try:
+        for rows in row_chunks:
+            if limit <= 0:
+                return
+            yield rows[:limit]
+            limit -= len(rows)
+    finally:
+        # devolve a conexão do cursor de streaming sem ler o resto
+        row_chunks.close()
+
+
+def command_analytics(args) -> int:
+    if args.format == "json":
+        from src.analytics.snapshot import compute_analytics_snapshot
+
+        snapshot = compute_analytics_snapshot(top_n=args.top, subject=args.subject, gender=args.gender)
+        json.dump(snapshot.to_dict(), sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        from src.analytics.marks_analysis import print_analytics_summary
+
+        print_analytics_summary(top_n=args.top, subject=args.subject, gender=args.gender)
+    return EXIT_OK
+
+
+def command_delete(args) -> int:
+    read = 0
+
+    def counted(ids):
+        nonlocal read
+        for student_id in ids:
+            read += 1
+            yield student_id
+
+    if args.ids_from is not None:
+        # IDs lidos em streaming, em blocos, todos na mesma transação
+        with _open_text(args.ids_from) as f:
+            deleted = delete_students(counted(iter_ids(f)))
+    else:
+        deleted = delete_students(counted(args.ids))
+
+    print(f"deleted={deleted}")
+    missing = read - deleted
+    if missing:
+        print(f"{missing} ID(s) não encontrados (ou repetidos)", file=sys.stderr)
+    return EXIT_ERROR if missing else EXIT_OK
+
+
+def command_menu(args) -> int:
+    run_menu()
+    return EXIT_OK
+
+
+def command_profiles_list(args) -> int:
+    profiles = list_profiles()
+    if not profiles:
+        print(f"Nenhum perfil em {profile_dir()}.", file=sys.stderr)
+        return EXIT_OK
+    for p in profiles:
+        duration = f"{p.seconds * 1000:.1f} ms" if p.seconds is not None else "-"
+        print(f"{p.profile_id} | {p.created_at:%Y-%m-%d %H:%M:%S} | {duration} | {p.label}")
+    return EXIT_OK
+
+
+def command_profiles_show(args) -> int:
+    profile_id = args.profile_id
+    if profile_id == "latest":
+        profiles = list_profiles()
+        if not profiles:
+            _error(f"nenhum perfil em {profile_dir()}")
+            return EXIT_ERROR
+        profile_id = profiles[0].profile_id
+    try:
+        print(render_profile(profile_id, sort=args.sort, limit=args.limit))
+    except FileNotFoundError as e:
+        _error(str(e))
+        return EXIT_ERROR
+    return EXIT_OK
+
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be >= 1: {value}")
+    return number
+
+
+def _add_filters(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--subject", help="só estudantes desta disciplina")
+    parser.add_argument("--gender", help="só estudantes deste gênero")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.cli.main",
+        description="Student Performance CLI. Sem subcomando, abre o menu interativo.",
+        epilog="Códigos de saída: 0 ok, 1 falha (ou registros rejeitados/IDs não encontrados), "
+               "2 uso inválido, 130 interrompido.",
+    )
+    commands = parser.add_subparsers(dest="command", metavar="command")
+
+    commands.add_parser("menu", help="menu interativo (padrão)").set_defaults(handler=command_menu)
+
+    commands.add_parser(
+        "create-table", help="cria a tabela / aplica as migrações pendentes"
+    ).set_defaults(handler=command_create_table)
+
+    load = commands.add_parser("import", help="carga em lote de um arquivo (uma transação)")
+    load.add_argument("file", help="arquivo .csv, .ndjson, .jsonl ou .json ('-' = stdin)")
+    load.add_argument("--format", choices=("csv", "ndjson", "json"), help="padrão: pela extensão")
+    load.add_argument("--mode", choices=("upsert", "insert"), default="upsert",
+                      help="upsert atualiza IDs existentes; insert os rejeita")
+    load.set_defaults(handler=command_import)
+
+    export = commands.add_parser("export", help="exporta a tabela em streaming")
+    export.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson")
+    export.add_argument("-o", "--output", help="arquivo de saída (padrão: stdout)")
+    _add_filters(export)
+    export.set_defaults(handler=command_export)
+
+    listing = commands.add_parser("list", help="lista estudantes")
+    listing.add_argument("--format", choices=LIST_FORMATS, default="table")
+    listing.add_argument("--limit", type=_positive_int, help="máximo de estudantes")
+    _add_filters(listing)
+    listing.set_defaults(handler=command_list)
+
+    analytics = commands.add_parser("analytics", help="resumo de analytics")
+    analytics.add_argument("--top", type=_positive_int, default=5, help="top N estudantes (padrão 5)")
+    analytics.add_argument("--format", choices=("text", "json"), default="text")
+    _add_filters(analytics)
+    analytics.set_defaults(handler=command_analytics)
+
+    delete = commands.add_parser("delete", help="deleta estudantes em uma transação")
+    targets = delete.add_mutually_exclusive_group(required=True)
+    targets.add_argument("ids", nargs="*", type=int, default=[], help="IDs a deletar")
+    targets.add_argument("--ids-from", metavar="FILE", help="arquivo com um ID por linha ('-' = stdin)")
+    delete.set_defaults(handler=command_delete)
+
+    profiles = commands.add_parser("profiles", help="perfis gravados (PROFILE_REQUESTS/PROFILE_ANALYTICS)")
+    profile_commands = profiles.add_subparsers(dest="profiles_command", required=True)
+    profile_commands.add_parser("list", help="lista os perfis, do mais recente ao mais antigo").set_defaults(
+        handler=command_profiles_list
+    )
+    show = profile_commands.add_parser("show", help="mostra as funções mais caras de um perfil")
+    show.add_argument("profile_id", help="id do perfil (ver 'profiles list') ou 'latest'")
+    show.add_argument("--sort", choices=SORT_KEYS, default="cumulative")
+    show.add_argument("--limit", type=int, default=SUMMARY_TOP, help="quantidade de funções")
+    show.set_defaults(handler=command_profiles_show)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    load_config()
+    if args.command is None:
+        run_menu()
+        return EXIT_OK
+
+    try:
+        return args.handler(args)
+    except KeyboardInterrupt:
+        return EXIT_INTERRUPTED
+    except BrokenPipeError:
+        # saída fechada antes do fim (ex.: | head): sem traceback
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return EXIT_ERROR
+    except (OSError, ValueError) as e:
+        _error(str(e))
+        return EXIT_ERROR
+    except Exception as e:  # erro do banco (psycopg2/sqlite3) ou inesperado
+        _error(f"{type(e).__name__}: {e}")
+        return EXIT_ERROR
+
+
+def run_menu():
     while True:
         show_menu()
         choice = input("Escolha uma opção: ")
@@ -107,6 +478,10 @@ def main():
             handle_update_student()
         elif choice == "6":
             handle_show_analytics() 
+        elif choice == "7":
+            handle_import_students()
+        elif choice == "8":
+            handle_rebuild_subject_stats()
         elif choice == "0":
             print("Saindo...")
             break
@@ -150,6 +525,10 @@ def handle_update_student():
         except ValueError:
             print("Idade inválida. Mantendo valor atual.")
             new_age = existing.age
+        else:
+            if new_age < 0:
+                print("Idade inválida. Mantendo valor atual.")
+                new_age = existing.age
 
     # Gênero
     new_gender = input(f"Gênero [{existing.gender}]: ").strip()
@@ -171,6 +550,10 @@ def handle_update_student():
         except ValueError:
             print("Nota inválida. Mantendo valor atual.")
             new_marks = existing.marks
+        else:
+            if not MIN_MARKS <= new_marks <= MAX_MARKS:
+                print(f"Nota fora da faixa {MIN_MARKS}-{MAX_MARKS}. Mantendo valor atual.")
+                new_marks = existing.marks
 
     updated_student = Student(
         student_id=existing.student_id,
@@ -188,4 +571,4 @@ def handle_update_student():
         print("Nenhuma alteração foi aplicada.")
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
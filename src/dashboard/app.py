@@ -1,9 +1,14 @@
+import math
 import os
+import pandas as pd
 import requests
 import streamlit as st
-import pandas as pd
 import logging
 
+# streamlit run src/dashboard/app.py coloca a pasta do script no sys.path
+from client import COLUMNS, ApiClient, diff_operations
+from live import ChangeWatcher
+
 # Logger
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("dashboard")
@@ -17,36 +22,25 @@ st.caption("UI → FastAPI → PostgreSQL")
 API_BASE_URL = os.getenv("API_BASE_URL", "http://127.0.0.1:8000")
 print("API_BASE_URL", API_BASE_URL)
 
-@st.cache_data(ttl=10)
-def fetch_students():
-    logger.info("[DASHBOARD] GET /students")
-    try:
-        resp = requests.get(f"{API_BASE_URL}/students", timeout=5)
-        resp.raise_for_status()
-        return resp.json()
-    except requests.exceptions.RequestException as e:
-        st.error(f"API connection error: {e}")
-        st.info("Make sure the FastAPI server is running and the API Base URL is correct.")
-        return []
-
-def create_student(payload: dict):
-    logger.info(f"[DASHBOARD] POST /students (id={payload['student_id']})")
-    resp = requests.post(f"{API_BASE_URL}/students", json=payload, timeout=5)
-    if resp.status_code >= 400:
-        return False, resp.text
-    return True, resp.json()
-
-def update_student(student_id: int, payload: dict):
-    resp = requests.put(f"{API_BASE_URL}/students/{student_id}", json=payload, timeout=5)
-    if resp.status_code >= 400:
-        return False, resp.text
-    return True, resp.json()
-
-def delete_student(student_id: int):
-    resp = requests.delete(f"{API_BASE_URL}/students/{student_id}", timeout=5)
-    if resp.status_code >= 400:
-        return False, resp.text
-    return True, resp.json()
+@st.cache_resource
+def get_client(base_url: str) -> ApiClient:
+    """Cliente da API (sessão keep-alive) compartilhado entre sessões e reruns."""
+    return ApiClient(base_url)
+
+@st.cache_resource
+def get_change_watcher(base_url: str) -> ChangeWatcher:
+    """Assinatura de /students/changes por URL da API, compartilhada entre sessões."""
+    watcher = ChangeWatcher(get_client(base_url))
+    watcher.start()
+    return watcher
+
+# Linhas por página na tabela de estudantes
+PAGE_SIZES = [25, 50, 100, 250]
+
+def api_error(e: Exception):
+    st.error(f"API connection error: {e}")
+    st.info("Make sure the FastAPI server is running and the API Base URL is correct.")
+    st.stop()
 
 # Sidebar
 st.sidebar.header("⚙️ Config")
@@ -75,51 +69,66 @@ with st.sidebar.form("add_student_form"):
             "subject": subject.strip(),
             "marks": int(marks),
         }
-        ok, data = create_student(payload)
+        ok, data = get_client(API_BASE_URL).create_student(payload)
         if ok:
             st.success("Student created!")
-            st.cache_data.clear()
         else:
             st.error(f"Failed to create student: {data}")
 
 # Main: Load data
-try:
-    students = fetch_students()
-except Exception as e:
-    st.error(f"Could not fetch students from API: {e}")
-    st.stop()
+# O dashboard não guarda a tabela: agregados e a página atual vêm da API
+# para os filtros escolhidos, com GET condicional (304 = reaproveita)
+client = get_client(API_BASE_URL)
+watcher = get_change_watcher(API_BASE_URL)
+st.session_state["live_version"] = watcher.version
 
-df = pd.DataFrame(students)
-if df.empty:
-    st.info("No students found. Add one using the sidebar.")
-    st.stop()
+@st.fragment(run_every="1s")
+def watch_changes():
+    """Refaz a página quando a tabela mudou na API."""
+    if watcher.version != st.session_state.get("live_version"):
+        st.rerun()
+
+watch_changes()
+
+try:
+    facets = client.facets()
+except requests.exceptions.RequestException as e:
+    api_error(e)
 
 # Filters
 col1, col2, col3 = st.columns(3)
 with col1:
-    subjects = ["All"] + sorted(df["subject"].dropna().unique().tolist())
-    selected_subject = st.selectbox("Filter by subject", subjects)
+    selected_subject = st.selectbox("Filter by subject", ["All"] + facets["subjects"])
 
 with col2:
-    genders = ["All"] + sorted(df["gender"].dropna().unique().tolist())
-    selected_gender = st.selectbox("Filter by gender", genders)
+    selected_gender = st.selectbox("Filter by gender", ["All"] + facets["genders"])
 
 with col3:
     top_n = st.slider("Top N students", min_value=3, max_value=20, value=5, step=1)
 
-filtered = df.copy()
-filtered = filtered[['student_id'] + [col for col in filtered.columns if col != 'student_id']]
-if selected_subject != "All":
-    filtered = filtered[filtered["subject"] == selected_subject]
-if selected_gender != "All":
-    filtered = filtered[filtered["gender"] == selected_gender]
+subject_filter = None if selected_subject == "All" else selected_subject
+gender_filter = None if selected_gender == "All" else selected_gender
+
+try:
+    # KPIs, média por disciplina e top N em uma requisição
+    summary = client.summary(subject_filter, gender_filter, top_n)
+except requests.exceptions.RequestException as e:
+    api_error(e)
+
+if summary["total_students"] == 0:
+    if subject_filter is None and gender_filter is None:
+        st.info("No students found. Add one using the sidebar.")
+    else:
+        st.info("No students match the selected filters.")
+    st.stop()
 
 # KPIs
+overall = summary["overall"]
 k1, k2, k3, k4 = st.columns(4)
-k1.metric("Students", len(filtered))
-k2.metric("Avg marks", round(filtered["marks"].mean(), 2))
-k3.metric("Min marks", int(filtered["marks"].min()))
-k4.metric("Max marks", int(filtered["marks"].max()))
+k1.metric("Students", summary["total_students"])
+k2.metric("Avg marks", overall["average"] if overall["average"] is not None else "-")
+k3.metric("Min marks", overall["min"] if overall["min"] is not None else "-")
+k4.metric("Max marks", overall["max"] if overall["max"] is not None else "-")
 
 st.divider()
 
@@ -127,11 +136,42 @@ left, right = st.columns([2, 1])
 
 with left:
     st.subheader("📋 Students")
-    st.dataframe(filtered.sort_values(["student_id"], ascending=True), use_container_width=True)
+    page_size = st.selectbox("Rows per page", PAGE_SIZES, index=1)
+    # cursores (keyset) das páginas visitadas; voltam à primeira se os filtros mudam
+    page_key = (API_BASE_URL, subject_filter, gender_filter, page_size)
+    if st.session_state.get("page_key") != page_key:
+        st.session_state["page_key"] = page_key
+        st.session_state["page_cursors"] = [None]
+    cursors = st.session_state["page_cursors"]
+
+    try:
+        rows, next_cursor = client.students_page(page_size, cursors[-1], subject_filter, gender_filter)
+    except requests.exceptions.RequestException as e:
+        api_error(e)
+    if not rows and len(cursors) > 1:
+        # a página ficou vazia (estudantes removidos): volta uma
+        cursors.pop()
+        st.rerun()
+
+    page = pd.DataFrame(rows, columns=COLUMNS)
+    st.dataframe(page, use_container_width=True, hide_index=True)
+
+    nav1, nav2, nav3 = st.columns([1, 1, 3])
+    if nav1.button("◀ Previous", disabled=len(cursors) == 1):
+        cursors.pop()
+        st.rerun()
+    if nav2.button("Next ▶", disabled=next_cursor is None):
+        cursors.append(next_cursor)
+        st.rerun()
+    nav3.caption(f"Page {len(cursors)} of {math.ceil(summary['total_students'] / page_size)}")
 
 with right:
     st.subheader("📈 Average marks by subject")
-    avg_by_subject = df.groupby("subject")["marks"].mean().sort_values(ascending=False)
+    avg_by_subject = pd.Series({
+        s["subject"]: s["average"]
+        for s in summary["subjects"]
+        if s["subject"] is not None and s["average"] is not None
+    }, dtype=float).sort_values(ascending=False)
     st.bar_chart(avg_by_subject)
 
 st.divider()
@@ -139,7 +179,7 @@ st.divider()
 center = st.columns(1)[0]
 with center:
     st.subheader(f"🏅 Top {top_n}")
-    top_df = df.sort_values("marks", ascending=False).head(top_n)[
+    top_df = pd.DataFrame(summary["top_students"], columns=COLUMNS)[
         ["student_id", "name", "subject", "marks"]
     ]
     st.table(top_df)
@@ -147,8 +187,8 @@ with center:
 st.divider()
 
 st.subheader("🛠️ Manage Student")
-student_ids = ["None"] + sorted(df["student_id"].tolist())
-selected_id = st.selectbox("Select student_id", student_ids)
+student_ids = ["None"] + page["student_id"].tolist()
+selected_id = st.selectbox("Select student_id (current page)", student_ids)
 
 action_col1, action_col2 = st.columns(2)
 
@@ -178,10 +218,9 @@ with action_col1:
             if not payload:
                 st.warning("No fields provided.")
             else:
-                ok, data = update_student(int(selected_id), payload)
+                ok, data = client.update_student(int(selected_id), payload)
                 if ok:
                     st.success("Student updated!")
-                    st.cache_data.clear()
                     st.rerun()
                 else:
                     st.error(f"Failed to update: {data}")
@@ -189,10 +228,30 @@ with action_col1:
 with action_col2:
     st.write("Delete selected student")
     if st.button("Delete", type="primary"):
-        ok, data = delete_student(int(selected_id))
+        ok, data = client.delete_student(int(selected_id))
         if ok:
             st.success("Student deleted!")
-            st.cache_data.clear()
             st.rerun()
         else:
-            st.error(f"Failed to delete: {data}")
\ No newline at end of file
+            st.error(f"Failed to delete: {data}")
+
+st.divider()
+
+st.subheader("🧮 Bulk edit")
+st.caption("Edit, add or remove rows of the current page, then save: all changes go in one request and one transaction.")
+edited = st.data_editor(page, num_rows="dynamic", use_container_width=True, hide_index=True, key="bulk_editor")
+if st.button("Save changes"):
+    try:
+        operations = diff_operations(page, edited)
+    except ValueError as e:
+        st.error(str(e))
+        operations = None
+    if operations == []:
+        st.info("No changes to save.")
+    elif operations:
+        ok, data = client.batch(operations)
+        if ok:
+            st.success(f"{len(operations)} changes saved!")
+            st.rerun()
+        else:
+            st.error(f"Failed to save changes: {data}")
@@ -0,0 +1,221 @@
+# src/dashboard/client.py
+"""
+Cliente HTTP do dashboard para a API.
+
+Uma requests.Session com pool de conexões keep-alive (sem um handshake
+TCP por chamada) e retries com backoff exponencial:
+- falhas de conexão: qualquer método (a requisição nem chegou à API)
+- 502/503/504 e timeouts de leitura: só métodos idempotentes (GET, PUT, DELETE)
+
+Leituras (agregados e páginas da tabela) são GETs condicionais: o corpo
+da última resposta de cada URL fica guardado com o ETag (até CACHE_SIZE
+URLs) e, se a API responde 304, é reaproveitado sem baixar nada.
+
+Edições de várias linhas viram um único POST /students/batch
+(ver diff_operations). pandas só é importado por diff_operations.
+"""
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional, Tuple
+from urllib.parse import urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import logging
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Logger
+logger = logging.getLogger("dashboard")
+
+# Conexões mantidas abertas com a API (stream de alterações + chamadas da UI)
+POOL_SIZE = 10
+RETRIES = 3
+# Espera entre tentativas: 0.3s, 0.6s, 1.2s...
+BACKOFF_FACTOR = 0.3
+RETRY_STATUS = (502, 503, 504)
+TIMEOUT = 10
+# Respostas guardadas para GET condicional (uma por URL, LRU)
+CACHE_SIZE = 64
+# Headers da resposta que as leituras devolvem junto com o corpo
+KEPT_HEADERS = ("X-Next-Cursor",)
+
+FIELDS = ("name", "age", "gender", "subject", "marks")
+COLUMNS = ("student_id",) + FIELDS
+# colunas inteiras viram float no DataFrame quando têm algum valor ausente
+INT_FIELDS = ("age", "marks")
+
+# (ok, corpo JSON ou mensagem de erro)
+Result = Tuple[bool, Any]
+
+
+class ApiClient:
+    """Acesso à API com uma sessão HTTP compartilhada."""
+
+    def __init__(
+        self,
+        base_url: str,
+        pool_size: int = POOL_SIZE,
+        retries: int = RETRIES,
+        cache_size: int = CACHE_SIZE,
+    ):
+        self.base_url = base_url.rstrip("/")
+        # URL -> (ETag, corpo, headers guardados)
+        self._cache: "OrderedDict[str, Tuple[str, Any, Dict[str, str]]]" = OrderedDict()
+        self._cache_size = cache_size
+        self._cache_lock = threading.Lock()
+        retry = Retry(
+            total=retries,
+            backoff_factor=BACKOFF_FACTOR,
+            status_forcelist=RETRY_STATUS,
+            # devolve a última resposta em vez de levantar MaxRetryError
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def request(self, method: str, path: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", TIMEOUT)
+        return self.session.request(method, f"{self.base_url}{path}", **kwargs)
+
+    def _call(self, method: str, path: str, **kwargs) -> Result:
+        try:
+            resp = self.request(method, path, **kwargs)
+        except requests.exceptions.RequestException as e:
+            return False, str(e)
+        if resp.status_code >= 400:
+            return False, resp.text
+        return True, resp.json()
+
+    def close(self) -> None:
+        self.session.close()
+
+    # ======== Leitura ========
+
+    def get_json(
+        self, path: str, params: Optional[Mapping[str, Any]] = None
+    ) -> Tuple[Any, Dict[str, str]]:
+        """
+        GET condicional: (corpo JSON, headers de KEPT_HEADERS).
+        Levanta requests.RequestException se a API falhar.
+        """
+        params = {k: v for k, v in (params or {}).items() if v is not None}
+        key = f"{path}?{urlencode(sorted(params.items()))}"
+        with self._cache_lock:
+            cached = self._cache.get(key)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+
+        resp = self.request("GET", path, params=params, headers=headers)
+        if resp.status_code == 304 and cached:
+            with self._cache_lock:
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+            return cached[1], cached[2]
+        resp.raise_for_status()
+
+        body = resp.json()
+        kept = {name: resp.headers[name] for name in KEPT_HEADERS if name in resp.headers}
+        etag = resp.headers.get("ETag")
+        if etag:
+            with self._cache_lock:
+                self._cache[key] = (etag, body, kept)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self._cache_size:
+                    self._cache.popitem(last=False)
+        return body, kept
+
+    def facets(self) -> Dict[str, List[str]]:
+        """Opções dos filtros: {"subjects": [...], "genders": [...]}."""
+        return self.get_json("/analytics/facets")[0]
+
+    def summary(
+        self, subject: Optional[str] = None, gender: Optional[str] = None, top_n: int = 5
+    ) -> Dict[str, Any]:
+        """KPIs, estatísticas por disciplina e top N calculados na API."""
+        params = {"subject": subject, "gender": gender, "top_n": top_n}
+        return self.get_json("/analytics/summary", params)[0]
+
+    def students_page(
+        self,
+        limit: int,
+        after: Optional[int] = None,
+        subject: Optional[str] = None,
+        gender: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Uma página de GET /students: (linhas, cursor da próxima página ou None)."""
+        params = {"limit": limit, "after": after, "subject": subject, "gender": gender}
+        rows, headers = self.get_json("/students", params)
+        cursor = headers.get("X-Next-Cursor")
+        return rows, int(cursor) if cursor is not None else None
+
+    def stream_changes(self, last_event_id: Optional[str], read_timeout: float) -> requests.Response:
+        """Abre o stream SSE de /students/changes (resposta em streaming)."""
+        headers = {"Accept": "text/event-stream"}
+        if last_event_id is not None:
+            headers["Last-Event-ID"] = last_event_id
+        return self.request(
+            "GET", "/students/changes", headers=headers, stream=True, timeout=(5, read_timeout)
+        )
+
+    # ======== Escrita ========
+
+    def create_student(self, payload: Dict[str, Any]) -> Result:
+        logger.info(f"[DASHBOARD] POST /students (id={payload['student_id']})")
+        return self._call("POST", "/students", json=payload)
+
+    def update_student(self, student_id: int, payload: Dict[str, Any]) -> Result:
+        return self._call("PUT", f"/students/{student_id}", json=payload)
+
+    def delete_student(self, student_id: int) -> Result:
+        return self._call("DELETE", f"/students/{student_id}")
+
+    def batch(self, operations: List[Dict[str, Any]]) -> Result:
+        """Creates/updates/deletes em uma requisição e uma transação."""
+        logger.info(f"[DASHBOARD] POST /students/batch ({len(operations)} operations)")
+        return self._call("POST", "/students/batch", json={"operations": operations})
+
+
+def _plain(field: str, value: Any) -> Any:
+    """Valor do DataFrame -> tipo Python serializável (NaN/NA viram None)."""
+    import pandas as pd
+
+    if pd.isna(value):
+        return None
+    if field in INT_FIELDS:
+        return int(value)
+    return value.item() if hasattr(value, "item") else value
+
+
+def diff_operations(original: "pd.DataFrame", edited: "pd.DataFrame") -> List[Dict[str, Any]]:
+    """
+    Operações do batch que levam `original` a `edited` (ambos com a coluna
+    student_id): linhas removidas viram delete, novas viram create e
+    alteradas viram update só com os campos que mudaram.
+    """
+    if edited["student_id"].isna().any():
+        raise ValueError("New rows need a student_id")
+
+    before = {int(row["student_id"]): row for _, row in original.iterrows()}
+    after = {int(row["student_id"]): row for _, row in edited.iterrows()}
+
+    operations: List[Dict[str, Any]] = [
+        {"op": "delete", "student_id": student_id}
+        for student_id in before if student_id not in after
+    ]
+    for student_id, row in after.items():
+        values = {field: _plain(field, row.get(field)) for field in FIELDS}
+        if student_id not in before:
+            operations.append({"op": "create", "student_id": student_id, "student": values})
+            continue
+        old = before[student_id]
+        changed = {
+            field: value for field, value in values.items()
+            if value is not None and value != _plain(field, old.get(field))
+        }
+        if changed:
+            operations.append({"op": "update", "student_id": student_id, "fields": changed})
+    return operations
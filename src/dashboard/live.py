@@ -0,0 +1,100 @@
+# src/dashboard/live.py
+"""
+Aviso de alterações na tabela para o dashboard.
+
+Uma thread em segundo plano assina GET /students/changes (Server-Sent
+Events) e só conta as alterações (`version`): o dashboard não guarda a
+tabela, então basta refazer a página, que busca de novo os agregados e a
+página atual com GET condicional (304 se nada mudou para aqueles filtros).
+
+Se a conexão cai, reconecta com Last-Event-ID e backoff exponencial.
+Sem o feed (API antiga ou fora do ar), `version` sobe a cada tentativa de
+reconexão: o dashboard revalida periodicamente em vez de ficar parado.
+Sem dependência do Streamlit: o app.py só lê `version`.
+"""
+import threading
+from typing import Iterable, Iterator, Optional, Tuple
+
+import requests
+import logging
+
+# Logger
+logger = logging.getLogger("dashboard")
+
+# Sem nenhum byte nesse tempo (a API manda keep-alive a cada 15s), reconecta
+SSE_READ_TIMEOUT = 60
+MAX_BACKOFF_SECONDS = 30
+
+
+def parse_sse(lines: Iterable[str]) -> Iterator[Tuple[Optional[str], str, str]]:
+    """Linhas de um stream SSE -> (id, evento, dados) por mensagem."""
+    event_id: Optional[str] = None
+    event = "message"
+    data = []
+    for line in lines:
+        if not line:
+            if data:
+                yield event_id, event, "\n".join(data)
+            event, data = "message", []
+            continue
+        if line.startswith(":"):
+            continue  # comentário (keep-alive)
+        field, _, value = line.partition(":")
+        value = value[1:] if value.startswith(" ") else value
+        if field == "id":
+            event_id = value
+        elif field == "event":
+            event = value
+        elif field == "data":
+            data.append(value)
+
+
+class ChangeWatcher:
+    """Conta as alterações publicadas em /students/changes."""
+
+    def __init__(self, client):
+        # ApiClient (client.py), com a sessão keep-alive do dashboard
+        self.client = client
+        # sobe a cada alteração: o app faz rerun quando muda
+        self.version = 0
+        self.connected = False
+        self.error: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def handle_message(self, event: str) -> None:
+        # ready só confirma a assinatura; os demais (upsert/delete/reset) mudam a tabela
+        if event != "ready":
+            self.version += 1
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="change-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        last_event_id: Optional[str] = None
+        backoff = 1
+        while not self._stop.is_set():
+            try:
+                with self.client.stream_changes(last_event_id, SSE_READ_TIMEOUT) as resp:
+                    resp.raise_for_status()
+                    self.connected, self.error, backoff = True, None, 1
+                    logger.info("[DASHBOARD] Subscribed to /students/changes")
+                    for event_id, event, _ in parse_sse(resp.iter_lines(decode_unicode=True)):
+                        if self._stop.is_set():
+                            return
+                        self.handle_message(event)
+                        if event_id is not None:
+                            last_event_id = event_id
+            except requests.exceptions.RequestException as e:
+                self.connected, self.error = False, str(e)
+                logger.warning(f"[DASHBOARD] Change feed unavailable: {e}")
+            self._stop.wait(backoff)
+            backoff = min(backoff * 2, MAX_BACKOFF_SECONDS)
+            if not self.connected:
+                # sem feed: força uma revalidação da página
+                self.version += 1
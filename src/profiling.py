@@ -0,0 +1,227 @@
+# src/profiling.py
+"""
+Profiling sob demanda (cProfile) de uma requisição da API ou de uma
+execução do resumo de analytics.
+
+Desligado por padrão. Configuração (.env):
+- PROFILE_REQUESTS: off (padrão) | header | all
+  header: só requisições com o header X-Profile (ver PROFILE_TOKEN)
+  all: todas as requisições (só para investigação local)
+- PROFILE_TOKEN: se definido, X-Profile precisa ter este valor
+- PROFILE_ANALYTICS: true perfila cada print_analytics_summary
+- PROFILE_DIR: pasta dos perfis (padrão profiles/)
+- PROFILE_MAX_FILES: perfis mantidos; os mais antigos são apagados (padrão 50)
+
+Cada perfil gera <id>.prof (pstats, abre no snakeviz/pstats) e <id>.txt
+(as funções com maior tempo acumulado). Listar/renderizar:
+`python -m src.cli.main profiles list|show <id>`.
+
+Só um perfil por vez no processo: uma requisição que chega com outra
+sendo perfilada segue sem perfil. Na API o cProfile vê a thread do event
+loop (rotas async, asyncpg), incluindo outras requisições que rodam nele
+enquanto a perfilada espera; trabalho mandado para o threadpool
+(ex.: backend SQLite) aparece só como espera. Ver src/api/profiling.py.
+"""
+import functools
+import io
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Optional
+
+import logging
+
+# Logger
+logger = logging.getLogger("profiling")
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_MODES = ("off", "header", "all")
+# Funções no resumo .txt gravado junto com o perfil
+SUMMARY_TOP = 30
+SORT_KEYS = ("cumulative", "tottime", "calls")
+
+# Um perfil por vez: o cProfile de um perfil ativo seria substituído
+_active = threading.Lock()
+
+
+def profile_dir() -> Path:
+    return Path(os.getenv("PROFILE_DIR") or "profiles")
+
+
+def request_profiling_mode() -> str:
+    mode = (os.getenv("PROFILE_REQUESTS") or "off").lower()
+    if mode not in PROFILE_MODES:
+        logger.warning(f"[PROFILE] Invalid PROFILE_REQUESTS={mode!r}, profiling disabled")
+        return "off"
+    return mode
+
+
+def analytics_profiling_enabled() -> bool:
+    return os.getenv("PROFILE_ANALYTICS", "false").lower() in ("1", "true", "yes")
+
+
+def header_allows(value: Optional[str]) -> bool:
+    """X-Profile recebido: vale se presente e, com PROFILE_TOKEN, igual a ele."""
+    if not value:
+        return False
+    token = os.getenv("PROFILE_TOKEN")
+    return not token or value == token
+
+
+@dataclass
+class ProfileInfo:
+    profile_id: str
+    created_at: datetime
+    label: str
+    seconds: Optional[float]
+    path: Path
+
+
+class ProfileRun:
+    """Um perfil em andamento; o id já existe antes de terminar (header da resposta)."""
+
+    def __init__(self, label: str):
+        self.label = label
+        now = datetime.now()
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", label).strip("_")[:60]
+        self.profile_id = f"{now:%Y%m%d-%H%M%S-%f}-{slug}" if slug else f"{now:%Y%m%d-%H%M%S-%f}"
+        self.seconds: Optional[float] = None
+        # cProfile/pstats só são importados quando um perfil é pedido
+        import cProfile
+
+        self._profile = cProfile.Profile()
+        self._start = 0.0
+
+    def start(self) -> None:
+        self._start = time.perf_counter()
+        self._profile.enable()
+
+    def stop(self) -> None:
+        self._profile.disable()
+        self.seconds = time.perf_counter() - self._start
+
+    def save(self) -> Path:
+        """Grava <id>.prof e <id>.txt em PROFILE_DIR."""
+        import pstats
+
+        directory = profile_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{self.profile_id}.prof"
+        self._profile.dump_stats(path)
+
+        stream = io.StringIO()
+        stream.write(f"# {self.label}\n# {self.seconds * 1000:.1f} ms\n")
+        pstats.Stats(self._profile, stream=stream).sort_stats("cumulative").print_stats(SUMMARY_TOP)
+        path.with_suffix(".txt").write_text(stream.getvalue(), encoding="utf-8")
+
+        _prune(directory)
+        logger.info(f"[PROFILE] Saved {path} ({self.label}, {self.seconds * 1000:.1f} ms)")
+        return path
+
+
+def start_profile(label: str) -> Optional[ProfileRun]:
+    """Começa um perfil; None se outro já está em andamento."""
+    if not _active.acquire(blocking=False):
+        logger.info(f"[PROFILE] Skipping {label}: another profile is running")
+        return None
+    run = ProfileRun(label)
+    try:
+        run.start()
+    except Exception:
+        _active.release()
+        raise
+    return run
+
+
+def finish_profile(run: ProfileRun) -> None:
+    """Para o perfil e libera o próximo (sem gravar)."""
+    try:
+        run.stop()
+    finally:
+        _active.release()
+
+
+def save_profile(run: ProfileRun) -> Optional[Path]:
+    """Grava o perfil; uma falha de disco só é registrada (não derruba a chamada)."""
+    try:
+        return run.save()
+    except OSError as e:
+        logger.warning(f"[PROFILE] Could not save profile {run.profile_id}: {e}")
+        return None
+
+
+def profiled_when(enabled: Callable[[], bool], label: Optional[str] = None):
+    """Decorator: perfila cada chamada da função enquanto `enabled()` for verdadeiro."""
+    def decorator(func):
+        name = label or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            run = start_profile(name) if enabled() else None
+            if run is None:
+                return func(*args, **kwargs)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                finish_profile(run)
+                save_profile(run)
+        return wrapper
+    return decorator
+
+
+def _prune(directory: Path) -> None:
+    keep = int(os.getenv("PROFILE_MAX_FILES", "50"))
+    stale = sorted(directory.glob("*.prof"))[:-keep] if keep > 0 else []
+    for path in stale:
+        path.unlink(missing_ok=True)
+        path.with_suffix(".txt").unlink(missing_ok=True)
+
+
+def _read_header(path: Path):
+    """(label, segundos) das duas primeiras linhas do resumo .txt."""
+    try:
+        with open(path.with_suffix(".txt"), encoding="utf-8") as f:
+            label = f.readline()[2:].strip()
+            seconds = float(f.readline()[2:].split()[0]) / 1000
+        return label, seconds
+    except (OSError, ValueError, IndexError):
+        return "", None
+
+
+def list_profiles() -> List[ProfileInfo]:
+    """Perfis gravados em PROFILE_DIR, do mais recente para o mais antigo."""
+    directory = profile_dir()
+    if not directory.is_dir():
+        return []
+    profiles = []
+    for path in sorted(directory.glob("*.prof"), reverse=True):
+        label, seconds = _read_header(path)
+        profiles.append(ProfileInfo(
+            profile_id=path.stem,
+            created_at=datetime.fromtimestamp(path.stat().st_mtime),
+            label=label,
+            seconds=seconds,
+            path=path,
+        ))
+    return profiles
+
+
+def render_profile(profile_id: str, sort: str = "cumulative", limit: int = SUMMARY_TOP) -> str:
+    """Top `limit` funções de um perfil gravado; FileNotFoundError se não existe."""
+    if sort not in SORT_KEYS:
+        raise ValueError(f"Invalid sort: {sort!r} (use one of {', '.join(SORT_KEYS)})")
+    path = profile_dir() / f"{Path(profile_id).name}.prof"
+    if not path.is_file():
+        raise FileNotFoundError(f"Profile not found: {profile_id}")
+    import pstats
+
+    stream = io.StringIO()
+    label, seconds = _read_header(path)
+    if label:
+        stream.write(f"{label} ({seconds * 1000:.1f} ms)\n" if seconds is not None else f"{label}\n")
+    pstats.Stats(str(path), stream=stream).sort_stats(sort).print_stats(limit)
+    return stream.getvalue()
@@ -0,0 +1,55 @@
+import os
+
+import pytest
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """
+    Banco PostgreSQL de testes (tabela students vazia).
+    Só roda se TEST_DB_NAME estiver definido, para nunca tocar no banco de dev.
+    """
+    test_db = os.getenv("TEST_DB_NAME")
+    if not test_db:
+        pytest.skip("TEST_DB_NAME not set")
+
+    from database import database
+    from database.cache import reset_cache
+    from database.queries import create_students_table
+    from database.repository import close_repository
+
+    monkeypatch.setenv("DB_BACKEND", "postgres")
+    monkeypatch.setenv("DB_NAME", test_db)
+    close_repository()
+    create_students_table()
+    with database.get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("TRUNCATE students;")
+    reset_cache()
+    yield
+    close_repository()
+    reset_cache()
+
+
+@pytest.fixture
+def sqlite_db(monkeypatch):
+    """Backend SQLite em memória (schema criado, tabela vazia); não precisa de serviço."""
+    from database.cache import reset_cache
+    from database.queries import create_students_table
+    from database.repository import close_repository
+
+    monkeypatch.setenv("DB_BACKEND", "sqlite")
+    monkeypatch.setenv("SQLITE_PATH", ":memory:")
+    close_repository()
+    reset_cache()
+    create_students_table()
+    yield
+    close_repository()
+    reset_cache()
+
+
+@pytest.fixture(params=["db", "sqlite_db"])
+def any_db(request):
+    """Roda o teste em cada backend (PostgreSQL é pulado sem TEST_DB_NAME)."""
+    request.getfixturevalue(request.param)
+    return request.param
@@ -0,0 +1,165 @@
+import json
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient
+
+from src.api.main import app
+
+STUDENTS = [
+    {"student_id": 1, "name": "Ana", "gender": "Female", "subject": "Math", "marks": 90},
+    {"student_id": 2, "name": "Bia", "gender": "Female", "subject": "History", "marks": 75},
+    {"student_id": 3, "name": "Caio", "gender": "Male", "subject": "Math", "marks": 60},
+]
+
+
+@pytest.fixture
+def client(any_db):
+    # a mesma suíte roda no PostgreSQL e no SQLite em memória
+    with TestClient(app) as client:
+        assert client.post("/students/bulk", json=STUDENTS).status_code == 200
+        yield client
+
+
+def test_analytics_summary_with_filter(client):
+    body = client.get("/analytics/summary", params={"gender": "Female", "top_n": 1}).json()
+    assert body["total_students"] == 2
+    assert body["overall"]["average"] == 82.5
+    assert [s["student_id"] for s in body["top_students"]] == [1]
+
+
+def test_analytics_subjects(client):
+    body = client.get("/analytics/subjects").json()
+    assert body == [
+        {"subject": "History", "count": 1, "average": 75.0, "min": 75, "max": 75},
+        {"subject": "Math", "count": 2, "average": 75.0, "min": 60, "max": 90},
+    ]
+
+
+def test_analytics_top_by_subject(client):
+    body = client.get("/analytics/top", params={"n": 5, "subject": "Math"}).json()
+    assert [s["student_id"] for s in body] == [1, 3]
+
+
+def test_list_students_keyset_pagination(client):
+    first = client.get("/students", params={"limit": 2})
+    assert [s["student_id"] for s in first.json()] == [1, 2]
+    assert first.headers["X-Next-Cursor"] == "2"
+
+    second = client.get("/students", params={"limit": 2, "after": 2})
+    assert [s["student_id"] for s in second.json()] == [3]
+    assert "X-Next-Cursor" not in second.headers
+
+
+def test_list_students_projection_and_filters(client):
+    body = client.get(
+        "/students", params={"fields": "name,marks", "gender": "Female", "min_marks": 80}
+    ).json()
+    assert body == [{"student_id": 1, "name": "Ana", "marks": 90}]
+    assert client.get("/students", params={"fields": "password"}).status_code == 400
+
+
+def test_export_ndjson(client):
+    response = client.get("/students/export")
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = response.text.splitlines()
+    assert [json.loads(line)["student_id"] for line in lines] == [1, 2, 3]
+
+
+def test_export_csv(client):
+    response = client.get("/students/export", params={"format": "csv", "subject": "Math"})
+    assert response.text.splitlines() == [
+        "student_id,name,age,gender,subject,marks",
+        "1,Ana,,Female,Math,90",
+        "3,Caio,,Male,Math,60",
+    ]
+
+
+def test_analytics_facets(client):
+    assert client.get("/analytics/facets").json() == {
+        "subjects": ["History", "Math"], "genders": ["Female", "Male"],
+    }
+
+
+@pytest.mark.parametrize("path", ["/students", "/students/1", "/analytics/summary",
+                                  "/analytics/subjects", "/analytics/top", "/analytics/facets"])
+def test_conditional_get_returns_304_until_a_write(client, path):
+    first = client.get(path)
+    etag = first.headers["ETag"]
+
+    not_modified = client.get(path, headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["ETag"] == etag
+
+    assert client.put("/students/2", json={"marks": 80}).status_code == 200
+    changed = client.get(path, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+def test_conditional_get_sees_writes_outside_the_api(client):
+    # escrita direto no repositório, como o CLI em outro processo: nem
+    # invalidate_student nem o feed do processo ficam sabendo
+    from database.repository import get_repository
+
+    first = client.get("/students/2")
+    assert client.get("/students/2", headers={"If-None-Match": first.headers["ETag"]}).status_code == 304
+
+    get_repository().update_student_fields(2, {"marks": 10})
+    changed = client.get("/students/2", headers={"If-None-Match": first.headers["ETag"]})
+    assert changed.status_code == 200
+    assert changed.json()["marks"] == 10
+
+
+@pytest.mark.parametrize("checked_at, since, expected", [
+    (1000.9, 1000, False),   # segundo da escrita ainda aberto: data ambígua
+    (1002.5, 1000, True),
+    (1000.9, 1001, True),    # data do cliente depois do segundo da escrita
+    (1002.5, 999, False),
+])
+def test_if_modified_since_only_trusts_closed_seconds(checked_at, since, expected):
+    from email.utils import formatdate
+
+    from database.table_version import TableVersion
+    from src.api.http_cache import is_not_modified, validator_headers
+
+    version = TableVersion(version=3, last_modified=1000.4, checked_at=checked_at)
+    headers = {"if-modified-since": formatdate(since, usegmt=True)}
+    assert is_not_modified(headers, version) is expected
+    assert ("Last-Modified" in validator_headers(version)) is (checked_at > 1002)
+    # If-None-Match tem precedência
+    assert not is_not_modified({"if-none-match": '"other"', **headers}, version)
+
+
+def test_batch_applies_mixed_operations_in_one_request(client):
+    response = client.post("/students/batch", json={"operations": [
+        {"op": "create", "student_id": 4, "student": {"name": "Davi", "subject": "Art", "marks": 70}},
+        {"op": "update", "student_id": 1, "fields": {"marks": 95}},
+        {"op": "delete", "student_id": 3},
+    ]})
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [(r["op"], r["student_id"]) for r in results] == [("create", 4), ("update", 1), ("delete", 3)]
+    assert results[1]["student"]["marks"] == 95
+    assert results[2]["student"] is None
+    assert [s["student_id"] for s in client.get("/students").json()] == [1, 2, 4]
+
+
+@pytest.mark.parametrize("operation, status", [
+    ({"op": "create", "student_id": 2, "student": {"name": "Dup"}}, 409),
+    ({"op": "delete", "student_id": 42}, 404),
+    ({"op": "create", "student_id": 9}, 422),
+])
+def test_batch_is_all_or_nothing(client, operation, status):
+    response = client.post("/students/batch", json={"operations": [
+        {"op": "update", "student_id": 1, "fields": {"marks": 10}},
+        operation,
+    ]})
+    assert response.status_code == status
+    if status != 422:
+        assert response.json()["detail"]["index"] == 1
+    assert client.get("/students/1").json()["marks"] == 90
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("asyncpg")
+
+from database import async_queries, queries
+from database.async_database import close_async_pool
+from database.models import Student
+
+
+def make_student(student_id=1, **overrides):
+    data = dict(name="Ana", age=20, gender="Female", subject="Math", marks=80)
+    data.update(overrides)
+    return Student(student_id=student_id, **data)
+
+
+def run(coro):
+    """Roda a corrotina em um loop novo e fecha o pool (preso àquele loop)."""
+    async def wrapper():
+        try:
+            return await coro
+        finally:
+            await close_async_pool()
+    return asyncio.run(wrapper())
+
+
+def test_async_crud_roundtrip(db):
+    async def scenario():
+        assert await async_queries.insert_student(make_student()) is True
+        assert await async_queries.insert_student(make_student()) is False
+        assert await async_queries.upsert_student(make_student(2, name="Bia")) is True
+        updated = await async_queries.update_student_fields(1, {"marks": 99})
+        deleted = await async_queries.delete_student_by_id(2)
+        missing = await async_queries.get_student_by_id(2)
+        return updated, deleted, missing
+
+    updated, deleted, missing = run(scenario())
+    assert updated == make_student(marks=99)
+    assert deleted is True
+    assert missing is None
+    # as escritas assíncronas invalidam o cache compartilhado com o lado síncrono
+    assert queries.get_student_by_id(1).marks == 99
+
+
+def test_async_reads_match_sync_layer(db):
+    queries.bulk_insert_students([
+        make_student(1, marks=90),
+        make_student(2, name="Bia", subject="History", marks=75),
+        make_student(3, name="Caio", gender="Male", marks=60),
+    ])
+
+    async def scenario():
+        page = await async_queries.get_students_page(limit=2, after=1)
+        chunks = [rows async for rows in async_queries.iter_student_rows(chunk_size=2)]
+        summary = await async_queries.get_mark_summary.uncached(top_n=2)
+        return page, chunks, summary
+
+    page, chunks, summary = run(scenario())
+    assert [row["student_id"] for row in page] == [2, 3]
+    assert [len(rows) for rows in chunks] == [2, 1]
+    assert summary == queries.get_mark_summary.uncached(top_n=2)
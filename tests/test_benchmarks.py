@@ -0,0 +1,45 @@
+from benchmarks.compare import compare
+from benchmarks.datasets import generate_students, parse_size
+from benchmarks.run import run_suite
+
+
+def test_datasets_are_reproducible():
+    assert parse_size("100k") == 100_000
+    assert parse_size("250") == 250
+    assert list(generate_students(50, seed=1)) == list(generate_students(50, seed=1))
+    assert list(generate_students(50, seed=1)) != list(generate_students(50, seed=2))
+
+
+def test_compare_flags_regressions_by_direction():
+    baseline = {"results": {"1k": {
+        "crud": {"insert": {"p50_ms": 1.0}},
+        "ingest": {"rows_per_s": 1000.0, "rows": 1000},
+    }}}
+    current = {"results": {"1k": {
+        "crud": {"insert": {"p50_ms": 1.5}},
+        "ingest": {"rows_per_s": 1100.0, "rows": 1000},
+    }}}
+    regressions = compare(current, baseline, threshold=0.2)
+    assert [r.metric for r in regressions] == ["1k.crud.insert.p50_ms"]
+    assert compare(current, baseline, threshold=0.6) == []
+
+
+def test_suite_smoke_on_sqlite(monkeypatch):
+    monkeypatch.setenv("DB_BACKEND", "sqlite")
+    monkeypatch.setenv("SQLITE_PATH", ":memory:")
+    monkeypatch.setenv("CACHE_ENABLED", "false")
+    from database.cache import reset_cache
+    from database.repository import close_repository
+
+    close_repository()
+    reset_cache()
+    report = run_suite(["300"], ops=5, repeat=1, api_requests=10, api_concurrency=2)
+    reset_cache()
+
+    section = report["results"]["300"]
+    assert report["meta"]["backend"] == "sqlite"
+    assert section["ingest"]["rows"] == 300
+    assert set(section["crud"]) == {"insert", "get_by_id", "update_fields", "upsert", "page", "delete"}
+    assert section["analytics"]["mark_summary_sql"]["best_seconds"] >= 0
+    assert section["models"]["construct_slots"]["per_row_ns"] > 0
+    assert section["api"]["GET /analytics/summary"]["requests_per_s"] > 0
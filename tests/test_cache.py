@@ -0,0 +1,57 @@
+import time
+
+from database.cache import QueryCache, cached, get_cache, invalidate_student, reset_cache
+
+
+def test_lru_eviction():
+    cache = QueryCache(max_entries=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_expiration():
+    cache = QueryCache(max_entries=10, ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a") == (False, None)
+    assert cache.stats()["expirations"] == 1
+
+
+def test_set_after_invalidation_is_dropped():
+    cache = QueryCache()
+    generation = cache.generation
+    cache.invalidate(lambda key: True)
+    cache.set("a", 1, generation=generation)
+    assert cache.get("a") == (False, None)
+
+
+def test_cached_decorator_and_precise_invalidation(monkeypatch):
+    monkeypatch.setenv("CACHE_ENABLED", "true")
+    reset_cache()
+    calls = []
+
+    @cached("student", key=lambda student_id: student_id)
+    def load_student(student_id):
+        calls.append(student_id)
+        return {"id": student_id}
+
+    @cached("table")
+    def load_all():
+        calls.append("all")
+        return []
+
+    load_student(1), load_student(1), load_student(2), load_all(), load_all()
+    assert calls == [1, 2, "all"]
+
+    invalidate_student(1)
+    load_student(1), load_student(2), load_all()
+    assert calls == [1, 2, "all", 1, "all"]
+
+    stats = get_cache().stats()
+    assert (stats["hits"], stats["misses"]) == (3, 5)
+    reset_cache()
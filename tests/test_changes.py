@@ -0,0 +1,201 @@
+import asyncio
+import json
+
+import pytest
+
+from database import changes, queries
+from database.changes import ChangeFeed
+from database.models import Student
+from src.api.main import _change_events
+from src.dashboard.live import ChangeWatcher, parse_sse
+
+
+def _student(student_id, marks=80):
+    return Student(student_id, f"S{student_id}", 20, "Female", "Math", marks)
+
+
+async def _drain(subscription, count):
+    return [await asyncio.wait_for(subscription.get(), 1) for _ in range(count)]
+
+
+def test_feed_delivers_events_in_order():
+    async def scenario():
+        feed = ChangeFeed()
+        subscription = feed.subscribe()
+        feed.publish(changes.UPSERT, 1, {"student_id": 1})
+        feed.publish(changes.DELETE, 1)
+        return await _drain(subscription, 2)
+
+    events = asyncio.run(scenario())
+    assert [(e.seq, e.op, e.student_id) for e in events] == [(1, "upsert", 1), (2, "delete", 1)]
+
+
+def test_feed_replays_backlog_after_seq():
+    async def scenario():
+        feed = ChangeFeed()
+        for student_id in (1, 2, 3):
+            feed.publish(changes.UPSERT, student_id)
+        subscription = feed.subscribe(after=1)
+        return await _drain(subscription, 2)
+
+    assert [e.student_id for e in asyncio.run(scenario())] == [2, 3]
+
+
+@pytest.mark.parametrize("after", [0, 99])
+def test_feed_sends_reset_for_unknown_position(after):
+    async def scenario():
+        # buffer de 2: o seq 1 já saiu; 99 é de outra instância
+        feed = ChangeFeed(buffer_size=2)
+        for student_id in (1, 2, 3):
+            feed.publish(changes.UPSERT, student_id)
+        subscription = feed.subscribe(after=after)
+        return await _drain(subscription, 1)
+
+    [event] = asyncio.run(scenario())
+    assert event.op == changes.RESET
+    assert event.seq == 3
+
+
+def test_slow_subscriber_gets_reset():
+    async def scenario():
+        subscription = changes.Subscription(asyncio.get_running_loop(), maxsize=2)
+        for seq in (1, 2, 3):
+            subscription.deliver(changes.ChangeEvent(seq=seq, op=changes.UPSERT))
+        return await _drain(subscription, 1)
+
+    [event] = asyncio.run(scenario())
+    assert (event.seq, event.op) == (3, changes.RESET)
+
+
+def test_queries_publish_local_changes(sqlite_db):
+    async def scenario():
+        feed = changes.get_change_feed()
+        subscription = feed.subscribe()
+        queries.insert_student(_student(1))
+        queries.update_student_fields(1, {"marks": 95})
+        queries.delete_student_by_id(1)
+        queries.bulk_insert_students([_student(2)])
+        events = await _drain(subscription, 4)
+        feed.unsubscribe(subscription)
+        return events
+
+    events = asyncio.run(scenario())
+    assert [e.op for e in events] == ["upsert", "upsert", "delete", "reset"]
+    assert events[1].row["marks"] == 95
+
+
+def test_postgres_triggers_feed_listener(db):
+    from database.postgres_changes import PostgresChangeListener
+
+    async def scenario():
+        feed = ChangeFeed()
+        listener = PostgresChangeListener(feed)
+        await listener.start()
+        subscription = feed.subscribe()
+        try:
+            await asyncio.to_thread(queries.insert_student, _student(1))
+            await asyncio.to_thread(queries.update_student_fields, 1, {"marks": 70})
+            await asyncio.to_thread(queries.delete_student_by_id, 1)
+            await asyncio.to_thread(
+                queries.bulk_insert_students, [_student(i) for i in range(10, 10 + 150)]
+            )
+            return await _drain(subscription, 4)
+        finally:
+            await listener.stop()
+
+    events = asyncio.run(scenario())
+    assert [e.op for e in events] == ["upsert", "upsert", "delete", "reset"]
+    assert events[0].row["name"] == "S1"
+    assert events[1].row["marks"] == 70
+
+
+class _FakeConnection:
+    def __init__(self):
+        self.listeners = {}
+        self.on_termination = None
+        self.closed = False
+
+    async def add_listener(self, channel, callback):
+        self.listeners[channel] = callback
+
+    async def remove_listener(self, channel, callback):
+        self.listeners.pop(channel, None)
+
+    def add_termination_listener(self, callback):
+        self.on_termination = callback
+
+    def is_closed(self):
+        return self.closed
+
+    async def close(self):
+        self.closed = True
+
+
+def test_listener_reconnects_after_termination(monkeypatch):
+    from database import postgres_changes
+
+    attempts = []
+
+    async def connect(**kwargs):
+        attempts.append(kwargs)
+        if len(attempts) == 2:
+            raise OSError("connection refused")
+        return _FakeConnection()
+
+    monkeypatch.setattr(postgres_changes.asyncpg, "connect", connect)
+    monkeypatch.setattr(postgres_changes, "connection_kwargs", lambda: {})
+
+    async def scenario():
+        feed = ChangeFeed()
+        listener = postgres_changes.PostgresChangeListener(feed, min_delay=0.01, max_delay=0.02)
+        await listener.start()
+        first = listener._conn
+        subscription = feed.subscribe()
+
+        # queda da conexão: asyncpg chama o termination listener
+        first.closed = True
+        first.on_termination(first)
+        assert not feed.native
+        # segunda tentativa falha, a terceira volta
+        [event] = await _drain(subscription, 1)
+        second = listener._conn
+        listening = feed.native and changes.CHANGES_CHANNEL in second.listeners
+        await listener.stop()
+        return event, first, second, listening
+
+    event, first, second, listening = asyncio.run(scenario())
+    assert len(attempts) == 3
+    assert event.op == changes.RESET
+    assert second is not first and listening
+    assert second.closed
+
+
+def test_change_events_stream_ready_then_changes():
+    async def scenario():
+        feed = ChangeFeed()
+        feed.publish(changes.UPSERT, 1)
+        stream = _change_events(feed, after=None)
+        messages = [await stream.__anext__(), await stream.__anext__()]
+        feed.publish(changes.DELETE, 1)
+        messages.append(await asyncio.wait_for(stream.__anext__(), 1))
+        await stream.aclose()
+        return messages, feed
+
+    messages, feed = asyncio.run(scenario())
+    parsed = list(parse_sse("".join(messages).split("\n")))
+    assert parsed[0] == ("1", "ready", json.dumps({"seq": 1}))
+    event_id, event, data = parsed[1]
+    assert (event_id, event, json.loads(data)["student_id"]) == ("2", "delete", 1)
+    assert feed.stats()["subscribers"] == 0
+
+
+def test_parse_sse_skips_comments_and_joins_data():
+    lines = ["retry: 3000", "", ": keep-alive", "", "id: 7", "event: upsert", "data: a", "data: b", ""]
+    assert list(parse_sse(lines)) == [("7", "upsert", "a\nb")]
+
+
+def test_change_watcher_counts_changes_not_ready():
+    watcher = ChangeWatcher(client=None)
+    for event in ("ready", "upsert", "delete", "reset", "ready"):
+        watcher.handle_message(event)
+    assert watcher.version == 3
@@ -0,0 +1,117 @@
+import json
+
+import pytest
+
+from database.queries import get_student_by_id
+from src.cli.main import EXIT_ERROR, EXIT_OK, EXIT_USAGE, main
+
+CSV = (
+    "student_id,name,age,gender,subject,marks\n"
+    "1,Ana,20,Female,Math,90\n"
+    "2,Bia,21,Female,History,70\n"
+    "3,Caio,22,Male,Math,60\n"
+)
+
+
+@pytest.fixture
+def loaded(sqlite_db, tmp_path, capsys):
+    path = tmp_path / "students.csv"
+    path.write_text(CSV)
+    assert main(["import", str(path)]) == EXIT_OK
+    assert capsys.readouterr().out == "inserted=3 updated=0 rejected=0\n"
+    return tmp_path
+
+
+def test_import_reports_rejected_with_exit_code(sqlite_db, tmp_path, capsys):
+    path = tmp_path / "students.data"
+    path.write_text(CSV + "4,Davi,20,Male,Math,x\n")
+    assert main(["import", str(path)]) == EXIT_USAGE
+    assert main(["import", str(path), "--format", "csv", "--mode", "insert"]) == EXIT_ERROR
+    captured = capsys.readouterr()
+    assert "inserted=3 updated=0 rejected=1" in captured.out
+    assert "record 4" in captured.err
+
+
+@pytest.mark.parametrize("fmt", ["json", "csv"])
+def test_list_formats(loaded, capsys, fmt):
+    assert main(["list", "--format", fmt, "--subject", "Math"]) == EXIT_OK
+    out = capsys.readouterr().out
+    if fmt == "json":
+        assert [s["student_id"] for s in json.loads(out)] == [1, 3]
+    else:
+        assert out.splitlines() == [
+            "student_id,name,age,gender,subject,marks",
+            "1,Ana,20,Female,Math,90",
+            "3,Caio,22,Male,Math,60",
+        ]
+
+
+def test_list_empty_json_and_limit(loaded, capsys):
+    assert main(["list", "--format", "json", "--limit", "2"]) == EXIT_OK
+    assert len(json.loads(capsys.readouterr().out)) == 2
+    assert main(["list", "--format", "json", "--gender", "Other"]) == EXIT_OK
+    assert json.loads(capsys.readouterr().out) == []
+
+
+def test_export_to_file(loaded, capsys):
+    output = loaded / "out.ndjson"
+    assert main(["export", "-o", str(output)]) == EXIT_OK
+    lines = output.read_text().splitlines()
+    assert [json.loads(line)["name"] for line in lines] == ["Ana", "Bia", "Caio"]
+
+
+def test_analytics_json(loaded, capsys):
+    assert main(["analytics", "--top", "1", "--format", "json"]) == EXIT_OK
+    body = json.loads(capsys.readouterr().out)
+    assert body["total_students"] == 3
+    assert [s["student_id"] for s in body["top_students"]] == [1]
+
+
+def test_delete_ids_from_file(loaded, capsys):
+    ids = loaded / "ids.txt"
+    ids.write_text("1\n# comentário\n\n3\n99\n")
+    assert main(["delete", "--ids-from", str(ids)]) == EXIT_ERROR
+    captured = capsys.readouterr()
+    assert captured.out == "deleted=2\n"
+    assert "1 ID(s)" in captured.err
+    assert get_student_by_id(1) is None and get_student_by_id(2) is not None
+
+    assert main(["delete", "2"]) == EXIT_OK
+
+
+def test_delete_rejects_invalid_id_file(loaded, capsys):
+    ids = loaded / "ids.txt"
+    ids.write_text("2\nabc\n")
+    assert main(["delete", "--ids-from", str(ids)]) == EXIT_ERROR
+    assert "line 2" in capsys.readouterr().err
+    # a transação foi desfeita: nada deletado
+    assert get_student_by_id(2) is not None
+
+
+def test_usage_errors_exit_2(sqlite_db):
+    with pytest.raises(SystemExit) as exc:
+        main(["delete"])
+    assert exc.value.code == EXIT_USAGE
+
+
+@pytest.mark.parametrize("field, answers", [
+    ("age", ["x", "", "", ""]),
+    ("marks", ["", "", "", "x"]),
+])
+def test_update_student_keeps_null_field_on_invalid_input(sqlite_db, monkeypatch, capsys, field, answers):
+    from database.models import Student
+    from database.queries import insert_student
+    from src.cli.main import handle_update_student
+
+    values = dict(student_id=5, name="Eva", age=20, gender="Female", subject="Math", marks=80)
+    values[field] = None
+    assert insert_student(Student(**values))
+
+    inputs = iter(["5", "Eva Maria", *answers])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(inputs))
+    handle_update_student()
+
+    assert "inválida" in capsys.readouterr().out
+    student = get_student_by_id(5)
+    assert student.name == "Eva Maria"
+    assert getattr(student, field) is None
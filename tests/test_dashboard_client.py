@@ -0,0 +1,79 @@
+import json
+
+import pandas as pd
+import requests
+
+from src.dashboard.client import RETRIES, ApiClient, diff_operations
+
+COLUMNS = ["student_id", "name", "age", "gender", "subject", "marks"]
+
+
+def _frame(rows):
+    return pd.DataFrame(rows, columns=COLUMNS)
+
+
+def test_client_mounts_pooled_adapter_with_retries():
+    client = ApiClient("http://api/", pool_size=4)
+    adapter = client.session.get_adapter("http://api/students")
+    assert client.base_url == "http://api"
+    assert adapter._pool_maxsize == 4
+    assert adapter.max_retries.total == RETRIES
+    assert 503 in adapter.max_retries.status_forcelist
+    # POST não é repetido depois de chegar à API (só falhas de conexão)
+    assert "POST" not in adapter.max_retries.allowed_methods
+
+
+def _response(status, body=None, headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response._content = json.dumps(body).encode() if body is not None else b""
+    response.headers.update(headers or {})
+    return response
+
+
+def test_students_page_revalidates_with_etag(monkeypatch):
+    client = ApiClient("http://api", cache_size=1)
+    calls = []
+    replies = iter([
+        _response(200, [{"student_id": 1}], {"ETag": 'W/"v1"', "X-Next-Cursor": "1"}),
+        _response(304),
+        _response(200, [{"student_id": 9}], {"ETag": 'W/"v1"'}),
+        _response(200, [{"student_id": 1}], {"ETag": 'W/"v2"'}),
+    ])
+
+    def fake_request(method, path, **kwargs):
+        calls.append((kwargs["params"], kwargs["headers"]))
+        return next(replies)
+
+    monkeypatch.setattr(client, "request", fake_request)
+
+    assert client.students_page(1, subject="Math") == ([{"student_id": 1}], 1)
+    # 304: mesmo corpo e mesmo cursor, sem baixar a página
+    assert client.students_page(1, subject="Math") == ([{"student_id": 1}], 1)
+    assert calls[1] == ({"limit": 1, "subject": "Math"}, {"If-None-Match": 'W/"v1"'})
+    # cache_size=1: outra URL tira a primeira do cache
+    client.students_page(1, after=1, subject="Math")
+    client.students_page(1, subject="Math")
+    assert calls[3][1] == {}
+
+
+def test_diff_operations_builds_one_batch():
+    original = _frame([
+        (1, "Ana", 20, "Female", "Math", 90),
+        (2, "Bia", 21, "Female", "History", 75),
+        (3, "Caio", None, "Male", "Math", 60),
+    ])
+    edited = _frame([
+        (1, "Ana", 20, "Female", "Math", 95),
+        (3, "Caio", None, "Male", "Math", 60),
+        (4, "Davi", 22, "Male", "Art", 70),
+    ])
+    assert diff_operations(original, edited) == [
+        {"op": "delete", "student_id": 2},
+        {"op": "update", "student_id": 1, "fields": {"marks": 95}},
+        {"op": "create", "student_id": 4, "student": {
+            "name": "Davi", "age": 22, "gender": "Male", "subject": "Art", "marks": 70}},
+    ]
+    # age vira float no DataFrame (Caio não tem idade); o JSON leva inteiros
+    assert json.dumps(diff_operations(original, edited)[-1]["student"]["age"]) == "22"
+    assert diff_operations(original, original.copy()) == []
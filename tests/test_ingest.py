@@ -0,0 +1,55 @@
+import io
+
+import pytest
+
+from database.ingest import (
+    IteratorFile,
+    detect_format,
+    iter_records,
+    student_from_record,
+)
+from database.models import Student
+
+
+def test_student_from_record_coerces_csv_strings():
+    record = {"student_id": "7", "name": " Bia ", "age": "", "gender": "F",
+              "subject": "Math", "marks": "88"}
+    assert student_from_record(record) == Student(7, "Bia", None, "F", "Math", 88)
+
+
+@pytest.mark.parametrize("record", [
+    {"name": "No id"},
+    {"student_id": 1},
+    {"student_id": "x", "name": "Bad id"},
+    {"student_id": 1, "name": "Bad marks", "marks": "ten"},
+    {"student_id": 1, "name": "Out of range", "marks": 101},
+    {"student_id": 1, "name": "Negative age", "age": -1},
+    "not an object",
+])
+def test_student_from_record_rejects_invalid(record):
+    with pytest.raises(ValueError):
+        student_from_record(record)
+
+
+def test_detect_format():
+    assert detect_format(content_type="text/csv; charset=utf-8") == "csv"
+    assert detect_format(content_type="application/x-ndjson") == "ndjson"
+    assert detect_format(filename="term.JSONL") == "ndjson"
+    assert detect_format(filename="term.json") == "json"
+    with pytest.raises(ValueError):
+        detect_format(filename="term.xlsx")
+
+
+def test_iter_records_ndjson_keeps_bad_lines_for_rejection():
+    stream = io.StringIO('{"student_id": 1, "name": "A"}\n\nnot json\n')
+    assert list(iter_records(stream, "ndjson")) == [
+        {"student_id": 1, "name": "A"},
+        "not json",
+    ]
+
+
+def test_iterator_file_reads_across_chunks():
+    source = IteratorFile(["abc", "de", "f"])
+    assert source.read(4) == "abcd"
+    assert source.read() == "ef"
+    assert source.read(1) == ""
@@ -0,0 +1,49 @@
+from database.models import Student
+from src.analytics.marks_analysis import (
+    calculate_average_marks_by_subject,
+    calculate_subject_mark_stats,
+    get_overall_mark_stats,
+    get_top_students,
+)
+
+STUDENTS = [
+    Student(1, "Ana", 20, "Female", "Math", 90),
+    Student(2, "Bia", 21, "Female", "Math", 70),
+    Student(3, "Caio", 22, "Male", "History", 90),
+    Student(4, "Duda", 20, "Female", "History", None),
+]
+
+
+def test_in_memory_average_by_subject():
+    assert calculate_average_marks_by_subject(STUDENTS) == {"Math": 80.0, "History": 90.0}
+
+
+def test_in_memory_subject_stats():
+    assert calculate_subject_mark_stats(STUDENTS)["Math"] == {
+        "count": 2, "average": 80.0, "min": 70, "max": 90,
+    }
+
+
+def test_in_memory_top_students_breaks_ties_by_id():
+    top = get_top_students(limit=2, students=list(reversed(STUDENTS)))
+    assert [s.student_id for s in top] == [1, 3]
+
+
+def test_in_memory_overall_stats():
+    assert get_overall_mark_stats(STUDENTS) == {"count": 4, "average": 83.33, "min": 70, "max": 90}
+    assert get_overall_mark_stats([]) == {}
+
+
+def test_sql_and_in_memory_results_match(db):
+    from database.queries import bulk_insert_students, get_all_students
+
+    bulk_insert_students(STUDENTS)
+    students = get_all_students()
+    assert calculate_subject_mark_stats() == calculate_subject_mark_stats(students)
+    assert get_overall_mark_stats() == get_overall_mark_stats(students)
+    assert get_top_students(limit=3) == get_top_students(limit=3, students=students)
+
+
+def test_in_memory_filters():
+    assert get_overall_mark_stats(STUDENTS, gender="Male")["average"] == 90.0
+    assert [s.student_id for s in get_top_students(5, STUDENTS, subject="Math")] == [1, 2]
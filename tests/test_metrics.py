@@ -0,0 +1,87 @@
+import logging
+
+import pytest
+
+from database import queries
+from database.metrics import QUERY_DURATION, QUERY_ROWS, SLOW_QUERIES, Histogram, Registry, reset_metrics, timed_query
+from database.models import Student
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics():
+    reset_metrics()
+    yield
+    reset_metrics()
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    histogram = registry.register(Histogram("t_seconds", "Test.", ["op"], buckets=(0.1, 1)))
+    for value in (0.05, 0.5, 3):
+        histogram.observe(value, op="read")
+    registry.add_collector(lambda: [("t_pool", "gauge", "Pool.", [({"state": "idle"}, 2)])])
+    registry.add_collector(lambda: [("t_pool", "gauge", "Pool.", [({"state": "used"}, 1)])])
+
+    lines = registry.render().splitlines()
+    assert 't_seconds_bucket{op="read",le="0.1"} 1' in lines
+    assert 't_seconds_bucket{op="read",le="1"} 2' in lines
+    assert 't_seconds_bucket{op="read",le="+Inf"} 3' in lines
+    assert 't_seconds_count{op="read"} 3' in lines
+    # famílias iguais de collectors diferentes saem com um só cabeçalho
+    assert lines.count("# TYPE t_pool gauge") == 1
+    assert 't_pool{state="used"} 1' in lines
+
+
+def test_slow_query_log(monkeypatch, caplog):
+    monkeypatch.setenv("SLOW_QUERY_MS", "0.001")
+    reset_metrics()
+
+    @timed_query
+    def slow_read(limit, name=None):
+        return [1] * limit
+
+    with caplog.at_level(logging.WARNING, logger="metrics"):
+        assert slow_read(3, "Maria Silva") == [1, 1, 1]
+    assert QUERY_ROWS.value(query="slow_read") == 3
+    assert SLOW_QUERIES.value(query="slow_read") == 1
+    assert "[DB] Slow query slow_read" in caplog.text
+    # só tipos e tamanhos dos argumentos, nunca os valores
+    assert "args=(int, str[11])" in caplog.text
+    assert "Maria Silva" not in caplog.text
+
+
+def test_queries_layer_is_timed_once_per_database_call(sqlite_db):
+    queries.bulk_insert_students([Student(i, f"S{i}", 20, "Female", "Math", 80) for i in (1, 2)])
+    assert len(queries.get_all_students()) == 2
+    queries.get_all_students()  # acerto de cache: não vai ao banco
+    assert QUERY_DURATION.count(query="get_all_students") == 1
+    assert QUERY_ROWS.value(query="get_all_students") == 2
+    assert QUERY_ROWS.value(query="bulk_insert_students") == 2
+
+    chunks = list(queries.iter_student_rows(chunk_size=1))
+    assert len(chunks) == 2
+    assert QUERY_ROWS.value(query="iter_student_rows") == 2
+
+
+def test_metrics_endpoint(sqlite_db):
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+
+    from src.api.main import app
+
+    with TestClient(app) as client:
+        assert client.get("/students/1").status_code == 404
+        assert client.get("/students/1").status_code == 404
+        resp = client.get("/metrics")
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = resp.text
+    assert (
+        'api_request_duration_seconds_count{method="GET",route="/students/{student_id}",status="404"} 2'
+        in text
+    )
+    assert 'db_query_duration_seconds_count{query="get_student_by_id"}' in text
+    assert 'db_connection_acquire_seconds_count{pool="sqlite"}' in text
+    assert 'query_cache_requests_total{result="miss"}' in text
+    assert "# TYPE api_requests_in_flight gauge" in text
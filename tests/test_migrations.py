@@ -0,0 +1,68 @@
+import psycopg2
+import pytest
+
+from database.database import get_connection
+from database.migrations import MIGRATIONS, apply_migrations, get_applied_versions
+from database.queries import bulk_insert_students, insert_student
+from database.models import Student
+from database import sql
+
+
+def explain(query, params=()):
+    """Plano da query com seq scan desabilitado (a tabela de teste é pequena)."""
+    with get_connection() as conn:
+        conn.autocommit = False
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SET LOCAL enable_seqscan = off;")
+                cur.execute("EXPLAIN " + query, params)
+                return "\n".join(row[0] for row in cur.fetchall())
+        finally:
+            conn.rollback()
+            conn.autocommit = True
+
+
+def test_migrations_are_idempotent(db):
+    assert get_applied_versions() == {m.version for m in MIGRATIONS}
+    assert apply_migrations() == []
+
+
+def test_marks_check_constraint(db):
+    with pytest.raises(psycopg2.errors.CheckViolation):
+        insert_student(Student(1, "Ana", 20, "Female", "Math", 150))
+
+
+def test_check_constraints_migrate_table_with_out_of_range_rows(db):
+    # tabela da versão inicial: sem as constraints e com dados fora da faixa
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("ALTER TABLE students DROP CONSTRAINT students_marks_range;")
+            cur.execute("ALTER TABLE students DROP CONSTRAINT students_age_non_negative;")
+            cur.execute("DELETE FROM schema_migrations WHERE version = 3;")
+            cur.execute(
+                "INSERT INTO students (student_id, name, age, marks) VALUES (1, 'Old', -1, 120);"
+            )
+
+    assert apply_migrations() == [3]
+    # linhas antigas ficam; escritas novas já são validadas
+    with pytest.raises(psycopg2.errors.CheckViolation):
+        insert_student(Student(2, "Bia", 20, "Female", "Math", 150))
+    with pytest.raises(psycopg2.errors.CheckViolation):
+        insert_student(Student(3, "Caio", -5, "Male", "Math", 50))
+
+
+@pytest.mark.parametrize("built, index", [
+    (sql.build_top_students_query(5, subject="Math"), "idx_students_subject_marks"),
+    (sql.build_top_students_query(5), "idx_students_marks"),
+    (sql.build_stream_query(gender="Male"), "idx_students_gender"),
+])
+def test_key_queries_use_indexes(db, built, index):
+    query, params = built
+    bulk_insert_students(
+        Student(i, f"S{i}", 20, ("Male", "Female")[i % 2], ("Math", "History")[i % 2], i % 101)
+        for i in range(1, 500)
+    )
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("ANALYZE students;")
+    assert index in explain(query, params)
@@ -0,0 +1,84 @@
+import threading
+
+import pytest
+
+from database.pool import ConnectionPool, PoolClosed, PoolTimeout
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+
+    def close(self):
+        self.closed = 1
+
+
+def make_pool(**kwargs):
+    opened = []
+
+    def connect():
+        conn = FakeConnection()
+        opened.append(conn)
+        return conn
+
+    kwargs.setdefault("check", lambda conn: True)
+    return ConnectionPool(connect=connect, **kwargs), opened
+
+
+def test_reuses_returned_connection():
+    pool, opened = make_pool(min_size=0, max_size=2)
+    conn = pool.getconn()
+    pool.putconn(conn)
+    assert pool.getconn() is conn
+    assert len(opened) == 1
+
+
+def test_prefills_min_size():
+    pool, opened = make_pool(min_size=3, max_size=5)
+    assert len(opened) == 3
+    assert pool.stats()["idle"] == 3
+
+
+def test_timeout_when_exhausted():
+    pool, _ = make_pool(min_size=0, max_size=1)
+    pool.getconn()
+    with pytest.raises(PoolTimeout):
+        pool.getconn(timeout=0.05)
+    assert pool.stats()["timeouts"] == 1
+
+
+def test_waiter_gets_released_connection():
+    pool, _ = make_pool(min_size=0, max_size=1)
+    conn = pool.getconn()
+    result = []
+    waiter = threading.Thread(target=lambda: result.append(pool.getconn(timeout=2)))
+    waiter.start()
+    pool.putconn(conn)
+    waiter.join()
+    assert result == [conn]
+
+
+def test_failed_health_check_is_discarded():
+    pool, opened = make_pool(min_size=1, max_size=1, check_after=0)
+    pool._check = lambda conn: conn is not opened[0]
+    conn = pool.getconn()
+    assert conn is opened[1]
+    assert opened[0].closed
+    assert pool.stats()["health_check_failures"] == 1
+
+
+def test_expired_connections_are_evicted():
+    pool, opened = make_pool(min_size=0, max_size=1, max_lifetime=0.01)
+    conn = pool.getconn()
+    threading.Event().wait(0.02)
+    pool.putconn(conn)
+    assert conn.closed
+    assert pool.stats()["size"] == 0
+
+
+def test_close_rejects_new_checkouts():
+    pool, opened = make_pool(min_size=2, max_size=2)
+    pool.close()
+    assert all(conn.closed for conn in opened)
+    with pytest.raises(PoolClosed):
+        pool.getconn()
@@ -0,0 +1,87 @@
+import pytest
+
+from src import profiling
+from src.cli.main import main as cli_main
+
+
+@pytest.fixture
+def profiles(tmp_path, monkeypatch):
+    monkeypatch.setenv("PROFILE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _work(n):
+    return sum(i * i for i in range(n))
+
+
+def test_profiled_when_saves_profile_and_summary(profiles, monkeypatch):
+    enabled = {"on": False}
+    work = profiling.profiled_when(lambda: enabled["on"], "work")(_work)
+
+    assert work(10) == 285
+    assert list(profiles.iterdir()) == []
+
+    enabled["on"] = True
+    assert work(1000) == 332833500
+    [info] = profiling.list_profiles()
+    assert info.label == "work"
+    assert info.path.with_suffix(".txt").read_text().startswith("# work\n")
+    assert "_work" in profiling.render_profile(info.profile_id, sort="tottime", limit=5)
+
+
+def test_one_profile_at_a_time(profiles):
+    run = profiling.start_profile("first")
+    try:
+        assert profiling.start_profile("second") is None
+    finally:
+        profiling.finish_profile(run)
+    profiling.finish_profile(profiling.start_profile("third"))
+
+
+def test_old_profiles_are_pruned(profiles, monkeypatch):
+    monkeypatch.setenv("PROFILE_MAX_FILES", "2")
+    work = profiling.profiled_when(lambda: True)(_work)
+    for _ in range(3):
+        work(10)
+    assert len(profiling.list_profiles()) == 2
+    assert len(list(profiles.glob("*.txt"))) == 2
+
+
+def test_cli_lists_and_shows_profiles(profiles, capsys):
+    assert cli_main(["profiles", "list"]) == 0
+    assert "Nenhum perfil" in capsys.readouterr().err
+
+    profiling.profiled_when(lambda: True, "cli work")(_work)(100)
+    assert cli_main(["profiles", "list"]) == 0
+    assert "cli work" in capsys.readouterr().out
+    assert cli_main(["profiles", "show", "latest", "--limit", "3"]) == 0
+    assert "function calls" in capsys.readouterr().out
+    assert cli_main(["profiles", "show", "missing"]) == 1
+
+
+def test_api_profiles_request_with_header(profiles, monkeypatch, sqlite_db):
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+
+    from src.api.main import app
+
+    monkeypatch.setenv("PROFILE_REQUESTS", "header")
+    monkeypatch.setenv("PROFILE_TOKEN", "secret")
+    with TestClient(app) as client:
+        assert "X-Profile-Id" not in client.get("/students").headers
+        assert "X-Profile-Id" not in client.get("/students", headers={"X-Profile": "1"}).headers
+        resp = client.get("/students/7", headers={"X-Profile": "secret"})
+
+    assert resp.status_code == 404
+    [info] = profiling.list_profiles()
+    assert info.profile_id == resp.headers["X-Profile-Id"]
+    assert info.label == "GET /students/{student_id} (/students/7)"
+
+
+def test_change_stream_is_never_profiled(monkeypatch):
+    from src.api.profiling import _wants_profile
+
+    monkeypatch.setenv("PROFILE_REQUESTS", "all")
+    scope = {"type": "http", "method": "GET", "headers": [(b"x-profile", b"1")]}
+    assert _wants_profile({**scope, "path": "/students"})
+    assert not _wants_profile({**scope, "path": "/students/changes"})
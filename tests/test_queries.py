@@ -0,0 +1,139 @@
+import pytest
+
+from database.models import BatchOperation, Student
+from database.queries import (
+    apply_batch,
+    bulk_insert_students,
+    delete_student_by_id,
+    delete_students,
+    get_all_students,
+    get_facets,
+    get_mark_stats,
+    iter_student_rows,
+    iter_students,
+    get_student_by_id,
+    insert_student,
+    update_student_fields,
+    upsert_student,
+)
+from database.repository import BatchError
+
+
+def make_student(student_id=1, **overrides):
+    data = dict(name="Ana", age=20, gender="Female", subject="Math", marks=80)
+    data.update(overrides)
+    return Student(student_id=student_id, **data)
+
+
+def test_insert_student_rejects_duplicate_id(any_db):
+    assert insert_student(make_student()) is True
+    assert insert_student(make_student(name="Other")) is False
+    assert get_student_by_id(1).name == "Ana"
+
+
+def test_upsert_student_creates_then_replaces(any_db):
+    assert upsert_student(make_student()) is True
+    assert upsert_student(make_student(marks=95, subject="Physics")) is False
+    stored = get_student_by_id(1)
+    assert (stored.subject, stored.marks) == ("Physics", 95)
+
+
+def test_update_student_fields_is_partial(any_db):
+    insert_student(make_student())
+    updated = update_student_fields(1, {"marks": 99})
+    assert updated == make_student(marks=99)
+    assert update_student_fields(42, {"marks": 1}) is None
+
+
+def test_bulk_insert_students_reports_counts(any_db):
+    insert_student(make_student(1))
+    records = [
+        {"student_id": 1, "name": "Ana", "marks": 90},
+        {"student_id": 2, "name": "Bia"},
+        {"student_id": 2, "name": "Bia 2"},
+        {"student_id": "x", "name": "Bad"},
+    ]
+    result = bulk_insert_students(iter(records))
+    assert (result.inserted, result.updated, result.rejected) == (1, 1, 2)
+    assert get_student_by_id(1).marks == 90
+    assert get_student_by_id(2).name == "Bia 2"
+
+    result = bulk_insert_students([{"student_id": 1, "name": "Keep"}], mode="insert")
+    assert (result.inserted, result.updated, result.rejected) == (0, 0, 1)
+    assert get_student_by_id(1).name == "Ana"
+
+
+def test_iter_students_streams_in_chunks(any_db):
+    bulk_insert_students(make_student(i) for i in range(1, 8))
+    chunks = list(iter_student_rows(chunk_size=3))
+    assert [len(chunk) for chunk in chunks] == [3, 3, 1]
+    assert [s.student_id for s in iter_students(chunk_size=3)] == list(range(1, 8))
+
+
+def test_writes_invalidate_cached_reads(any_db):
+    insert_student(make_student())
+    assert get_student_by_id(1).marks == 80
+    assert get_mark_stats()["max"] == 80
+
+    update_student_fields(1, {"marks": 95})
+    assert get_student_by_id(1).marks == 95
+    assert get_mark_stats()["max"] == 95
+
+    delete_student_by_id(1)
+    assert get_student_by_id(1) is None
+    assert get_mark_stats() == {}
+
+
+def test_apply_batch_runs_mixed_operations(any_db):
+    insert_student(make_student(1))
+    insert_student(make_student(2))
+    results = apply_batch([
+        BatchOperation("create", 3, student=make_student(3)),
+        BatchOperation("update", 1, fields={"marks": 50}),
+        BatchOperation("delete", 2),
+    ])
+    assert results == [make_student(3), make_student(1, marks=50), None]
+    assert get_student_by_id(1).marks == 50
+    assert get_student_by_id(2) is None
+
+
+@pytest.mark.parametrize("operation, reason", [
+    (BatchOperation("create", 1, student=make_student(1)), "exists"),
+    (BatchOperation("update", 42, fields={"marks": 1}), "not_found"),
+    (BatchOperation("delete", 42), "not_found"),
+])
+def test_apply_batch_rolls_back_on_failure(any_db, operation, reason):
+    insert_student(make_student(1))
+    with pytest.raises(BatchError) as error:
+        apply_batch([
+            BatchOperation("update", 1, fields={"marks": 10}),
+            BatchOperation("create", 5, student=make_student(5)),
+            operation,
+        ])
+    assert (error.value.index, error.value.reason) == (2, reason)
+    assert get_student_by_id(1).marks == 80
+    assert get_student_by_id(5) is None
+
+
+def test_apply_batch_validates_before_writing(any_db):
+    with pytest.raises(ValueError):
+        apply_batch([BatchOperation("update", 1, fields={"grade": 1})])
+    with pytest.raises(ValueError):
+        apply_batch([BatchOperation("create", 1, student=make_student(2))])
+
+
+def test_get_facets_lists_distinct_values(any_db):
+    insert_student(make_student(1))
+    insert_student(make_student(2, subject="History", gender="Male"))
+    insert_student(make_student(3, subject=None))
+    assert get_facets() == {"subjects": ["History", "Math"], "genders": ["Female", "Male"]}
+
+
+def test_delete_students_in_one_transaction(any_db):
+    bulk_insert_students([make_student(i) for i in range(1, 1201)])
+    # gerador maior que um bloco de DELETE, com IDs inexistentes no meio
+    ids = (i for i in range(0, 1300, 2))
+    assert delete_students(ids) == 600
+    assert get_student_by_id(2) is None
+    assert len(get_all_students()) == 600
+    assert delete_students([]) == 0
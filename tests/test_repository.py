@@ -0,0 +1,82 @@
+import random
+
+import pytest
+
+from database.models import Student
+from database.queries import (
+    bulk_insert_students,
+    create_students_table,
+    delete_student_by_id,
+    get_table_version,
+    update_student_fields,
+)
+from database.repository import create_repository
+from database.sqlite_repository import SQLiteRepository
+
+
+def make_dataset(size=300, seed=7):
+    rng = random.Random(seed)
+    return [
+        Student(
+            student_id=i,
+            name=f"S{i}",
+            age=rng.randint(15, 25),
+            gender=rng.choice(["Male", "Female"]),
+            subject=rng.choice(["Math", "History", "Physics", None]),
+            marks=rng.choice([None] + list(range(0, 101))),
+        )
+        for i in range(1, size + 1)
+    ]
+
+
+def test_create_repository_by_backend_name(monkeypatch):
+    monkeypatch.setenv("SQLITE_PATH", ":memory:")
+    assert create_repository("sqlite").name == "sqlite"
+    with pytest.raises(ValueError):
+        create_repository("oracle")
+
+
+def test_sqlite_schema_is_idempotent(tmp_path):
+    repository = SQLiteRepository(str(tmp_path / "students.db"))
+    assert repository.create_schema() == [1, 2, 3]
+    assert repository.create_schema() == []
+    repository.close()
+
+
+def test_every_write_advances_the_table_version(any_db):
+    before = get_table_version()
+    bulk_insert_students(make_dataset(size=3))
+    after_bulk = get_table_version()
+    assert after_bulk.version > before.version
+    assert after_bulk.last_modified >= before.last_modified
+
+    update_student_fields(1, {"marks": 50})
+    delete_student_by_id(2)
+    last = get_table_version()
+    assert last.version >= after_bulk.version + 2
+    assert last.etag != after_bulk.etag
+    # leituras não mudam a versão
+    assert get_table_version().version == last.version
+
+
+def test_sqlite_results_match_postgres(db):
+    dataset = make_dataset()
+    bulk_insert_students(dataset)
+    postgres = create_repository("postgres")
+    sqlite = SQLiteRepository(":memory:")
+    sqlite.create_schema()
+    sqlite.bulk_insert_students(dataset)
+
+    for filters in ({}, {"subject": "Math"}, {"gender": "Female"}):
+        assert sqlite.get_mark_stats(**filters) == postgres.get_mark_stats(**filters)
+        assert sqlite.get_subject_mark_stats(**filters) == postgres.get_subject_mark_stats(**filters)
+        assert sqlite.get_top_students_by_marks(7, **filters) == postgres.get_top_students_by_marks(7, **filters)
+        assert sqlite.get_mark_summary(top_n=5, **filters) == postgres.get_mark_summary(top_n=5, **filters)
+    assert sqlite.get_students_page(limit=10, after=50, min_marks=40) == postgres.get_students_page(
+        limit=10, after=50, min_marks=40
+    )
+    sqlite.close()
+
+
+def test_create_students_table_uses_selected_backend(sqlite_db):
+    assert create_students_table() == []
@@ -0,0 +1,109 @@
+import gzip
+import json
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from src.api import compression, responses
+from src.api.compression import CompressionMiddleware, choose_encoding
+from src.api.responses import RowEncoder
+
+COLUMNS = ("student_id", "name", "age", "gender", "subject", "marks")
+ROWS = [
+    (1, 'Ana "Aninha" São\\Paulo', 20, "Female", "Math", 90),
+    (2, "Bia\n\t", None, None, None, None),
+]
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_encode_rows_matches_json_dumps(monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(responses, "orjson", None)
+    elif responses.orjson is None:
+        pytest.skip("orjson not installed")
+
+    expected = [dict(zip(COLUMNS, row)) for row in ROWS]
+    assert json.loads(RowEncoder(COLUMNS).encode_rows(ROWS)) == expected
+    assert json.loads(RowEncoder(COLUMNS).encode_rows([])) == []
+
+
+def test_encode_lines_with_projection():
+    lines = RowEncoder(("student_id", "marks")).encode_lines([(1, 90), (2, None)])
+    assert [json.loads(line) for line in lines.splitlines()] == [
+        {"student_id": 1, "marks": 90},
+        {"student_id": 2, "marks": None},
+    ]
+
+
+@pytest.mark.parametrize("header,expected", [
+    ("", None),
+    ("gzip", "gzip"),
+    ("deflate, gzip;q=0.5", "gzip"),
+    ("gzip;q=0", None),
+    ("*", "gzip"),
+    ("identity", None),
+])
+def test_choose_encoding_without_brotli(monkeypatch, header, expected):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert choose_encoding(header) == expected
+
+
+def test_choose_encoding_prefers_brotli_when_available(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", object())
+    assert choose_encoding("gzip, br") == "br"
+    assert choose_encoding("gzip, br;q=0.5") == "gzip"
+
+
+@pytest.fixture
+def compressed_client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+    @app.get("/small")
+    def small():
+        return PlainTextResponse("x" * 10)
+
+    @app.get("/large")
+    def large():
+        return PlainTextResponse("x" * 1000)
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter([b"a" * 10, b"b" * 10]), media_type="text/plain")
+
+    return TestClient(app)
+
+
+def _raw(client, path, accept_encoding):
+    # httpx descomprime sozinho: lê o corpo cru para conferir o gzip
+    with client.stream("GET", path, headers={"Accept-Encoding": accept_encoding}) as response:
+        return response, b"".join(response.iter_raw())
+
+
+def test_large_response_is_gzipped(compressed_client):
+    response, raw = _raw(compressed_client, "/large", "gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert int(response.headers["content-length"]) == len(raw)
+    assert gzip.decompress(raw) == b"x" * 1000
+
+
+def test_small_or_unaccepted_responses_are_not_compressed(compressed_client):
+    response, raw = _raw(compressed_client, "/small", "gzip")
+    assert "content-encoding" not in response.headers
+    assert raw == b"x" * 10
+
+    response, raw = _raw(compressed_client, "/large", "identity")
+    assert "content-encoding" not in response.headers
+
+
+def test_streaming_response_is_compressed_by_chunk(compressed_client):
+    response, raw = _raw(compressed_client, "/stream", "gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(raw) == b"a" * 10 + b"b" * 10
@@ -0,0 +1,43 @@
+from statistics import pstdev
+
+from database.models import Student
+from src.analytics.snapshot import MarkAccumulator, build_snapshot, compute_analytics_snapshot
+
+STUDENTS = [
+    Student(1, "Ana", 20, "Female", "Math", 90),
+    Student(2, "Bia", 21, "Female", "Math", 70),
+    Student(3, "Caio", 22, "Male", "History", 90),
+    Student(4, "Duda", 20, "Female", "History", None),
+    Student(5, "Edu", 23, "Male", "History", 40),
+]
+
+
+def test_accumulator_matches_statistics_module():
+    acc = MarkAccumulator()
+    for mark in (10, 20, 20, 35, 90):
+        acc.add(mark)
+    stats = acc.to_stats()
+    assert stats.average == 35.0
+    assert stats.stddev == round(pstdev([10, 20, 20, 35, 90]), 2)
+    assert stats.percentiles == {"p25": 20.0, "p50": 20.0, "p75": 35.0, "p90": 68.0}
+
+
+def test_build_snapshot_single_pass_over_generator():
+    snapshot = build_snapshot((s for s in STUDENTS), top_n=2)
+    assert snapshot.total_students == 5
+    assert snapshot.overall.count == 4
+    assert snapshot.subjects["History"].average == 65.0
+    assert [s.student_id for s in snapshot.top_students] == [1, 3]
+
+
+def test_build_snapshot_empty():
+    snapshot = build_snapshot([], top_n=3)
+    assert snapshot.is_empty
+    assert snapshot.subjects == {}
+
+
+def test_sql_snapshot_matches_streaming_snapshot(db):
+    from database.queries import bulk_insert_students, get_all_students
+
+    bulk_insert_students(STUDENTS)
+    assert compute_analytics_snapshot(top_n=3) == build_snapshot(get_all_students(), top_n=3)
@@ -0,0 +1,37 @@
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks.startup import HEAVY_MODULES, PROJECT_DIR, STARTUP_BUDGETS_MS, best_of, parse_importtime
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        300 |   encodings
+import time:       200 |       5000 | site
+import time:       300 |        300 | src
+import time:       400 |        400 |     numpy.core
+import time:      1000 |       1400 |   database.queries
+import time:       600 |       2000 | src.cli.main
+"""
+
+
+def test_parse_importtime_skips_interpreter_startup():
+    total, direct = parse_importtime(IMPORTTIME)
+    assert total == pytest.approx(2.3)
+    assert direct == [("database.queries", 1.4)]
+
+
+@pytest.mark.parametrize("module", sorted(STARTUP_BUDGETS_MS))
+def test_entrypoint_startup_budget(module):
+    timing = best_of(module, repeat=2)
+    assert not set(timing.loaded) & set(HEAVY_MODULES[module]), timing.loaded
+    assert timing.total_ms <= STARTUP_BUDGETS_MS[module], timing.heaviest
+
+
+def test_importing_database_has_no_side_effects():
+    proc = subprocess.run(
+        [sys.executable, "-c", "import sys, database.database; print('dotenv' in sys.modules)"],
+        cwd=PROJECT_DIR, capture_output=True, text=True, check=True,
+    )
+    assert proc.stdout == "False\n"
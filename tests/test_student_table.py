@@ -0,0 +1,106 @@
+import random
+
+import pytest
+
+from database.models import Student
+from database.sql import student_values
+from src.analytics.marks_analysis import (
+    calculate_subject_mark_stats,
+    get_overall_mark_stats,
+    get_top_students,
+    group_students_by_subject,
+)
+from src.analytics.student_table import StudentTable
+
+STUDENTS = [
+    Student(1, "Ana", 20, "Female", "Math", 90),
+    Student(2, "Bia", 21, "Female", "Math", 70),
+    Student(3, "Caio", 22, "Male", "History", 90),
+    Student(4, "Duda", None, "Female", "History", None),
+    Student(5, "Edu", 23, "Male", None, 40),
+]
+
+
+def _random_students(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    return [
+        Student(
+            i, f"S{i}", rng.randint(17, 30), rng.choice(["Female", "Male", None]),
+            rng.choice(["Math", "History", "Art", None]),
+            rng.choice([None] + list(range(0, 101))),
+        )
+        for i in rng.sample(range(1, count * 10), count)
+    ]
+
+
+def test_round_trip_keeps_rows_and_nulls():
+    table = StudentTable.from_rows([student_values(s) for s in STUDENTS])
+    assert len(table) == 5
+    assert table.to_students() == STUDENTS
+    assert table.subjects == ["Math", "History", None]
+
+
+def test_built_from_row_chunks():
+    rows = [student_values(s) for s in STUDENTS]
+    table = StudentTable.from_row_chunks([rows[:2], [], rows[2:]])
+    assert table.to_students() == STUDENTS
+    assert len(StudentTable.from_row_chunks([])) == 0
+
+
+def test_filters():
+    table = StudentTable.from_students(STUDENTS)
+    assert [s.student_id for s in table.filter(subject="Math").to_students()] == [1, 2]
+    assert [s.student_id for s in table.filter(gender="Male", min_marks=50).to_students()] == [3]
+    assert [s.student_id for s in table.filter(max_marks=70).to_students()] == [2, 5]
+    assert len(table.filter(subject="Physics")) == 0
+
+
+def test_group_mark_stats():
+    table = StudentTable.from_students(STUDENTS)
+    assert table.subject_mark_stats() == {
+        "Math": {"count": 2, "average": 80.0, "min": 70, "max": 90},
+        "History": {"count": 1, "average": 90.0, "min": 90, "max": 90},
+        None: {"count": 1, "average": 40.0, "min": 40, "max": 40},
+    }
+    assert table.group_mark_stats("gender")["Male"]["average"] == 65.0
+    with pytest.raises(ValueError):
+        table.group_mark_stats("name")
+
+
+@pytest.mark.parametrize("subject,gender", [(None, None), ("Math", None), (None, "Female")])
+def test_table_matches_list_implementation(subject, gender):
+    students = _random_students(2000)
+    table = StudentTable.from_students(students)
+
+    assert calculate_subject_mark_stats(table, subject, gender) == \
+        calculate_subject_mark_stats(students, subject, gender)
+    assert get_overall_mark_stats(table, subject, gender) == \
+        get_overall_mark_stats(students, subject, gender)
+    for limit in (0, 1, 10, 5000):
+        assert get_top_students(limit, table, subject, gender) == \
+            get_top_students(limit, students, subject, gender)
+
+    grouped = group_students_by_subject(table)
+    assert {k: v.to_students() for k, v in grouped.items()} == group_students_by_subject(students)
+
+
+def test_top_students_ties_with_partial_selection():
+    students = [Student(i, f"S{i}", 20, "Male", "Math", 50) for i in range(100, 0, -1)]
+    table = StudentTable.from_students(students)
+    assert [s.student_id for s in table.top_students(3)] == [1, 2, 3]
+
+
+def test_empty_table():
+    table = StudentTable.from_students([])
+    assert table.subject_mark_stats() == {}
+    assert table.overall_mark_stats() == {}
+    assert table.top_students(3) == []
+
+
+def test_from_database(any_db):
+    from database.queries import bulk_insert_students, get_all_students
+
+    bulk_insert_students(STUDENTS)
+    table = StudentTable.from_database(chunk_size=2)
+    assert table.to_students() == get_all_students()
+    assert StudentTable.from_database(subject="Math").to_students() == STUDENTS[:2]
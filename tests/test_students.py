@@ -0,0 +1,24 @@
+from database.models import Student
+from database.sql import row_to_student, rows_to_students, student_values
+from src.api.main import domain_to_response
+
+ROWS = [
+    (1, "Ana", 20, "Female", "Math", 90),
+    (2, "Bia", None, None, None, None),
+]
+
+
+def test_student_is_slotted():
+    student = Student(*ROWS[0])
+    assert not hasattr(student, "__dict__")
+
+
+def test_rows_to_students_matches_row_to_student():
+    students = rows_to_students(ROWS)
+    assert students == [row_to_student(row) for row in ROWS]
+    assert [student_values(s) for s in students] == ROWS
+
+
+def test_to_dict_matches_api_response():
+    for student in rows_to_students(ROWS):
+        assert student.to_dict() == domain_to_response(student).model_dump()
@@ -0,0 +1,62 @@
+from database.database import get_connection
+from database.models import Student
+from database.queries import (
+    bulk_insert_students,
+    check_subject_mark_stats,
+    delete_student_by_id,
+    get_mark_stats,
+    get_subject_mark_stats,
+    insert_student,
+    rebuild_subject_mark_stats,
+    update_student_fields,
+    upsert_student,
+)
+
+
+def make_student(student_id, subject="Math", marks=80, **overrides):
+    data = dict(name=f"S{student_id}", age=20, gender="Female")
+    data.update(overrides)
+    return Student(student_id=student_id, subject=subject, marks=marks, **data)
+
+
+def test_aggregates_follow_every_write_path(db):
+    bulk_insert_students([
+        make_student(1, marks=90),
+        make_student(2, marks=60),
+        make_student(3, "History", 75),
+        make_student(4, None, 50),
+        make_student(5, "History", None),
+    ])
+    insert_student(make_student(6, marks=100))
+    upsert_student(make_student(1, "History", 95))       # muda de disciplina
+    update_student_fields(6, {"marks": 70})              # remove o máximo de Math
+    delete_student_by_id(2)                              # remove o mínimo de Math
+    bulk_insert_students([make_student(3, "Physics", 40)], mode="upsert")
+
+    assert check_subject_mark_stats() == []
+    assert get_subject_mark_stats() == {
+        "History": {"count": 1, "average": 95.0, "min": 95, "max": 95},
+        "Math": {"count": 1, "average": 70.0, "min": 70, "max": 70},
+        "Physics": {"count": 1, "average": 40.0, "min": 40, "max": 40},
+        None: {"count": 1, "average": 50.0, "min": 50, "max": 50},
+    }
+    # caminho por agregados == GROUP BY completo (forçado pelo filtro de gênero)
+    assert get_subject_mark_stats() == get_subject_mark_stats(gender="Female")
+    assert get_mark_stats() == {"count": 5, "average": 63.75, "min": 40, "max": 95}
+    assert type(get_mark_stats()["count"]) is int
+
+
+def test_check_detects_drift_and_rebuild_fixes_it(db):
+    bulk_insert_students([make_student(1), make_student(2, "History", 70)])
+    with get_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("UPDATE subject_mark_stats SET mark_sum = 0 WHERE subject = 'Math';")
+            cur.execute("DELETE FROM subject_mark_stats WHERE subject = 'History';")
+
+    mismatches = check_subject_mark_stats()
+    assert [m["subject"] for m in mismatches] == ["History", "Math"]
+    assert mismatches[0]["stored"] is None
+    assert mismatches[1]["expected"]["mark_sum"] == 80
+
+    rebuild_subject_mark_stats()
+    assert check_subject_mark_stats() == []